@@ -418,7 +418,7 @@ class AICodeEvaluator:
         """Analyze code quality using Google Gemini or heuristics"""
         try:
             # Try Gemini AI analysis first
-            if os.getenv('GEMINI_API_KEY'):
+            if gemini_service.is_available():
                 ai_analysis = self._analyze_with_openai(code, language, question_text)
                 if ai_analysis:
                     return ai_analysis
@@ -1,13 +1,19 @@
 """
 AI Course Generator - Creates comprehensive courses with modules, questions, and learning paths
+Per-module content and questions are generated concurrently on a bounded thread pool
 """
 
+import os
 import random
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Callable, Optional
 
 class AICourseGenerator:
-    def __init__(self):
+    def __init__(self, max_workers: int = None):
+        # Modules generated at the same time for one course
+        self.max_workers = max_workers or int(os.getenv('COURSE_GENERATION_WORKERS', 4))
+
         # AI-powered dynamic course generation - no fixed templates
         self.ai_course_patterns = {
             'programming_languages': {
@@ -550,8 +556,12 @@ class AICourseGenerator:
         
         return modules
 
-    def generate_complete_course(self, course_title: str, skill_level: str, duration_weeks: int = 8, modules_count: int = 8) -> Dict[str, Any]:
-        """AI generates a complete course with modules, questions, and learning path relevant to the course title"""
+    def generate_complete_course(self, course_title: str, skill_level: str, duration_weeks: int = 8, modules_count: int = 8,
+                                 progress: Optional[Callable[[str, int, int], None]] = None) -> Dict[str, Any]:
+        """
+        AI generates a complete course with modules, questions, and learning path relevant to the course title.
+        progress(stage, done, total) is called as each module's content and questions finish.
+        """
         
         print(f"🤖 AI Analyzing course title: {course_title}")
         
@@ -562,10 +572,10 @@ class AICourseGenerator:
         module_titles = self._ai_generate_modules_for_title(course_title, modules_count, skill_level)
         
         # Generate detailed modules with AI-powered content
-        modules = self._ai_generate_detailed_modules(course_title, module_titles, skill_level)
+        modules = self._ai_generate_detailed_modules(course_title, module_titles, skill_level, progress)
         
         # AI generates relevant questions based on course content
-        questions = self._ai_generate_relevant_questions(course_title, modules, skill_level)
+        questions = self._ai_generate_relevant_questions(course_title, modules, skill_level, progress)
         
         # AI generates contextual assessments
         assessments = self._ai_generate_contextual_assessments(course_title, skill_level, len(modules))
@@ -594,24 +604,41 @@ class AICourseGenerator:
         print(f"✅ Generated course with {len(modules)} modules and {len(questions)} questions")
         return course_content
 
-    def _ai_generate_detailed_modules(self, course_title: str, module_titles: List[str], skill_level: str) -> List[Dict[str, Any]]:
-        """AI generates detailed module content relevant to course title"""
-        modules = []
-        
-        for i, title in enumerate(module_titles):
-            # AI generates contextual content for each module
-            content = self._ai_generate_module_content(course_title, title, skill_level, i + 1)
-            
-            module = {
-                'title': title,
-                'content': content,
-                'order_index': i + 1,
-                'estimated_duration': self._calculate_module_duration(title, skill_level),
-                'learning_objectives': self._ai_generate_learning_objectives(course_title, title, skill_level)
-            }
-            modules.append(module)
-        
-        return modules
+    def _map_modules(self, generate: Callable[[int], Any], count: int, stage: str,
+                     progress: Optional[Callable[[str, int, int], None]] = None) -> List[Any]:
+        """generate(i) for every module index on the worker pool, results in module order"""
+        if count == 0:
+            return []
+
+        results = [None] * count
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, count),
+                                thread_name_prefix='course-generation') as pool:
+            futures = {pool.submit(generate, i): i for i in range(count)}
+            done = 0
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+                done += 1
+                if progress:
+                    progress(stage, done, count)
+        return results
+
+    def _ai_generate_detailed_module(self, course_title: str, title: str, skill_level: str, module_index: int) -> Dict[str, Any]:
+        """AI generates one module's content and objectives"""
+        return {
+            'title': title,
+            'content': self._ai_generate_module_content(course_title, title, skill_level, module_index),
+            'order_index': module_index,
+            'estimated_duration': self._calculate_module_duration(title, skill_level),
+            'learning_objectives': self._ai_generate_learning_objectives(course_title, title, skill_level)
+        }
+
+    def _ai_generate_detailed_modules(self, course_title: str, module_titles: List[str], skill_level: str,
+                                      progress: Optional[Callable[[str, int, int], None]] = None) -> List[Dict[str, Any]]:
+        """AI generates detailed module content relevant to course title, modules in parallel"""
+        return self._map_modules(
+            lambda i: self._ai_generate_detailed_module(course_title, module_titles[i], skill_level, i + 1),
+            len(module_titles), 'modules', progress
+        )
 
     def _ai_generate_module_content(self, course_title: str, module_title: str, skill_level: str, module_index: int) -> str:
         """AI generates contextually relevant module content"""
@@ -730,9 +757,9 @@ By the end of this module, you will be able to:
         
         return f"{base_hours}-{base_hours + 1} hours"
 
-    def _ai_generate_relevant_questions(self, course_title: str, modules: List[Dict], skill_level: str) -> List[Dict[str, Any]]:
-        """AI generates questions specifically relevant to the course content"""
-        questions = []
+    def _ai_generate_relevant_questions(self, course_title: str, modules: List[Dict], skill_level: str,
+                                        progress: Optional[Callable[[str, int, int], None]] = None) -> List[Dict[str, Any]]:
+        """AI generates questions specifically relevant to the course content, modules in parallel"""
         
         # Determine difficulty progression based on skill level
         difficulty_progression = self.ai_course_patterns['difficulty_levels'].get(
@@ -742,19 +769,22 @@ By the end of this module, you will be able to:
         
         questions_per_module = 4 if skill_level.lower() == 'beginner' else 5
         
-        for i, module in enumerate(modules):
-            module_title = module['title']
+        def module_questions(i: int) -> List[Dict[str, Any]]:
+            module_title = modules[i]['title']
             difficulty = difficulty_progression[i % len(difficulty_progression)]
             
             # Generate contextual questions for this module
+            questions = []
             for q_index in range(questions_per_module):
                 question = self._generate_contextual_question(
                     course_title, module_title, difficulty, q_index + 1
                 )
                 question['module_index'] = i + 1
                 questions.append(question)
+            return questions
         
-        return questions
+        per_module = self._map_modules(module_questions, len(modules), 'questions', progress)
+        return [question for questions in per_module for question in questions]
 
     def _generate_contextual_question(self, course_title: str, module_title: str, difficulty: str, question_number: int) -> Dict[str, Any]:
         """Generate a contextually relevant question"""
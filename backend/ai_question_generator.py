@@ -6,7 +6,6 @@ This service generates questions using Gemini models based on type, difficulty,
 
 import json
 import random
-import os
 from typing import Dict, List, Any
 from openai_service import gemini_service
 
@@ -168,8 +167,8 @@ class AIQuestionGenerator:
     def generate_question(self, question_type: str, difficulty: str, category: str) -> Dict[str, Any]:
         """Generate a question using Google Gemini or fallback to templates"""
         try:
-            # Try Gemini AI generation first
-            if os.getenv('GEMINI_API_KEY'):
+            # Try Gemini AI generation first, unless the circuit breaker is open
+            if gemini_service.is_available():
                 ai_question = self._generate_with_openai(question_type, difficulty, category)
                 if ai_question:
                     return ai_question
@@ -5,9 +5,11 @@ Provides intelligent recommendation functionality using Gemini models
 """
 
 import random
-import os
+import zlib
 from typing import Dict, List, Any
 from openai_service import gemini_service
+from keyword_matcher import KeywordMatcher
+from recommendation_index import recommendation_index
 
 class SimpleAIEngine:
     """Simple AI recommendation engine with basic functionality"""
@@ -63,12 +65,23 @@ class SimpleAIEngine:
                 'tests': ['Business Fundamentals', 'Entrepreneurship Quiz', 'Leadership Skills']
             }
         }
+        
+        # Keywords that indicate an arts/creative background
+        self.creative_keywords = ['art', 'arts', 'creative', 'design', 'visual', 'music', 'dance', 'theater', 
+                                  'painting', 'drawing', 'sculpture', 'photography', 'film', 'video', 'animation',
+                                  'graphic', 'illustration', 'fashion', 'interior', 'architecture', 'media']
+        
+        # Compiled once so profile analysis scans the text a single time
+        self.category_matcher = KeywordMatcher({
+            category: data['keywords'] for category, data in self.skill_categories.items()
+        })
+        self.creative_matcher = KeywordMatcher({'creative': self.creative_keywords})
     
     def analyze_user_profile(self, bio_data: Dict, assessment_scores: List = None) -> Dict:
         """Analyze user profile using Google Gemini and return structured data"""
         try:
-            # Try Gemini AI analysis first
-            if os.getenv('GEMINI_API_KEY'):
+            # Try Gemini AI analysis first, unless the circuit breaker is open
+            if gemini_service.is_available():
                 ai_analysis = self._analyze_with_openai(bio_data, assessment_scores)
                 if ai_analysis:
                     return ai_analysis
@@ -150,13 +163,7 @@ Provide a JSON response with:
                     all_text += bio_data['education'].lower() + " "
                 
                 # Analyze all text for category matching
-                category_scores = {}
-                for category, data in self.skill_categories.items():
-                    score = 0
-                    for keyword in data['keywords']:
-                        if keyword in all_text:
-                            score += 1
-                    category_scores[category] = score
+                category_scores = self.category_matcher.count(all_text)
                 
                 # Get top categories based on keyword matches
                 sorted_categories = sorted(category_scores.items(), key=lambda x: x[1], reverse=True)
@@ -167,11 +174,7 @@ Provide a JSON response with:
                         interests.append(category)
                 
                 # Special handling for arts/creative backgrounds
-                creative_keywords = ['art', 'arts', 'creative', 'design', 'visual', 'music', 'dance', 'theater', 
-                                   'painting', 'drawing', 'sculpture', 'photography', 'film', 'video', 'animation',
-                                   'graphic', 'illustration', 'fashion', 'interior', 'architecture', 'media']
-                
-                if any(keyword in all_text for keyword in creative_keywords):
+                if self.creative_matcher.has_any(all_text):
                     # Prioritize creative technology paths for arts backgrounds
                     if 'Creative Technology' not in interests:
                         interests.insert(0, 'Creative Technology')
@@ -220,8 +223,17 @@ Provide a JSON response with:
     def recommend_courses(self, user_profile: Dict, limit: int = 5) -> List[Dict]:
         """Enhanced course recommendations with Google Gemini"""
         try:
-            # Try Gemini AI recommendations first
-            if os.getenv('GEMINI_API_KEY'):
+            # Local catalog index first: no network call, millisecond latency
+            local_recommendations = recommendation_index.recommend_courses(
+                user_profile, limit, categorize=self.category_matcher.first_match
+            )
+            if local_recommendations:
+                if len(local_recommendations) < limit:
+                    local_recommendations += self._recommend_courses_with_rules(user_profile, limit - len(local_recommendations))
+                return local_recommendations
+            
+            # Try Gemini AI recommendations next
+            if gemini_service.is_available():
                 ai_recommendations = self._recommend_courses_with_openai(user_profile, limit)
                 if ai_recommendations:
                     return ai_recommendations
@@ -283,8 +295,9 @@ Format as: {{"courses": [...]}}"""
                 if interest in self.skill_categories:
                     courses = self.skill_categories[interest]['courses']
                     for course in courses[:limit//len(interests) + 1]:
-                        # Calculate enhanced match score
-                        match_score = random.randint(75, 85)
+                        # Deterministic: scored by similarity to the profile in the catalog index space
+                        similarity = recommendation_index.text_similarity(user_profile, f"{course} {interest}")
+                        match_score = 75 + int(round(10 * similarity))
                         
                         # Boost for creative backgrounds
                         if interest in ['Creative Technology', 'Digital Arts & Media', 'Tech for Creatives']:
@@ -300,8 +313,8 @@ Format as: {{"courses": [...]}}"""
                             'difficulty': skill_level,
                             'match_score': min(match_score, 98),
                             'description': self._get_course_description(course, interest),
-                            'duration': f'{random.randint(4, 12)} weeks',
-                            'rating': round(random.uniform(4.2, 4.9), 1),
+                            'duration': f'{4 + int(round(8 * similarity))} weeks',
+                            'rating': round(4.2 + 0.7 * similarity, 1),
                             'reason': self._get_recommendation_reason(interest, course, user_profile),
                             'skills_gained': self._get_skills_for_course(course, interest),
                             'career_paths': self._get_career_paths(interest)
@@ -366,7 +379,8 @@ Format as: {{"courses": [...]}}"""
         }
         
         if interest in reasons:
-            return random.choice(reasons[interest])
+            # Stable per course so repeated requests give the same reason
+            return reasons[interest][zlib.crc32(course.encode('utf-8')) % len(reasons[interest])]
         else:
             return f"Based on your interest in {interest} and career goals"
     
@@ -432,19 +446,24 @@ Format as: {{"courses": [...]}}"""
     def recommend_mentors(self, user_profile: Dict, limit: int = 5) -> List[Dict]:
         """Recommend mentors based on user profile"""
         try:
-            recommendations = []
+            # Real mentors from the local index, padded with category suggestions
+            recommendations = recommendation_index.recommend_mentors(user_profile, limit)
+            if len(recommendations) >= limit:
+                return recommendations
+            
             interests = user_profile.get('interests', ['Programming'])
             
             for interest in interests:
                 if interest in self.skill_categories:
                     mentors = self.skill_categories[interest]['mentors']
                     for mentor in mentors[:limit//len(interests) + 1]:
+                        similarity = recommendation_index.text_similarity(user_profile, f"{mentor} {interest}", kind='mentor')
                         recommendations.append({
                             'name': f'{mentor} Expert',
                             'expertise': interest,
-                            'experience': f'{random.randint(3, 10)} years',
-                            'match_score': random.randint(80, 98),
-                            'rating': round(random.uniform(4.5, 5.0), 1),
+                            'experience': f'{3 + int(round(7 * similarity))} years',
+                            'match_score': 80 + int(round(18 * similarity)),
+                            'rating': round(4.5 + 0.5 * similarity, 1),
                             'availability': 'Available',
                             'description': f'Experienced {mentor} with expertise in {interest}'
                         })
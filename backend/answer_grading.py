@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Answer Grading Engine for SkillNova
+Grades a whole submission in one pass against an answer key that is either
+loaded with a single IN query or cached on the test attempt when it starts
+"""
+
+import uuid
+from typing import Dict, Any, Iterable, Optional
+from models import db, Question
+
+class AnswerGradingEngine:
+    """Batch grading of question answers"""
+
+    @staticmethod
+    def normalize(answer, case_sensitive: bool = False) -> str:
+        text = str(answer).strip()
+        return text if case_sensitive else text.lower()
+
+    def is_correct(self, user_answer, correct_answer, case_sensitive: bool = False) -> bool:
+        """Strict comparison: exact match after trimming (and case folding unless case_sensitive)"""
+        if user_answer is None or not correct_answer:
+            return False
+        return self.normalize(user_answer, case_sensitive) == self.normalize(correct_answer, case_sensitive)
+
+    @staticmethod
+    def key_entry(question: Question) -> Dict[str, Any]:
+        return {
+            'correct_answer': question.correct_answer,
+            'question_type': question.question_type
+        }
+
+    def load_answer_key(self, question_ids: Iterable) -> Dict[str, Dict[str, Any]]:
+        """Answer key for the given question ids, fetched with one IN query (invalid ids are skipped)"""
+        valid_ids = {}
+        for question_id in question_ids:
+            try:
+                parsed = question_id if isinstance(question_id, uuid.UUID) else uuid.UUID(str(question_id))
+            except (ValueError, AttributeError, TypeError):
+                continue
+            valid_ids[str(parsed)] = parsed
+
+        if not valid_ids:
+            return {}
+
+        rows = db.session.query(
+            Question.id, Question.correct_answer, Question.question_type
+        ).filter(Question.id.in_(list(valid_ids.values()))).all()
+
+        return {
+            str(question_id): {'correct_answer': correct_answer, 'question_type': question_type}
+            for question_id, correct_answer, question_type in rows
+        }
+
+    def build_attempt_order(self, questions) -> Dict[str, Any]:
+        """questions_order payload for a new attempt: the served order plus its answer key"""
+        return {
+            'question_ids': [str(q.id) for q in questions],
+            'answer_key': {str(q.id): self.key_entry(q) for q in questions}
+        }
+
+    def answer_key_for_attempt(self, attempt, question_ids: Iterable) -> Dict[str, Dict[str, Any]]:
+        """
+        Answer key cached on the attempt at start; attempts started before keys were cached
+        (questions_order is a plain id list) or answers outside the key fall back to one IN query.
+        """
+        question_ids = [str(question_id) for question_id in question_ids]
+        order = attempt.questions_order if attempt else None
+        cached = order.get('answer_key', {}) if isinstance(order, dict) else {}
+
+        answer_key = {qid: cached[qid] for qid in question_ids if qid in cached}
+        missing = [qid for qid in question_ids if qid not in answer_key]
+        if missing:
+            answer_key.update(self.load_answer_key(missing))
+        return answer_key
+
+    def grade(self, answers: Dict[str, Any], answer_key: Dict[str, Dict[str, Any]],
+              case_sensitive: bool = False, gradable_types: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """
+        Grade {question_id: answer} in one pass. Questions missing from the key, without a
+        correct answer, or (when gradable_types is given) of another type count as incorrect.
+        """
+        gradable_types = set(gradable_types) if gradable_types is not None else None
+        results = {}
+        correct_answers = 0
+
+        for question_id, user_answer in answers.items():
+            entry = answer_key.get(str(question_id))
+            gradable = bool(entry and entry.get('correct_answer')) and (
+                gradable_types is None or entry.get('question_type') in gradable_types
+            )
+            is_correct = gradable and self.is_correct(user_answer, entry['correct_answer'], case_sensitive)
+            if is_correct:
+                correct_answers += 1
+            results[str(question_id)] = {
+                'is_correct': is_correct,
+                'graded': gradable
+            }
+
+        total_questions = len(answers)
+        return {
+            'correct_answers': correct_answers,
+            'total_questions': total_questions,
+            'score_percentage': (correct_answers / total_questions * 100) if total_questions > 0 else 0,
+            'results': results
+        }
+
+# Global instance
+answer_grading_engine = AnswerGradingEngine()
@@ -236,6 +236,10 @@ with app.app_context():
         # Register blueprints
         register_blueprints()
         
+        # Load the question duplicate index once; commit hooks keep it current from here on
+        from question_dedup import question_duplicate_index
+        question_duplicate_index.build()
+        
     except Exception as e:
         print(f"❌ Application initialization error: {e}")
         # Don't exit here as it might be imported
@@ -260,11 +264,13 @@ def health_check():
     except:
         db_status = False
     
+    from openai_service import gemini_service
     return jsonify({
         "status": "healthy", 
         "timestamp": datetime.utcnow().isoformat(),
         "cors_enabled": True,
-        "database_connected": db_status
+        "database_connected": db_status,
+        "ai_service": gemini_service.metrics()
     })
 
 # Add explicit OPTIONS handler for preflight requests
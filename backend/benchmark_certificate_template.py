@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Benchmark rendering 1,000 certificates with the compiled CertificateTemplate
+against the per-certificate style and layout rebuild it replaced
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+from io import BytesIO
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import qrcode
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+
+from certificate_service import CertificateGenerator
+
+def legacy_create_certificate_pdf(generator, output, user_name, course_title, certificate_number,
+                                  final_score, completion_date, issued_date, **doc_options):
+    """Original create_certificate_pdf body: styles and every flowable rebuilt per certificate"""
+    doc = SimpleDocTemplate(output, pagesize=A4,
+                            rightMargin=72, leftMargin=72,
+                            topMargin=72, bottomMargin=18, **doc_options)
+    styles = getSampleStyleSheet()
+    title_style = ParagraphStyle('CustomTitle', parent=styles['Heading1'], fontSize=28, spaceAfter=30,
+                                 alignment=TA_CENTER, textColor=colors.darkblue, fontName='Helvetica-Bold')
+    subtitle_style = ParagraphStyle('CustomSubtitle', parent=styles['Heading2'], fontSize=18, spaceAfter=20,
+                                    alignment=TA_CENTER, textColor=colors.darkgreen, fontName='Helvetica-Bold')
+    body_style = ParagraphStyle('CustomBody', parent=styles['Normal'], fontSize=12, spaceAfter=12,
+                                alignment=TA_CENTER, fontName='Helvetica')
+    name_style = ParagraphStyle('CustomName', parent=styles['Normal'], fontSize=24, spaceAfter=20,
+                                alignment=TA_CENTER, textColor=colors.darkred, fontName='Helvetica-Bold')
+
+    ai_content = generator.generate_ai_certificate_content(user_name, course_title, final_score, completion_date)
+
+    story = []
+    story.append(Paragraph("CERTIFICATE OF COMPLETION", title_style))
+    story.append(Spacer(1, 20))
+    story.append(Paragraph("SkillNova Learning Platform", subtitle_style))
+    story.append(Spacer(1, 30))
+    story.append(Paragraph("This is to certify that", body_style))
+    story.append(Spacer(1, 10))
+    story.append(Paragraph(f"<u>{user_name}</u>", name_style))
+    story.append(Spacer(1, 20))
+    story.append(Paragraph(f"has successfully completed the course", body_style))
+    story.append(Spacer(1, 10))
+    story.append(Paragraph(f"<b>{course_title}</b>", subtitle_style))
+    story.append(Spacer(1, 20))
+    story.append(Paragraph(f"{ai_content['performance_message']}", body_style))
+    story.append(Spacer(1, 15))
+    if ai_content.get('perfect_score', False):
+        perfect_style = ParagraphStyle('PerfectScore', parent=styles['Normal'], fontSize=14, spaceAfter=15,
+                                       alignment=TA_CENTER, textColor=colors.gold, fontName='Helvetica-Bold')
+        story.append(Paragraph("🏆 PERFECT SCORE ACHIEVEMENT 🏆", perfect_style))
+        story.append(Spacer(1, 10))
+    story.append(Paragraph(f"<b>Achievement Level:</b> {ai_content['achievement_level']}", body_style))
+    story.append(Paragraph(f"<b>Final Score:</b> {final_score}%", body_style))
+    story.append(Paragraph(f"<b>Completion Date:</b> {completion_date.strftime('%B %d, %Y')}", body_style))
+    story.append(Spacer(1, 15))
+    story.append(Paragraph(f"<i>{ai_content['ai_recognition']}</i>", body_style))
+    story.append(Spacer(1, 20))
+    story.append(Paragraph("<b>Skills Mastered:</b>", body_style))
+    for skill in ai_content['skills_acquired']:
+        story.append(Paragraph(f"• {skill}", body_style))
+    story.append(Spacer(1, 30))
+    story.append(Paragraph(f"<b>Certificate Number:</b> {certificate_number}", body_style))
+    story.append(Paragraph(f"<b>Issued Date:</b> {issued_date.strftime('%B %d, %Y')}", body_style))
+
+    doc.build(story)
+
+def legacy_create_qr_code(data):
+    """Original create_qr_code: new encoder and a full mask-pattern search per code"""
+    qr = qrcode.QRCode(version=1, error_correction=qrcode.constants.ERROR_CORRECT_L, box_size=10, border=4)
+    qr.add_data(data)
+    qr.make(fit=True)
+    img_buffer = BytesIO()
+    qr.make_image(fill_color="black", back_color="white").save(img_buffer, format='PNG')
+    return img_buffer
+
+def build_certificates(count):
+    scores = [100.0, 96.5, 91.0, 85.5, 74.0, 62.5]
+    completion_date = datetime(2026, 1, 15)
+    issued_date = datetime(2026, 1, 16)
+    return [(f"Learner {i:04d}", f"Course {i % 25}", f"SKILLNOVA-BENCH-{i:06d}", scores[i % len(scores)],
+             completion_date, issued_date) for i in range(count)]
+
+def main(count=1000):
+    generator = CertificateGenerator()
+    certificates = build_certificates(count)
+
+    # Same flowables must produce byte-identical PDFs before timings mean anything
+    samples = certificates[:len(set(c[3] for c in certificates))]
+    for user_name, course_title, number, score, completion_date, issued_date in samples:
+        legacy_pdf, compiled_pdf = BytesIO(), BytesIO()
+        legacy_create_certificate_pdf(generator, legacy_pdf, user_name, course_title, number, score,
+                                      completion_date, issued_date, invariant=1)
+        ai_content = generator.generate_ai_certificate_content(user_name, course_title, score, completion_date)
+        story = generator.template.build_story(user_name, course_title, number, score, completion_date, issued_date,
+                                               ai_content)
+        generator.template.render(compiled_pdf, story, invariant=1)
+        assert legacy_pdf.getvalue() == compiled_pdf.getvalue(), number
+
+    output_dir = tempfile.mkdtemp(prefix='certificate_bench_')
+    generator.certificates_dir = output_dir
+    try:
+        print("=" * 70)
+        print(f"Certificate template benchmark ({count} certificates)")
+        print("=" * 70)
+
+        start = time.perf_counter()
+        for user_name, course_title, number, score, completion_date, issued_date in certificates:
+            legacy_create_certificate_pdf(generator, os.path.join(output_dir, f"legacy_{number}.pdf"),
+                                          user_name, course_title, number, score, completion_date, issued_date)
+        legacy_pdf_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for user_name, course_title, number, score, completion_date, issued_date in certificates:
+            generator.create_certificate_pdf(user_name, course_title, number, score, completion_date, issued_date)
+        compiled_pdf_time = time.perf_counter() - start
+
+        print(f"PDF render   legacy:   {legacy_pdf_time:7.2f} s  ({legacy_pdf_time / count * 1000:.1f} ms/cert)")
+        print(f"PDF render   template: {compiled_pdf_time:7.2f} s  ({compiled_pdf_time / count * 1000:.1f} ms/cert, "
+              f"{legacy_pdf_time / compiled_pdf_time:.2f}x)")
+
+        start = time.perf_counter()
+        for user_name, course_title, number, score, completion_date, issued_date in certificates:
+            legacy_create_qr_code(f"Certificate: {number}\nStudent: {user_name}\nCourse: {course_title}")
+        legacy_qr_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for user_name, course_title, number, score, completion_date, issued_date in certificates:
+            generator.create_qr_code(number, user_name, course_title, issued_date)
+        compiled_qr_time = time.perf_counter() - start
+
+        print(f"QR code      legacy:   {legacy_qr_time:7.2f} s  ({legacy_qr_time / count * 1000:.1f} ms/cert)")
+        print(f"QR code      template: {compiled_qr_time:7.2f} s  ({compiled_qr_time / count * 1000:.1f} ms/cert, "
+              f"{legacy_qr_time / compiled_qr_time:.2f}x)")
+
+        legacy_total = legacy_pdf_time + legacy_qr_time
+        compiled_total = compiled_pdf_time + compiled_qr_time
+        print(f"Total        legacy:   {legacy_total:7.2f} s   template: {compiled_total:7.2f} s  "
+              f"({legacy_total / compiled_total:.2f}x)")
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark persisting a generated 50-module / 500-question course with CourseBulkWriter
+against the per-object ORM inserts it replaced in create_course
+
+Uses an in-memory SQLite database unless BENCHMARK_DATABASE_URL points elsewhere
+(e.g. a scratch PostgreSQL database, where each saved round trip matters more)
+"""
+
+import os
+import sys
+import time
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask
+from models import db, Course, CourseModule, Question
+from course_bulk_insert import course_bulk_writer
+
+MODULES = 50
+QUESTIONS = 500
+
+def build_content():
+    modules = [
+        {'title': f"Module {i + 1}", 'content': f"Generated content for module {i + 1}. " * 40, 'order_index': i + 1}
+        for i in range(MODULES)
+    ]
+    questions = [
+        {
+            'question_text': f"Benchmark question {i + 1} about module {i % MODULES + 1}?",
+            'question_type': 'multiple_choice',
+            'difficulty_level': ('easy', 'medium', 'hard')[i % 3],
+            'category': 'Benchmark Course',
+            'correct_answer': 'Option A',
+            'options': ['Option A', 'Option B', 'Option C', 'Option D']
+        }
+        for i in range(QUESTIONS)
+    ]
+    return modules, questions
+
+def legacy_save(modules, questions):
+    """Original create_course body: one ORM object per module and question"""
+    course = Course(title='Benchmark Course', description='Benchmark', skill_level='Beginner', duration_weeks=8)
+    db.session.add(course)
+    db.session.flush()
+    for module_data in modules:
+        db.session.add(CourseModule(
+            course_id=course.id,
+            title=module_data['title'],
+            content=module_data['content'],
+            order_index=module_data.get('order_index', 1)
+        ))
+    for question_data in questions:
+        db.session.add(Question(
+            question_text=question_data['question_text'],
+            question_type=question_data['question_type'],
+            difficulty_level=question_data['difficulty_level'],
+            category=question_data.get('category'),
+            course_id=course.id,
+            correct_answer=question_data['correct_answer'],
+            options=question_data.get('options')
+        ))
+    db.session.commit()
+
+def bulk_save(modules, questions):
+    course_bulk_writer.create_course(
+        {'title': 'Benchmark Course', 'description': 'Benchmark', 'skill_level': 'Beginner', 'duration_weeks': 8},
+        modules, questions
+    )
+    db.session.commit()
+
+def time_it(func, modules, questions, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(modules, questions)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def count_statements(func, modules, questions):
+    from sqlalchemy import event
+    statements = []
+    listener = lambda *args: statements.append(1)
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    try:
+        func(modules, questions)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', listener)
+    return len(statements)
+
+def main():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('BENCHMARK_DATABASE_URL', 'sqlite://')
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        modules, questions = build_content()
+
+        # Same rows either way before timings mean anything
+        bulk_save(modules, questions)
+        course = Course.query.order_by(Course.created_at.desc()).first()
+        assert CourseModule.query.filter_by(course_id=course.id).count() == MODULES
+        assert Question.query.filter_by(course_id=course.id).count() == QUESTIONS
+
+        print("=" * 70)
+        print(f"Course persistence benchmark ({MODULES} modules, {QUESTIONS} questions, "
+              f"{db.engine.dialect.name})")
+        print("=" * 70)
+
+        legacy_statements = count_statements(legacy_save, modules, questions)
+        bulk_statements = count_statements(bulk_save, modules, questions)
+        print(f"Statements  ORM unit of work: {legacy_statements:6d}")
+        print(f"Statements  bulk insert:      {bulk_statements:6d}")
+
+        legacy_time = time_it(legacy_save, modules, questions)
+        bulk_time = time_it(bulk_save, modules, questions)
+        print(f"Save time   ORM unit of work: {legacy_time * 1000:8.1f} ms")
+        print(f"Save time   bulk insert:      {bulk_time * 1000:8.1f} ms  ({legacy_time / bulk_time:.1f}x)")
+
+        db.session.remove()
+        if app.config['SQLALCHEMY_DATABASE_URI'] != 'sqlite://':
+            db.drop_all()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark the precompiled category matcher against the per-keyword substring loops
+it replaced in SimpleAIEngine._analyze_with_rules and the admin mentor-matching code
+"""
+
+import os
+import random
+import sys
+import time
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ai_recommendations_simple import ai_engine
+
+def legacy_category_scores(text):
+    """Original loop: one substring scan per keyword per category"""
+    category_scores = {}
+    for category, data in ai_engine.skill_categories.items():
+        score = 0
+        for keyword in data['keywords']:
+            if keyword in text:
+                score += 1
+        category_scores[category] = score
+    return category_scores
+
+def legacy_first_category(area):
+    """Original mentor expertise mapping"""
+    for category in ai_engine.skill_categories.keys():
+        if any(keyword in area for keyword in ai_engine.skill_categories[category]['keywords']):
+            return category
+    return None
+
+def build_corpus(size, seed=42):
+    """Synthetic bio texts mixing category keywords with filler words"""
+    rng = random.Random(seed)
+    keywords = [k for data in ai_engine.skill_categories.values() for k in data['keywords']]
+    keywords += ai_engine.creative_keywords
+    filler = ['student', 'learning', 'career', 'team', 'projects', 'university', 'passionate',
+              'experience', 'building', 'interested', 'improve', 'community', 'work', 'goal']
+    corpus = []
+    for _ in range(size):
+        words = rng.choices(filler, k=rng.randint(20, 60)) + rng.choices(keywords, k=rng.randint(0, 8))
+        rng.shuffle(words)
+        corpus.append(' '.join(words))
+    return corpus
+
+def build_expertise_areas(size, seed=7):
+    """Short mentor expertise areas, as produced by the comma split in the admin route"""
+    rng = random.Random(seed)
+    keywords = [k for data in ai_engine.skill_categories.values() for k in data['keywords']]
+    filler = ['cloud', 'devops', 'testing', 'security', 'networking', 'databases', 'leadership']
+    return [' '.join(rng.choices(keywords + filler, k=rng.randint(1, 3))) for _ in range(size)]
+
+def time_it(func, corpus, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in corpus:
+            func(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    corpus = build_corpus(20000)
+    areas = build_expertise_areas(20000)
+    matcher = ai_engine.category_matcher
+
+    # Results must be identical before timings mean anything
+    for text in corpus:
+        assert matcher.count(text) == legacy_category_scores(text), text
+    for area in areas:
+        assert matcher.first_match(area) == legacy_first_category(area), area
+
+    print("=" * 70)
+    print(f"Keyword matcher benchmark ({len(corpus)} profiles)")
+    print("=" * 70)
+
+    legacy_time = time_it(legacy_category_scores, corpus)
+    compiled_time = time_it(matcher.count, corpus)
+    print(f"Category scores  legacy loops: {legacy_time * 1000:8.1f} ms")
+    print(f"Category scores  compiled:     {compiled_time * 1000:8.1f} ms  ({legacy_time / compiled_time:.1f}x)")
+
+    legacy_time = time_it(legacy_first_category, areas)
+    compiled_time = time_it(matcher.first_match, areas)
+    print(f"Mentor mapping   legacy loops: {legacy_time * 1000:8.1f} ms")
+    print(f"Mentor mapping   compiled:     {compiled_time * 1000:8.1f} ms  ({legacy_time / compiled_time:.1f}x)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Benchmark the learner learning-path endpoint assembly: the previous per-request path
+(enrollment, course and module queries, then the learning path built in Python) against
+the learning path read model (cached per course, one query for the learner overlay)
+
+Uses an in-memory SQLite database unless BENCHMARK_DATABASE_URL points elsewhere
+"""
+
+import os
+import sys
+import time
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask
+from sqlalchemy import event, func
+from sqlalchemy.pool import StaticPool
+from models import db, User, Course, CourseModule, CourseEnrollment, ModuleTest
+from ai_course_generator import ai_course_generator
+from learning_path import learning_path_read_model
+
+COURSES = 10
+MODULES_PER_COURSE = 12
+LEARNERS_PER_COURSE = 20
+CONTENT_CHARS = 20000
+
+def seed():
+    pairs = []
+    for c in range(COURSES):
+        course = Course(title=f"Course {c + 1}", description="Learning path benchmark",
+                        skill_level='Beginner', duration_weeks=8)
+        db.session.add(course)
+        db.session.flush()
+        for m in range(MODULES_PER_COURSE):
+            module = CourseModule(course_id=course.id, title=f"Module {m + 1}",
+                                  content=('x' * 99 + '\n') * (CONTENT_CHARS // 100), order_index=m + 1)
+            db.session.add(module)
+            db.session.flush()
+            db.session.add(ModuleTest(module_id=module.id, title=f"Module {m + 1} quiz"))
+        for u in range(LEARNERS_PER_COURSE):
+            user = User(email=f"learner{c}-{u}@example.com", name=f"Learner {u}", password_hash='x')
+            db.session.add(user)
+            db.session.flush()
+            db.session.add(CourseEnrollment(user_id=user.id, course_id=course.id))
+            pairs.append((user.id, course.id))
+    db.session.commit()
+    return pairs
+
+def module_summaries(course_id, preview_length=200):
+    """Active modules of a course in order, with the content preview cut in SQL"""
+    rows = db.session.query(
+        CourseModule.title, CourseModule.order_index, func.substr(CourseModule.content, 1, preview_length + 1)
+    ).filter(
+        CourseModule.course_id == course_id, CourseModule.is_active == True
+    ).order_by(CourseModule.order_index).all()
+    summaries = []
+    for title, order_index, content in rows:
+        content = content or ''
+        summaries.append({
+            'title': title,
+            'order_index': order_index,
+            'content': content[:preview_length] + '...' if len(content) > preview_length else content
+        })
+    return summaries
+
+def legacy_learning_path(user_id, course_id):
+    """Previous route body: enrollment, course, module summaries, then the path built in Python"""
+    enrollment = CourseEnrollment.query.filter_by(user_id=user_id, course_id=course_id).first()
+    course = db.session.get(Course, course_id)
+    modules_data = module_summaries(course_id)
+    learning_path = ai_course_generator._generate_learning_path(course.title, course.skill_level, modules_data)
+    learning_path['user_progress'] = {'progress_percentage': enrollment.progress_percentage,
+                                      'status': enrollment.status}
+    return learning_path
+
+def read_model_learning_path(user_id, course_id):
+    user_state = learning_path_read_model.load_user_state(user_id, course_id)
+    course_path = learning_path_read_model.course_path(course_id)
+    return learning_path_read_model.user_path(course_path, user_state)
+
+def measure(func, pairs, repeat=3):
+    """(best time for every learner's request, SQL statements per run) with a fresh session per run"""
+    statements = []
+    listener = lambda *a: statements.append(1)
+    best = float('inf')
+    for _ in range(repeat):
+        db.session.expunge_all()
+        statements.clear()
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        start = time.perf_counter()
+        for user_id, course_id in pairs:
+            func(user_id, course_id)
+        best = min(best, time.perf_counter() - start)
+        event.remove(db.engine, 'before_cursor_execute', listener)
+    return best, len(statements)
+
+def main():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('BENCHMARK_DATABASE_URL', 'sqlite://')
+    if app.config['SQLALCHEMY_DATABASE_URI'] == 'sqlite://':
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {'poolclass': StaticPool}
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        pairs = seed()
+
+        print("=" * 70)
+        print(f"Learning path benchmark ({COURSES} courses x {MODULES_PER_COURSE} modules, "
+              f"{LEARNERS_PER_COURSE} learners each, {db.engine.dialect.name})")
+        print("=" * 70)
+
+        # Same modules in the same order before the numbers mean anything
+        user_id, course_id = pairs[0]
+        assert [step['module_title'] for step in legacy_learning_path(user_id, course_id)['learning_sequence']] == \
+               [step['module_title'] for step in read_model_learning_path(user_id, course_id)['learning_sequence']]
+
+        legacy = measure(legacy_learning_path, pairs)
+        learning_path_read_model.bump()
+        read_model = measure(read_model_learning_path, pairs)
+
+        print(f"  per-request assembly: {legacy[0] * 1000:8.1f} ms  {legacy[1]:5d} statements")
+        print(f"  read model:           {read_model[0] * 1000:8.1f} ms  {read_model[1]:5d} statements"
+              f"  ({legacy[0] / read_model[0]:.1f}x faster)")
+
+        db.session.remove()
+        if app.config['SQLALCHEMY_DATABASE_URI'] != 'sqlite://':
+            db.drop_all()
+
+if __name__ == '__main__':
+    main()
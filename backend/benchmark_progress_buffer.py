@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark course player progress pings written through (one UPDATE and commit per ping)
+against the write-behind progress buffer (coalesced per enrollment, one batched UPDATE per flush)
+
+Uses an in-memory SQLite database unless BENCHMARK_DATABASE_URL points elsewhere
+"""
+
+import os
+import sys
+import time
+import random
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask
+from sqlalchemy import event
+from sqlalchemy.pool import StaticPool
+from models import db, User, Course, CourseEnrollment
+from progress_buffer import ProgressWriteBuffer
+
+LEARNERS = 200
+PINGS_PER_LEARNER = 10
+
+def seed():
+    course = Course(title="Benchmark Course", description="Progress pings", skill_level='Beginner', duration_weeks=4)
+    db.session.add(course)
+    db.session.flush()
+    enrollment_ids = []
+    for i in range(LEARNERS):
+        user = User(email=f"learner{i}@example.com", name=f"Learner {i}", password_hash='x')
+        db.session.add(user)
+        db.session.flush()
+        enrollment = CourseEnrollment(user_id=user.id, course_id=course.id, progress_percentage=0.0)
+        db.session.add(enrollment)
+        db.session.flush()
+        enrollment_ids.append(enrollment.id)
+    db.session.commit()
+    return enrollment_ids
+
+def make_pings(enrollment_ids):
+    """Interleaved pings from every learner, each learner's progress increasing"""
+    pings = [(enrollment_id, (n + 1) * 9.0) for n in range(PINGS_PER_LEARNER) for enrollment_id in enrollment_ids]
+    random.Random(42).shuffle(pings)
+    pings.sort(key=lambda ping: ping[1])
+    return pings
+
+def write_through(pings):
+    for enrollment_id, progress in pings:
+        enrollment = db.session.get(CourseEnrollment, enrollment_id)
+        enrollment.progress_percentage = progress
+        db.session.commit()
+
+def write_behind(pings, buffer):
+    for enrollment_id, progress in pings:
+        enrollment = db.session.get(CourseEnrollment, enrollment_id)
+        buffer.record(enrollment.id, progress)
+    # One interval's worth of pings, then the flusher runs
+    buffer.flush()
+
+def measure(func, *args):
+    statements = []
+    listener = lambda conn, cursor, statement, *a: statements.append(statement)
+    db.session.expunge_all()
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    start = time.perf_counter()
+    func(*args)
+    elapsed = time.perf_counter() - start
+    event.remove(db.engine, 'before_cursor_execute', listener)
+    updates = sum(1 for statement in statements if statement.lstrip().upper().startswith('UPDATE'))
+    return elapsed, updates
+
+def final_progress():
+    return dict(db.session.query(CourseEnrollment.id, CourseEnrollment.progress_percentage).all())
+
+def reset_progress():
+    CourseEnrollment.query.update({CourseEnrollment.progress_percentage: 0.0})
+    db.session.commit()
+
+def main():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('BENCHMARK_DATABASE_URL', 'sqlite://')
+    if app.config['SQLALCHEMY_DATABASE_URI'] == 'sqlite://':
+        # The flush runs in its own app context; share the single in-memory database
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {'poolclass': StaticPool,
+                                                   'connect_args': {'check_same_thread': False}}
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        pings = make_pings(seed())
+
+        print("=" * 70)
+        print(f"Progress write benchmark ({LEARNERS} learners x {PINGS_PER_LEARNER} pings, {db.engine.dialect.name})")
+        print("=" * 70)
+
+        through_time, through_updates = measure(write_through, pings)
+        expected = final_progress()
+        reset_progress()
+
+        buffer = ProgressWriteBuffer(flush_interval_seconds=3600)
+        behind_time, behind_updates = measure(write_behind, pings, buffer)
+        db.session.expire_all()
+        # Same end state before the numbers mean anything
+        assert final_progress() == expected
+
+        print(f"  write-through: {through_time * 1000:8.1f} ms  {through_updates:5d} UPDATE executes "
+              f"({len(pings)} commits)")
+        print(f"  write-behind:  {behind_time * 1000:8.1f} ms  {behind_updates:5d} UPDATE executes "
+              f"(1 commit, {through_time / behind_time:.1f}x faster)")
+
+        db.session.remove()
+        if app.config['SQLALCHEMY_DATABASE_URI'] != 'sqlite://':
+            db.drop_all()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Benchmark the admin course listing and the course learning-path module listing with
+deferred large text columns and summary queries, against the full-row loads they replaced
+
+Uses an in-memory SQLite database unless BENCHMARK_DATABASE_URL points elsewhere
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask
+from sqlalchemy import event, func
+from sqlalchemy.orm import defaultload, undefer
+from models import db, Course, CourseModule, CourseEnrollment
+from summary_queries import with_course_description, module_counts
+
+COURSES = 40
+MODULES_PER_COURSE = 12
+CONTENT_CHARS = 20000
+
+def seed():
+    for c in range(COURSES):
+        course = Course(title=f"Course {c + 1}", description=f"Description of course {c + 1}. " * 20,
+                        skill_level='Beginner', duration_weeks=8)
+        db.session.add(course)
+        db.session.flush()
+        for m in range(MODULES_PER_COURSE):
+            db.session.add(CourseModule(course_id=course.id, title=f"Module {m + 1}",
+                                        content=('x' * 99 + '\n') * (CONTENT_CHARS // 100), order_index=m + 1))
+    db.session.commit()
+
+def legacy_admin_courses():
+    """Original get_admin_courses: full course rows, len(course.modules) loading every module body"""
+    rows = db.session.query(Course, func.count(CourseEnrollment.id)).outerjoin(CourseEnrollment).group_by(
+        Course.id
+    ).options(undefer(Course.description), defaultload(Course.modules).undefer(CourseModule.content)).all()
+    return [{'id': str(course.id), 'description': course.description, 'modules_count': len(course.modules)}
+            for course, _ in rows]
+
+def summary_admin_courses():
+    rows = db.session.query(Course, func.count(CourseEnrollment.id)).outerjoin(CourseEnrollment).group_by(
+        Course.id
+    ).options(with_course_description()).all()
+    counts = module_counts()
+    return [{'id': str(course.id), 'description': course.description, 'modules_count': counts.get(course.id, 0)}
+            for course, _ in rows]
+
+def legacy_learning_paths(course_ids):
+    """Original learning-path module listing: full module rows, preview cut in Python"""
+    result = []
+    for course_id in course_ids:
+        modules = CourseModule.query.filter_by(course_id=course_id, is_active=True).options(
+            undefer(CourseModule.content)
+        ).order_by(CourseModule.order_index).all()
+        result.append([{
+            'title': module.title,
+            'order_index': module.order_index,
+            'content': module.content[:200] + '...' if len(module.content) > 200 else module.content
+        } for module in modules])
+    return result
+
+def module_summaries(course_id, preview_length=200):
+    """Active modules of a course in order, with the content preview cut in SQL"""
+    rows = db.session.query(
+        CourseModule.title, CourseModule.order_index, func.substr(CourseModule.content, 1, preview_length + 1)
+    ).filter(
+        CourseModule.course_id == course_id, CourseModule.is_active == True
+    ).order_by(CourseModule.order_index).all()
+    summaries = []
+    for title, order_index, content in rows:
+        content = content or ''
+        summaries.append({
+            'title': title,
+            'order_index': order_index,
+            'content': content[:preview_length] + '...' if len(content) > preview_length else content
+        })
+    return summaries
+
+def summary_learning_paths(course_ids):
+    return [module_summaries(course_id) for course_id in course_ids]
+
+def measure(func, *args, repeat=5):
+    """(best time, SQL statements, peak Python memory) with a fresh session per run"""
+    statements = []
+    listener = lambda *a: statements.append(1)
+    best = float('inf')
+    peak = 0
+    for _ in range(repeat):
+        db.session.expunge_all()
+        statements.clear()
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        tracemalloc.start()
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        event.remove(db.engine, 'before_cursor_execute', listener)
+    return best, len(statements), peak, result
+
+def report(name, legacy, summary):
+    print(f"{name}")
+    print(f"  full rows:     {legacy[0] * 1000:8.1f} ms  {legacy[1]:4d} statements  {legacy[2] / 1024:9.0f} KiB peak")
+    print(f"  summary query: {summary[0] * 1000:8.1f} ms  {summary[1]:4d} statements  {summary[2] / 1024:9.0f} KiB peak"
+          f"  ({legacy[0] / summary[0]:.1f}x faster, {legacy[2] / summary[2]:.1f}x less memory)")
+
+def main():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('BENCHMARK_DATABASE_URL', 'sqlite://')
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        seed()
+        course_ids = [course_id for (course_id,) in db.session.query(Course.id).all()]
+
+        print("=" * 70)
+        print(f"Summary query benchmark ({COURSES} courses x {MODULES_PER_COURSE} modules, "
+              f"{CONTENT_CHARS // 1000}k chars of content each, {db.engine.dialect.name})")
+        print("=" * 70)
+
+        legacy = measure(legacy_admin_courses)
+        summary = measure(summary_admin_courses)
+        # Same payload before the numbers mean anything
+        assert legacy[3] == summary[3]
+        report("Admin course listing (GET /api/admin/courses)", legacy, summary)
+
+        legacy = measure(legacy_learning_paths, course_ids)
+        summary = measure(summary_learning_paths, course_ids)
+        assert [[(m['title'], m['content']) for m in modules] for modules in legacy[3]] == \
+               [[(m['title'], m['content']) for m in modules] for modules in summary[3]]
+        report(f"Learning-path module listing ({COURSES} courses)", legacy, summary)
+
+        db.session.remove()
+        if app.config['SQLALCHEMY_DATABASE_URI'] != 'sqlite://':
+            db.drop_all()
+
+if __name__ == '__main__':
+    main()
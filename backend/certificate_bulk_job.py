@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Bulk Certificate Job Service for SkillNova
+Issues missing certificates and re-renders existing ones for a course or a set of
+enrollments across a process pool, with batched database updates, progress
+reporting and a resumable on-disk checkpoint
+"""
+
+import json
+import os
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+from flask import current_app
+from sqlalchemy import and_, update
+from models import db, User, Course, CourseEnrollment, Certificate
+from certificate_service import CertificateGenerator, init_render_process, render_certificate_payload
+from certificate_storage import certificate_storage
+
+class CertificateBulkJobService:
+    """Background bulk issuance / re-render jobs with checkpoints under data/certificate_jobs"""
+
+    # Rendered certificates written back to the database per transaction
+    BATCH_SIZE = 100
+
+    # Score recorded for certificates issued from a completed enrollment (same default as module completion)
+    DEFAULT_FINAL_SCORE = 85.0
+
+    def __init__(self, checkpoint_dir: str = None, max_workers: int = None):
+        self.checkpoint_dir = checkpoint_dir or os.path.join(os.path.dirname(__file__), '..', 'data', 'certificate_jobs')
+        self.max_workers = max_workers or max(1, (os.cpu_count() or 2) - 1)
+        self.generator = CertificateGenerator()
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._running = set()
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def start_job(self, course_id=None, enrollment_ids: List[str] = None,
+                  issue_missing: bool = True, rerender: bool = True) -> Dict[str, Any]:
+        """Create a job for completed enrollments matching the filters and run it in the background"""
+        now = datetime.utcnow().isoformat()
+        job = {
+            'job_id': uuid.uuid4().hex,
+            'status': 'queued',
+            'filters': {
+                'course_id': str(course_id) if course_id else None,
+                'enrollment_ids': [str(e) for e in enrollment_ids] if enrollment_ids else None
+            },
+            'issue_missing': issue_missing,
+            'rerender': rerender,
+            'issued': 0,
+            'total': 0,
+            'processed': 0,
+            'failed': 0,
+            'failures': {},
+            'completed_numbers': [],
+            'error': None,
+            'created_at': now,
+            'updated_at': now
+        }
+
+        with self._lock:
+            self._jobs[job['job_id']] = job
+        self._save_checkpoint(job)
+        self._launch(job['job_id'])
+
+        return self.public_view(job)
+
+    def resume_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Continue an interrupted, failed or partly failed job from its checkpoint, skipping
+        certificates already written and retrying the ones that failed to render
+        """
+        job = self._get(job_id)
+        if job is None:
+            return None
+
+        # Checked and claimed under the lock so two resume calls never start the same job twice
+        with self._lock:
+            if job['status'] == 'completed' or job_id in self._running:
+                return self.public_view(job)
+            self._running.add(job_id)
+
+        job['status'] = 'queued'
+        job['error'] = None
+        job['failed'] = 0
+        job['failures'] = {}
+        self._save_checkpoint(job)
+        self._start(job_id)
+
+        return self.public_view(job)
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self._get(job_id)
+        return self.public_view(job) if job else None
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        if os.path.isdir(self.checkpoint_dir):
+            for filename in os.listdir(self.checkpoint_dir):
+                if filename.endswith('.json'):
+                    self._get(filename[:-len('.json')])
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [self.public_view(job) for job in sorted(jobs, key=lambda j: j['created_at'], reverse=True)]
+
+    def public_view(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        view = {key: value for key, value in job.items() if key != 'completed_numbers'}
+        if job['job_id'] not in self._running and job['status'] in ('queued', 'running'):
+            # Checkpoint left behind by a process that stopped mid-job
+            view['status'] = 'interrupted'
+        view['progress_percentage'] = round((job['processed'] / job['total']) * 100, 1) if job['total'] else 0
+        return view
+
+    # ------------------------------------------------------------------
+    # Job execution
+    # ------------------------------------------------------------------
+
+    def _launch(self, job_id: str):
+        with self._lock:
+            self._running.add(job_id)
+        self._start(job_id)
+
+    def _start(self, job_id: str):
+        """Run a job already claimed in _running on a background thread"""
+        app = current_app._get_current_object()
+        threading.Thread(target=self._run, args=(app, job_id), daemon=True,
+                         name=f'certificate-bulk-{job_id[:8]}').start()
+
+    def _run(self, app, job_id: str):
+        job = self._jobs[job_id]
+        with app.app_context():
+            try:
+                job['status'] = 'running'
+                self._save_checkpoint(job)
+
+                if job['issue_missing']:
+                    job['issued'] += self._issue_missing(job)
+
+                certificate_ids, payloads = self._load_payloads(job)
+                done = set(job['completed_numbers'])
+                pending = [payload for payload in payloads if payload['certificate_number'] not in done]
+
+                job['total'] = len(payloads)
+                job['processed'] = len(payloads) - len(pending)
+                self._save_checkpoint(job)
+
+                if pending:
+                    self._render_all(job, pending, certificate_ids)
+
+                # Certificates that failed to render are retried by resume_job
+                job['status'] = 'completed_with_errors' if job['failed'] else 'completed'
+            except Exception as e:
+                db.session.rollback()
+                job['status'] = 'failed'
+                job['error'] = str(e)
+                print(f"Certificate bulk job {job_id} failed: {e}")
+            finally:
+                with self._lock:
+                    self._running.discard(job_id)
+                self._save_checkpoint(job)
+                db.session.remove()
+
+    def _render_all(self, job: Dict[str, Any], pending: List[Dict], certificate_ids: Dict[str, Any]):
+        batch = []
+
+        # Workers only render; all database writes stay in this thread
+        with ProcessPoolExecutor(max_workers=min(self.max_workers, len(pending)),
+                                 initializer=init_render_process) as pool:
+            futures = {pool.submit(render_certificate_payload, payload): payload['certificate_number']
+                       for payload in pending}
+
+            for future in as_completed(futures):
+                certificate_number = futures[future]
+                try:
+                    certificate_number, pdf_path, certificate_data = future.result()
+                    batch.append({
+                        'id': certificate_ids[certificate_number],
+                        'pdf_path': pdf_path,
+                        'content_hash': certificate_data['content_hash'],
+                        'certificate_data': certificate_data,
+                        'status': 'ready',
+                        'rendered_at': datetime.utcnow()
+                    })
+                except Exception as e:
+                    job['failed'] += 1
+                    job['failures'][certificate_number] = str(e)
+
+                if len(batch) >= self.BATCH_SIZE:
+                    self._flush(job, batch)
+                    batch = []
+
+        if batch:
+            self._flush(job, batch)
+
+    def _flush(self, job: Dict[str, Any], batch: List[Dict]):
+        """Write one batch of rendered certificates, then checkpoint them as done"""
+        db.session.execute(update(Certificate), batch)
+        db.session.commit()
+
+        job['completed_numbers'].extend(row['certificate_data']['certificate_number'] for row in batch)
+        job['processed'] += len(batch)
+        self._save_checkpoint(job)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def _enrollment_filters(self, job: Dict[str, Any]) -> list:
+        filters = [CourseEnrollment.status == 'completed']
+        if job['filters']['course_id']:
+            filters.append(CourseEnrollment.course_id == job['filters']['course_id'])
+        if job['filters']['enrollment_ids']:
+            filters.append(CourseEnrollment.id.in_(job['filters']['enrollment_ids']))
+        return filters
+
+    def _issue_missing(self, job: Dict[str, Any]) -> int:
+        """Create pending certificates for matching completed enrollments that have none"""
+        rows = db.session.query(CourseEnrollment, User.name, Course.title).join(
+            User, User.id == CourseEnrollment.user_id
+        ).join(
+            Course, Course.id == CourseEnrollment.course_id
+        ).outerjoin(
+            Certificate, and_(Certificate.user_id == CourseEnrollment.user_id,
+                              Certificate.course_id == CourseEnrollment.course_id)
+        ).filter(Certificate.id.is_(None), *self._enrollment_filters(job)).all()
+
+        for enrollment, user_name, course_title in rows:
+            certificate_data = self.generator.prepare_certificate(
+                user_name, course_title, self.DEFAULT_FINAL_SCORE,
+                enrollment.completed_at or datetime.utcnow()
+            )
+            db.session.add(Certificate(
+                user_id=enrollment.user_id,
+                course_id=enrollment.course_id,
+                certificate_number=certificate_data['certificate_number'],
+                final_score=self.DEFAULT_FINAL_SCORE,
+                certificate_data=certificate_data,
+                status='pending',
+                is_valid=True
+            ))
+
+        db.session.commit()
+        return len(rows)
+
+    def _load_payloads(self, job: Dict[str, Any]):
+        """Render payloads for every targeted certificate, using the current user and course names"""
+        query = db.session.query(Certificate, CourseEnrollment.completed_at, User.name, Course.title).join(
+            CourseEnrollment, and_(CourseEnrollment.user_id == Certificate.user_id,
+                                   CourseEnrollment.course_id == Certificate.course_id)
+        ).join(
+            User, User.id == Certificate.user_id
+        ).join(
+            Course, Course.id == Certificate.course_id
+        ).filter(Certificate.is_valid == True, *self._enrollment_filters(job))
+
+        certificate_ids = {}
+        payloads = []
+        for certificate, completed_at, user_name, course_title in query.order_by(Certificate.issued_at, Certificate.id):
+            if not job['rerender'] and certificate.status == 'ready' \
+                    and certificate_storage.exists(certificate.content_hash):
+                continue
+
+            completion_date = completed_at or certificate.issued_at or datetime.utcnow()
+            payload = dict(certificate.certificate_data or {})
+            payload.pop('verification_qr', None)
+            payload.update({
+                'certificate_number': certificate.certificate_number,
+                'user_name': user_name,
+                'course_title': course_title,
+                'final_score': certificate.final_score,
+                'completion_date': payload.get('completion_date') or completion_date.isoformat(),
+                'issued_date': payload.get('issued_date') or (certificate.issued_at or completion_date).isoformat()
+            })
+
+            certificate_ids[certificate.certificate_number] = certificate.id
+            payloads.append(payload)
+
+        return certificate_ids, payloads
+
+    # ------------------------------------------------------------------
+    # Checkpoints
+    # ------------------------------------------------------------------
+
+    def _checkpoint_path(self, job_id: str) -> str:
+        return os.path.join(self.checkpoint_dir, f"{job_id}.json")
+
+    def _save_checkpoint(self, job: Dict[str, Any]):
+        job['updated_at'] = datetime.utcnow().isoformat()
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        path = self._checkpoint_path(job['job_id'])
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(job, f)
+        os.replace(tmp_path, path)
+
+    def _get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is not None:
+            return job
+
+        path = self._checkpoint_path(os.path.basename(job_id))
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path) as f:
+                job = json.load(f)
+        except Exception as e:
+            print(f"Error loading certificate job checkpoint {job_id}: {e}")
+            return None
+
+        with self._lock:
+            return self._jobs.setdefault(job['job_id'], job)
+
+# Global instance
+certificate_bulk_job_service = CertificateBulkJobService()
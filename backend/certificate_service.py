@@ -3,7 +3,9 @@
 Certificate generation service with AI integration
 """
 
+import copy
 import os
+import threading
 import uuid
 from datetime import datetime
 from reportlab.lib.pagesizes import letter, A4
@@ -16,9 +18,212 @@ from reportlab.lib.enums import TA_CENTER, TA_LEFT
 import qrcode
 from io import BytesIO
 import base64
+from certificate_storage import certificate_storage
+
+class CertificateTemplate:
+    """
+    Compiled certificate layout, built once per process.
+
+    Paragraph styles are created once and shared. Static flowables (headings, fixed
+    sentences, spacers) and the finite set of achievement texts and skill bullets are
+    parsed once into prototypes; each certificate gets shallow copies of them, because
+    platypus records layout state (e.g. postponement) on the flowables it builds. Only
+    the variable fields (name, course, score, dates, number) are parsed per certificate.
+    """
+
+    # Bound on memoized semi-static paragraph prototypes
+    MAX_CACHED_PARAGRAPHS = 512
+
+    # QR codes are encoded with a fixed mask pattern instead of scoring all eight
+    # (any mask decodes identically; the search is most of the encoding cost)
+    QR_MASK_PATTERN = 0
+
+    def __init__(self, pagesize=A4):
+        self.pagesize = pagesize
+        self.margins = {'rightMargin': 72, 'leftMargin': 72, 'topMargin': 72, 'bottomMargin': 18}
+        self.styles = self._build_styles()
+        self.layers = self._build_static_layers()
+        self._paragraphs = {}
+        self._paragraphs_lock = threading.Lock()
+        # QR encoders hold per-encode state, so each thread reuses its own
+        self._local = threading.local()
+
+    def _build_styles(self):
+        styles = getSampleStyleSheet()
+        
+        return {
+            'title': ParagraphStyle(
+                'CustomTitle',
+                parent=styles['Heading1'],
+                fontSize=28,
+                spaceAfter=30,
+                alignment=TA_CENTER,
+                textColor=colors.darkblue,
+                fontName='Helvetica-Bold'
+            ),
+            'subtitle': ParagraphStyle(
+                'CustomSubtitle',
+                parent=styles['Heading2'],
+                fontSize=18,
+                spaceAfter=20,
+                alignment=TA_CENTER,
+                textColor=colors.darkgreen,
+                fontName='Helvetica-Bold'
+            ),
+            'body': ParagraphStyle(
+                'CustomBody',
+                parent=styles['Normal'],
+                fontSize=12,
+                spaceAfter=12,
+                alignment=TA_CENTER,
+                fontName='Helvetica'
+            ),
+            'name': ParagraphStyle(
+                'CustomName',
+                parent=styles['Normal'],
+                fontSize=24,
+                spaceAfter=20,
+                alignment=TA_CENTER,
+                textColor=colors.darkred,
+                fontName='Helvetica-Bold'
+            ),
+            'perfect': ParagraphStyle(
+                'PerfectScore',
+                parent=styles['Normal'],
+                fontSize=14,
+                spaceAfter=15,
+                alignment=TA_CENTER,
+                textColor=colors.gold,
+                fontName='Helvetica-Bold'
+            )
+        }
+
+    def _qr_encoder(self):
+        qr = getattr(self._local, 'qr', None)
+        if qr is None:
+            qr = qrcode.QRCode(
+                version=1,
+                error_correction=qrcode.constants.ERROR_CORRECT_L,
+                box_size=10,
+                border=4,
+                mask_pattern=self.QR_MASK_PATTERN
+            )
+            self._local.qr = qr
+        return qr
+
+    def _build_static_layers(self):
+        """Flowables that are identical on every certificate"""
+        return {
+            'header': [
+                Paragraph("CERTIFICATE OF COMPLETION", self.styles['title']),
+                Spacer(1, 20),
+                Paragraph("SkillNova Learning Platform", self.styles['subtitle']),
+                Spacer(1, 30),
+                Paragraph("This is to certify that", self.styles['body']),
+                Spacer(1, 10)
+            ],
+            'completed': [
+                Spacer(1, 20),
+                Paragraph("has successfully completed the course", self.styles['body']),
+                Spacer(1, 10)
+            ],
+            'perfect_banner': [
+                Paragraph("🏆 PERFECT SCORE ACHIEVEMENT 🏆", self.styles['perfect']),
+                Spacer(1, 10)
+            ],
+            'skills_heading': [
+                Spacer(1, 20),
+                Paragraph("<b>Skills Mastered:</b>", self.styles['body'])
+            ],
+            'spacer_10': Spacer(1, 10),
+            'spacer_15': Spacer(1, 15),
+            'spacer_20': Spacer(1, 20),
+            'spacer_30': Spacer(1, 30)
+        }
+
+    def _cached_paragraph(self, text, style_name):
+        """Copy of a prototype paragraph for text from a small fixed vocabulary (achievement texts, skills)"""
+        key = (text, style_name)
+        paragraph = self._paragraphs.get(key)
+        if paragraph is None:
+            paragraph = Paragraph(text, self.styles[style_name])
+            with self._paragraphs_lock:
+                if len(self._paragraphs) >= self.MAX_CACHED_PARAGRAPHS:
+                    self._paragraphs.clear()
+                self._paragraphs[key] = paragraph
+        return copy.copy(paragraph)
+
+    def _layer(self, name):
+        layer = self.layers[name]
+        if isinstance(layer, list):
+            return [copy.copy(flowable) for flowable in layer]
+        return copy.copy(layer)
+
+    def build_story(self, user_name, course_title, certificate_number, final_score, completion_date, issued_date,
+                    ai_content):
+        """Assemble the story from the cached layers plus this certificate's variable fields"""
+        body_style = self.styles['body']
+        
+        story = self._layer('header')
+        
+        # Student name
+        story.append(Paragraph(f"<u>{user_name}</u>", self.styles['name']))
+        story.extend(self._layer('completed'))
+        
+        # Course title
+        story.append(Paragraph(f"<b>{course_title}</b>", self.styles['subtitle']))
+        story.append(self._layer('spacer_20'))
+        
+        # AI-generated performance message
+        story.append(self._cached_paragraph(f"{ai_content['performance_message']}", 'body'))
+        story.append(self._layer('spacer_15'))
+        
+        # Special recognition for perfect scores
+        if ai_content.get('perfect_score', False):
+            story.extend(self._layer('perfect_banner'))
+        
+        # Achievement details
+        story.append(self._cached_paragraph(f"<b>Achievement Level:</b> {ai_content['achievement_level']}", 'body'))
+        story.append(Paragraph(f"<b>Final Score:</b> {final_score}%", body_style))
+        story.append(Paragraph(f"<b>Completion Date:</b> {completion_date.strftime('%B %d, %Y')}", body_style))
+        story.append(self._layer('spacer_15'))
+        
+        # AI Recognition
+        story.append(self._cached_paragraph(f"<i>{ai_content['ai_recognition']}</i>", 'body'))
+        
+        # Skills acquired
+        story.extend(self._layer('skills_heading'))
+        for skill in ai_content['skills_acquired']:
+            story.append(self._cached_paragraph(f"• {skill}", 'body'))
+        
+        story.append(self._layer('spacer_30'))
+        
+        # Certificate details
+        story.append(Paragraph(f"<b>Certificate Number:</b> {certificate_number}", body_style))
+        story.append(Paragraph(f"<b>Issued Date:</b> {issued_date.strftime('%B %d, %Y')}", body_style))
+        
+        return story
+
+    def render(self, filepath, story, **doc_options):
+        doc = SimpleDocTemplate(filepath, pagesize=self.pagesize, **self.margins, **doc_options)
+        doc.build(story)
+
+    def make_qr_image(self, data):
+        """Encode data with this thread's reusable QR encoder"""
+        qr = self._qr_encoder()
+        qr.clear()
+        # best_fit grows the version in place; start from the smallest again for each code
+        qr.version = 1
+        qr.add_data(data)
+        qr.make(fit=True)
+        return qr.make_image(fill_color="black", back_color="white")
+
+# Global instance, shared by every CertificateGenerator in the process
+certificate_template = CertificateTemplate()
 
 class CertificateGenerator:
     def __init__(self):
+        self.template = certificate_template
         self.certificates_dir = os.path.join(os.path.dirname(__file__), '..', 'certificates')
         if not os.path.exists(self.certificates_dir):
             os.makedirs(self.certificates_dir)
@@ -29,20 +234,11 @@ class CertificateGenerator:
         unique_id = str(uuid.uuid4())[:8].upper()
         return f"SKILLNOVA-JAVA-{timestamp}-{unique_id}"
     
-    def create_qr_code(self, certificate_number, user_name, course_title):
+    def create_qr_code(self, certificate_number, user_name, course_title, issued_date):
         """Create QR code for certificate verification"""
-        verification_data = f"Certificate: {certificate_number}\nStudent: {user_name}\nCourse: {course_title}\nIssued: {datetime.now().strftime('%Y-%m-%d')}"
+        verification_data = f"Certificate: {certificate_number}\nStudent: {user_name}\nCourse: {course_title}\nIssued: {issued_date.strftime('%Y-%m-%d')}"
         
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=10,
-            border=4,
-        )
-        qr.add_data(verification_data)
-        qr.make(fit=True)
-        
-        qr_img = qr.make_image(fill_color="black", back_color="white")
+        qr_img = self.template.make_qr_image(verification_data)
         
         # Convert to bytes
         img_buffer = BytesIO()
@@ -141,136 +337,34 @@ class CertificateGenerator:
         
         return certificate_content
     
-    def create_certificate_pdf(self, user_name, course_title, certificate_number, final_score, completion_date):
+    def create_certificate_pdf(self, user_name, course_title, certificate_number, final_score, completion_date,
+                               issued_date):
         """Create a professional PDF certificate"""
         
         filename = f"certificate_{certificate_number}.pdf"
         filepath = os.path.join(self.certificates_dir, filename)
-        
-        # Create PDF document
-        doc = SimpleDocTemplate(filepath, pagesize=A4, 
-                              rightMargin=72, leftMargin=72,
-                              topMargin=72, bottomMargin=18)
-        
-        # Get styles
-        styles = getSampleStyleSheet()
-        
-        # Custom styles
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=28,
-            spaceAfter=30,
-            alignment=TA_CENTER,
-            textColor=colors.darkblue,
-            fontName='Helvetica-Bold'
-        )
-        
-        subtitle_style = ParagraphStyle(
-            'CustomSubtitle',
-            parent=styles['Heading2'],
-            fontSize=18,
-            spaceAfter=20,
-            alignment=TA_CENTER,
-            textColor=colors.darkgreen,
-            fontName='Helvetica-Bold'
-        )
-        
-        body_style = ParagraphStyle(
-            'CustomBody',
-            parent=styles['Normal'],
-            fontSize=12,
-            spaceAfter=12,
-            alignment=TA_CENTER,
-            fontName='Helvetica'
-        )
-        
-        name_style = ParagraphStyle(
-            'CustomName',
-            parent=styles['Normal'],
-            fontSize=24,
-            spaceAfter=20,
-            alignment=TA_CENTER,
-            textColor=colors.darkred,
-            fontName='Helvetica-Bold'
-        )
+        # Render to a temporary file and rename, so a concurrent download never sees a partial PDF
+        tmp_filepath = f"{filepath}.{uuid.uuid4().hex}.tmp"
         
         # Generate AI content
         ai_content = self.generate_ai_certificate_content(user_name, course_title, final_score, completion_date)
         
-        # Build certificate content
-        story = []
-        
-        # Header
-        story.append(Paragraph("CERTIFICATE OF COMPLETION", title_style))
-        story.append(Spacer(1, 20))
-        
-        # Subtitle
-        story.append(Paragraph("SkillNova Learning Platform", subtitle_style))
-        story.append(Spacer(1, 30))
-        
-        # Main content
-        story.append(Paragraph("This is to certify that", body_style))
-        story.append(Spacer(1, 10))
-        
-        # Student name
-        story.append(Paragraph(f"<u>{user_name}</u>", name_style))
-        story.append(Spacer(1, 20))
-        
-        # Course completion text
-        story.append(Paragraph(f"has successfully completed the course", body_style))
-        story.append(Spacer(1, 10))
-        
-        # Course title
-        story.append(Paragraph(f"<b>{course_title}</b>", subtitle_style))
-        story.append(Spacer(1, 20))
-        
-        # AI-generated performance message
-        story.append(Paragraph(f"{ai_content['performance_message']}", body_style))
-        story.append(Spacer(1, 15))
-        
-        # Special recognition for perfect scores
-        if ai_content.get('perfect_score', False):
-            perfect_style = ParagraphStyle(
-                'PerfectScore',
-                parent=styles['Normal'],
-                fontSize=14,
-                spaceAfter=15,
-                alignment=TA_CENTER,
-                textColor=colors.gold,
-                fontName='Helvetica-Bold'
-            )
-            story.append(Paragraph("🏆 PERFECT SCORE ACHIEVEMENT 🏆", perfect_style))
-            story.append(Spacer(1, 10))
-        
-        # Achievement details
-        story.append(Paragraph(f"<b>Achievement Level:</b> {ai_content['achievement_level']}", body_style))
-        story.append(Paragraph(f"<b>Final Score:</b> {final_score}%", body_style))
-        story.append(Paragraph(f"<b>Completion Date:</b> {completion_date.strftime('%B %d, %Y')}", body_style))
-        story.append(Spacer(1, 15))
-        
-        # AI Recognition
-        story.append(Paragraph(f"<i>{ai_content['ai_recognition']}</i>", body_style))
-        story.append(Spacer(1, 20))
-        
-        # Skills acquired
-        story.append(Paragraph("<b>Skills Mastered:</b>", body_style))
-        for skill in ai_content['skills_acquired']:
-            story.append(Paragraph(f"• {skill}", body_style))
-        
-        story.append(Spacer(1, 30))
-        
-        # Certificate details
-        story.append(Paragraph(f"<b>Certificate Number:</b> {certificate_number}", body_style))
-        story.append(Paragraph(f"<b>Issued Date:</b> {datetime.now().strftime('%B %d, %Y')}", body_style))
+        # Only the variable fields are built here; styles and static layers come from the template
+        story = self.template.build_story(user_name, course_title, certificate_number,
+                                          final_score, completion_date, issued_date, ai_content)
         
         # Build PDF
-        doc.build(story)
+        try:
+            self.template.render(tmp_filepath, story)
+            os.replace(tmp_filepath, filepath)
+        finally:
+            if os.path.exists(tmp_filepath):
+                os.remove(tmp_filepath)
         
         return filepath
     
-    def generate_certificate(self, user_name, course_title, final_score, completion_date=None):
-        """Main method to generate a complete certificate"""
+    def prepare_certificate(self, user_name, course_title, final_score, completion_date=None):
+        """Build the certificate number and data without rendering anything (fast, safe inside a transaction)"""
         
         if completion_date is None:
             completion_date = datetime.now()
@@ -278,16 +372,7 @@ class CertificateGenerator:
         # Generate certificate number
         certificate_number = self.generate_certificate_number()
         
-        # Create PDF certificate
-        pdf_path = self.create_certificate_pdf(
-            user_name, course_title, certificate_number, 
-            final_score, completion_date
-        )
-        
-        # Generate QR code
-        qr_code_buffer = self.create_qr_code(certificate_number, user_name, course_title)
-        
-        # Prepare certificate data
+        # Prepare certificate data; the QR code is added when the PDF is rendered
         certificate_data = {
             "certificate_number": certificate_number,
             "user_name": user_name,
@@ -302,10 +387,48 @@ class CertificateGenerator:
                 "Multithreading and Concurrency Management",
                 "Advanced Java Features and Lambda Expressions",
                 "Software Design Patterns Implementation"
-            ],
-            "verification_qr": base64.b64encode(qr_code_buffer.getvalue()).decode('utf-8')
+            ]
         }
         
+        return certificate_data
+    
+    def render_certificate(self, certificate_data, issued_at=None):
+        """
+        Render the PDF and QR code for prepared certificate data (slow, run outside the request).
+        The issue date printed and encoded is the one recorded at issue time, falling back to
+        issued_at (the certificate row's) for data prepared without one; never the render time.
+        """
+        
+        certificate_number = certificate_data["certificate_number"]
+        completion_date = datetime.fromisoformat(certificate_data["completion_date"])
+        issued_date = datetime.fromisoformat(certificate_data["issued_date"]) if certificate_data.get("issued_date") \
+            else issued_at or completion_date
+        
+        # Create PDF certificate, then move it into content-addressed storage
+        rendered_path = self.create_certificate_pdf(
+            certificate_data["user_name"], certificate_data["course_title"], certificate_number,
+            certificate_data["final_score"], completion_date, issued_date
+        )
+        content_hash = certificate_storage.put_file(rendered_path)
+        pdf_path = certificate_storage.local_path(content_hash)
+        
+        # Generate QR code
+        qr_code_buffer = self.create_qr_code(certificate_number, certificate_data["user_name"],
+                                             certificate_data["course_title"], issued_date)
+        
+        rendered_data = dict(certificate_data)
+        rendered_data["verification_qr"] = base64.b64encode(qr_code_buffer.getvalue()).decode('utf-8')
+        rendered_data["content_hash"] = content_hash
+        
+        return pdf_path, rendered_data
+    
+    def generate_certificate(self, user_name, course_title, final_score, completion_date=None):
+        """Main method to generate a complete certificate synchronously"""
+        
+        certificate_data = self.prepare_certificate(user_name, course_title, final_score, completion_date)
+        pdf_path, certificate_data = self.render_certificate(certificate_data)
+        certificate_number = certificate_data["certificate_number"]
+        
         return {
             "success": True,
             "certificate_number": certificate_number,
@@ -314,6 +437,24 @@ class CertificateGenerator:
             "message": f"Certificate generated successfully for {user_name}"
         }
 
+# Per-process generator for pool workers (see render_certificate_payload)
+_process_generator = None
+
+def init_render_process():
+    """Process-pool initializer: give the worker its own template, since a forked
+    child may inherit template locks held by threads of the parent"""
+    global certificate_template, _process_generator
+    certificate_template = CertificateTemplate()
+    _process_generator = None
+
+def render_certificate_payload(certificate_data):
+    """Process-pool entry point: render one prepared certificate and return its number, path and data"""
+    global _process_generator
+    if _process_generator is None:
+        _process_generator = CertificateGenerator()
+    pdf_path, rendered_data = _process_generator.render_certificate(certificate_data)
+    return certificate_data["certificate_number"], pdf_path, rendered_data
+
 # Test function
 if __name__ == "__main__":
     generator = CertificateGenerator()
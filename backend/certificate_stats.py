@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Certificate Statistics Service for SkillNova
+Per-user and platform-wide certificate statistics computed in the database with
+single aggregate queries using conditional counts
+"""
+
+from typing import Dict, Any
+from sqlalchemy import func, case
+from models import db, Course, Certificate
+
+class CertificateStatsService:
+    """Aggregate certificate statistics"""
+
+    # Achievement levels by minimum final score, highest first (below the last is 'Pass')
+    ACHIEVEMENT_LEVELS = (
+        ('Distinction', 90),
+        ('Merit', 80),
+        ('Credit', 70)
+    )
+
+    def _level_columns(self) -> list:
+        """One conditional count per achievement level, each score counted in exactly one level"""
+        columns = []
+        upper = None
+        for level, minimum in self.ACHIEVEMENT_LEVELS:
+            condition = Certificate.final_score >= minimum
+            if upper is not None:
+                condition = condition & (Certificate.final_score < upper)
+            columns.append(func.count(case((condition, 1))).label(level))
+            upper = minimum
+        columns.append(func.count(case((Certificate.final_score < upper, 1))).label('Pass'))
+        return columns
+
+    def _level_names(self) -> list:
+        return [level for level, _ in self.ACHIEVEMENT_LEVELS] + ['Pass']
+
+    def user_stats(self, user_id) -> Dict[str, Any]:
+        """Totals, average and achievement levels for one user's valid certificates"""
+        row = db.session.query(
+            func.count(Certificate.id),
+            func.avg(Certificate.final_score),
+            func.max(Certificate.issued_at),
+            *self._level_columns()
+        ).filter(
+            Certificate.user_id == user_id,
+            Certificate.is_valid == True
+        ).one()
+
+        total_certificates, average_score, latest_issued_at, *level_counts = row
+
+        return {
+            'total_certificates': total_certificates,
+            'average_score': round(float(average_score or 0), 1),
+            # Only levels actually achieved, as before
+            'achievement_levels': {level: count for level, count in zip(self._level_names(), level_counts) if count},
+            'latest_certificate': latest_issued_at.isoformat() if latest_issued_at else None
+        }
+
+    def platform_stats(self) -> Dict[str, Any]:
+        """Per-course certificate statistics plus platform totals, from one grouped query"""
+        level_names = self._level_names()
+        rows = db.session.query(
+            Course.id,
+            Course.title,
+            func.count(Certificate.id),
+            func.count(func.distinct(Certificate.user_id)),
+            func.avg(Certificate.final_score),
+            func.max(Certificate.issued_at),
+            func.count(case((Certificate.status == 'pending', 1))),
+            func.count(case((Certificate.status == 'failed', 1))),
+            *self._level_columns()
+        ).join(
+            Course, Course.id == Certificate.course_id
+        ).filter(
+            Certificate.is_valid == True
+        ).group_by(Course.id, Course.title).order_by(func.count(Certificate.id).desc()).all()
+
+        courses = []
+        totals = {'total_certificates': 0, 'pending_renders': 0, 'failed_renders': 0}
+        level_totals = {level: 0 for level in level_names}
+        score_sum = 0.0
+        latest = None
+
+        for course_id, title, count, learners, average_score, latest_issued_at, pending, failed, *level_counts in rows:
+            levels = dict(zip(level_names, level_counts))
+            courses.append({
+                'course_id': str(course_id),
+                'course_title': title,
+                'total_certificates': count,
+                'certified_learners': learners,
+                'average_score': round(float(average_score or 0), 1),
+                'achievement_levels': levels,
+                'latest_certificate': latest_issued_at.isoformat() if latest_issued_at else None,
+                'pending_renders': pending,
+                'failed_renders': failed
+            })
+
+            # Platform totals are folded from the per-course groups, not re-queried
+            totals['total_certificates'] += count
+            totals['pending_renders'] += pending
+            totals['failed_renders'] += failed
+            score_sum += float(average_score or 0) * count
+            for level, level_count in levels.items():
+                level_totals[level] += level_count
+            if latest_issued_at and (latest is None or latest_issued_at > latest):
+                latest = latest_issued_at
+
+        total = totals['total_certificates']
+        return {
+            **totals,
+            'courses_with_certificates': len(courses),
+            'average_score': round(score_sum / total, 1) if total else 0,
+            'achievement_levels': level_totals,
+            'latest_certificate': latest.isoformat() if latest else None,
+            'courses': courses
+        }
+
+# Global instance
+certificate_stats_service = CertificateStatsService()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Certificate Storage for SkillNova
+Content-addressed storage for rendered certificate PDFs behind a small backend
+interface (local sharded directories now, an object store later), plus cacheable
+download responses with ETag, Last-Modified and Range support
+"""
+
+import hashlib
+import os
+from abc import ABC, abstractmethod
+import uuid
+from typing import Optional, BinaryIO
+from flask import send_file
+
+class CertificateStorage(ABC):
+    """
+    Storage backend interface. Objects are immutable and keyed by the SHA-256 of their
+    content, so a key can be cached forever; re-rendering a certificate produces a new key.
+    """
+
+    # One year, the conventional maximum for immutable responses
+    IMMUTABLE_MAX_AGE = 31536000
+
+    @staticmethod
+    def content_key(content: bytes) -> str:
+        return hashlib.sha256(content).hexdigest()
+
+    @abstractmethod
+    def put(self, content: bytes) -> str:
+        """Store content and return its key"""
+
+    def put_file(self, path: str, remove_source: bool = True) -> str:
+        """Store a file's content and return its key"""
+        with open(path, 'rb') as f:
+            key = self.put(f.read())
+        if remove_source:
+            os.remove(path)
+        return key
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        """True if an object with this key is stored"""
+
+    @abstractmethod
+    def open(self, key: str) -> BinaryIO:
+        """Readable binary stream of the object"""
+
+    def local_path(self, key: str) -> Optional[str]:
+        """Filesystem path for the object, or None for remote backends"""
+        return None
+
+    def send(self, key: str, download_name: str, immutable: bool = False, private: bool = False):
+        """
+        Conditional download response: ETag is the content key, so If-None-Match / If-Range
+        and Range requests are answered without re-reading the PDF. With immutable=True
+        (the URL pins this exact content) caches may keep it for a year without revalidating.
+        """
+        path = self.local_path(key)
+        response = send_file(
+            path or self.open(key),
+            mimetype='application/pdf',
+            as_attachment=True,
+            download_name=download_name,
+            conditional=True,
+            etag=key
+        )
+
+        scope = 'private' if private else 'public'
+        if immutable:
+            response.headers['Cache-Control'] = f'{scope}, max-age={self.IMMUTABLE_MAX_AGE}, immutable'
+        else:
+            # Always revalidate; an unchanged certificate costs a 304
+            response.headers['Cache-Control'] = f'{scope}, no-cache'
+        return response
+
+class LocalShardedStorage(CertificateStorage):
+    """Objects stored as <root>/<ab>/<cd>/<sha256>.pdf"""
+
+    def __init__(self, root: str = None):
+        self.root = root or os.path.join(os.path.dirname(__file__), '..', 'certificates', 'store')
+
+    def local_path(self, key: str) -> str:
+        if len(key) != 64 or not all(c in '0123456789abcdef' for c in key):
+            raise ValueError(f"Invalid certificate storage key: {key}")
+        return os.path.join(self.root, key[:2], key[2:4], f"{key}.pdf")
+
+    def put(self, content: bytes) -> str:
+        key = self.content_key(content)
+        path = self.local_path(key)
+        if os.path.exists(path):
+            return key
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return key
+
+    def exists(self, key: str) -> bool:
+        return bool(key) and os.path.exists(self.local_path(key))
+
+    def open(self, key: str) -> BinaryIO:
+        return open(self.local_path(key), 'rb')
+
+# Global instance
+certificate_storage = LocalShardedStorage()
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Certificate Verification Service for SkillNova
+Serves the public verification endpoints (embedded in certificate QR codes) from an
+in-process LRU with a negative cache for unknown numbers, invalidated when a
+certificate is issued, revoked or deleted, and rate limits callers per IP
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Dict, Optional
+from flask import request, jsonify
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from models import db, User, Course, Certificate
+
+class TTLCache:
+    """Small thread-safe LRU with a fixed time-to-live per entry"""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return (found, value)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            return True, value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+class CertificateVerificationService:
+    """Cached lookups of valid certificates by number"""
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: int = 300, negative_ttl_seconds: int = 300):
+        # Valid certificates; the TTL bounds how long a revocation or rename committed by
+        # another process keeps verifying here, so it is no longer than the negative TTL
+        self.positive = TTLCache(max_entries, ttl_seconds)
+        # Unknown or revoked numbers, so repeated scans of a bad code stay off the database
+        self.negative = TTLCache(max_entries, negative_ttl_seconds)
+        self.hits = 0
+        self.misses = 0
+
+    def verify(self, certificate_number: str) -> Optional[Dict[str, Any]]:
+        """Return the public details of a valid certificate, or None if unknown or revoked"""
+        found, record = self.positive.get(certificate_number)
+        if not found:
+            found, record = self.negative.get(certificate_number)
+        if found:
+            self.hits += 1
+            return record
+
+        self.misses += 1
+        record = self._load(certificate_number)
+        if record is None:
+            self.negative.set(certificate_number, None)
+        else:
+            self.positive.set(certificate_number, record)
+        return record
+
+    def _load(self, certificate_number: str) -> Optional[Dict[str, Any]]:
+        row = db.session.query(
+            Certificate.certificate_number,
+            Certificate.final_score,
+            Certificate.issued_at,
+            User.name,
+            Course.title
+        ).join(User, User.id == Certificate.user_id
+        ).join(Course, Course.id == Certificate.course_id
+        ).filter(
+            Certificate.certificate_number == certificate_number,
+            Certificate.is_valid == True
+        ).first()
+
+        if row is None:
+            return None
+
+        return {
+            'certificate_number': row.certificate_number,
+            'student_name': row.name,
+            'course_title': row.title,
+            'final_score': row.final_score,
+            'issued_date': row.issued_at.isoformat()
+        }
+
+    def invalidate(self, certificate_number: str):
+        self.positive.pop(certificate_number)
+        self.negative.pop(certificate_number)
+
+    def clear(self):
+        self.positive.clear()
+        self.negative.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            'cached_valid': len(self.positive),
+            'cached_unknown': len(self.negative),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round((self.hits / total) * 100, 1) if total else 0
+        }
+
+class RateLimiter:
+    """Per-client token bucket: `capacity` requests in a burst, refilled at `refill_per_second`"""
+
+    def __init__(self, capacity: int = 30, refill_per_second: float = 0.5, max_clients: int = 50000):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.max_clients = max_clients
+        self._buckets: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def allow(self, client_key: str):
+        """Consume one token; returns (allowed, seconds until the next token)"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(client_key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - updated_at) * self.refill_per_second)
+
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+
+            self._buckets[client_key] = (tokens, now)
+            self._buckets.move_to_end(client_key)
+            while len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+
+        retry_after = 0 if allowed else (1 - tokens) / self.refill_per_second
+        return allowed, retry_after
+
+def rate_limited(limiter: RateLimiter):
+    """Route decorator answering 429 once the caller's IP exhausts its bucket"""
+    def decorator(f):
+        @wraps(f)
+        def rate_limited_function(*args, **kwargs):
+            allowed, retry_after = limiter.allow(request.remote_addr or 'unknown')
+            if not allowed:
+                response = jsonify({
+                    'success': False,
+                    'message': 'Too many verification requests. Please try again shortly.'
+                })
+                response.status_code = 429
+                response.headers['Retry-After'] = str(max(1, int(retry_after + 0.999)))
+                return response
+            return f(*args, **kwargs)
+        return rate_limited_function
+    return decorator
+
+# Global instances
+certificate_verification_service = CertificateVerificationService()
+verification_rate_limiter = RateLimiter()
+
+# Invalidation hooks: a certificate that is issued, revoked/restored or deleted drops its
+# positive and negative entries once the transaction commits
+
+@event.listens_for(Session, 'after_flush')
+def _collect_verification_invalidations(session, flush_context):
+    pending = session.info.setdefault('verification_invalidations', set())
+    for obj in session.new:
+        if isinstance(obj, Certificate):
+            pending.add(obj.certificate_number)
+    for obj in session.deleted:
+        if isinstance(obj, Certificate):
+            pending.add(obj.certificate_number)
+    for obj in session.dirty:
+        if isinstance(obj, Certificate):
+            state = inspect(obj)
+            if state.attrs.is_valid.history.has_changes() or state.attrs.certificate_number.history.has_changes():
+                pending.update(n for n in state.attrs.certificate_number.history.sum() if n)
+
+@event.listens_for(Session, 'after_commit')
+def _apply_verification_invalidations(session):
+    for certificate_number in session.info.pop('verification_invalidations', None) or ():
+        certificate_verification_service.invalidate(certificate_number)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_verification_invalidations(session):
+    session.info.pop('verification_invalidations', None)
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Certificate Render Worker for SkillNova
+Issues certificate records immediately and renders their PDFs on a background
+worker pool, with on-demand rendering when a pending certificate is downloaded
+"""
+
+import os
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from flask import current_app, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from models import db, Certificate
+from certificate_service import CertificateGenerator
+from certificate_storage import certificate_storage
+
+class CertificateRenderWorker:
+    """Background PDF rendering for issued certificates"""
+
+    RENDER_LOCK_STRIPES = 64
+
+    def __init__(self, max_workers: int = 2):
+        self.max_workers = max_workers
+        self.generator = CertificateGenerator()
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        # Striped by certificate number so the worker and a download never render the same PDF twice,
+        # with a fixed number of locks however many certificates are issued
+        self._render_locks = [threading.Lock() for _ in range(self.RENDER_LOCK_STRIPES)]
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix='certificate-render')
+            return self._executor
+
+    def _render_lock(self, certificate_number: str) -> threading.Lock:
+        return self._render_locks[zlib.crc32(certificate_number.encode('utf-8')) % self.RENDER_LOCK_STRIPES]
+
+    def issue_certificate(self, user_id, course_id, user_name, course_title, final_score, completion_date=None):
+        """
+        Add a pending certificate to the current session without rendering anything.
+        The PDF is queued for rendering once the surrounding transaction commits.
+        """
+        certificate_data = self.generator.prepare_certificate(user_name, course_title, final_score, completion_date)
+
+        certificate = Certificate(
+            user_id=user_id,
+            course_id=course_id,
+            certificate_number=certificate_data['certificate_number'],
+            final_score=final_score,
+            certificate_data=certificate_data,
+            status='pending',
+            is_valid=True
+        )
+        db.session.add(certificate)
+
+        pending = db.session.info.setdefault('certificates_to_render', [])
+        pending.append((current_app._get_current_object(), certificate.certificate_number))
+
+        return certificate
+
+    def submit(self, app, certificate_number: str):
+        """Queue a certificate for background rendering"""
+        return self._get_executor().submit(self._render_in_app, app, certificate_number)
+
+    def _render_in_app(self, app, certificate_number: str):
+        with app.app_context():
+            try:
+                self.render(certificate_number)
+            except Exception as e:
+                print(f"Certificate render error for {certificate_number}: {e}")
+            finally:
+                db.session.remove()
+
+    def is_rendered(self, certificate: Certificate) -> bool:
+        return certificate.status == 'ready' and certificate_storage.exists(certificate.content_hash)
+
+    def _adopt_legacy_pdf(self, certificate: Certificate) -> bool:
+        """Move a PDF rendered before content-addressed storage into the store"""
+        if certificate.content_hash or not certificate.pdf_path or not os.path.exists(certificate.pdf_path):
+            return False
+
+        certificate.content_hash = certificate_storage.put_file(certificate.pdf_path)
+        certificate.pdf_path = certificate_storage.local_path(certificate.content_hash)
+        certificate.status = 'ready'
+        certificate.rendered_at = certificate.rendered_at or datetime.utcnow()
+        db.session.commit()
+        return True
+
+    def render(self, certificate_number: str):
+        """Render a certificate's PDF if it is not already in storage; returns the certificate"""
+        with self._render_lock(certificate_number):
+            certificate = Certificate.query.filter_by(certificate_number=certificate_number).first()
+            if not certificate:
+                return None
+
+            # Re-read after acquiring the lock: another thread may have just rendered it
+            db.session.refresh(certificate)
+            if self.is_rendered(certificate) or self._adopt_legacy_pdf(certificate):
+                return certificate
+
+            try:
+                pdf_path, certificate_data = self.generator.render_certificate(certificate.certificate_data,
+                                                                               certificate.issued_at)
+            except Exception:
+                certificate.status = 'failed'
+                db.session.commit()
+                raise
+
+            certificate.pdf_path = pdf_path
+            certificate.content_hash = certificate_data['content_hash']
+            certificate.certificate_data = certificate_data
+            certificate.status = 'ready'
+            certificate.rendered_at = datetime.utcnow()
+            db.session.commit()
+
+            print(f"🎓 Certificate PDF rendered: {certificate_number}")
+            return certificate
+
+    def ensure_rendered(self, certificate: Certificate) -> Certificate:
+        """Download path: render synchronously if the PDF is pending, failed or missing from storage"""
+        if self.is_rendered(certificate):
+            return certificate
+        return self.render(certificate.certificate_number)
+
+    def download_response(self, certificate: Certificate, private: bool = False):
+        """
+        Cacheable PDF response for a certificate, regenerating it first if missing.
+        Download URLs carry ?v=<content hash>; a request pinned to the current hash is
+        served as immutable, anything else must revalidate against the ETag.
+        """
+        certificate = self.ensure_rendered(certificate)
+        if not certificate or not certificate_storage.exists(certificate.content_hash):
+            return None
+
+        return certificate_storage.send(
+            certificate.content_hash,
+            download_name=f"certificate_{certificate.certificate_number}.pdf",
+            immutable=request.args.get('v') == certificate.content_hash,
+            private=private
+        )
+
+    @staticmethod
+    def download_url(certificate: Certificate, base_url: str) -> str:
+        """Download URL pinned to the rendered content when it is known"""
+        url = f"{base_url}/{certificate.certificate_number}"
+        return f"{url}?v={certificate.content_hash}" if certificate.content_hash else url
+
+# Global instance
+certificate_render_worker = CertificateRenderWorker()
+
+# Queue renders only after the issuing transaction commits, so the worker can see the row
+
+@event.listens_for(Session, 'after_commit')
+def _submit_certificate_renders(session):
+    pending = session.info.pop('certificates_to_render', None)
+    for app, certificate_number in pending or []:
+        certificate_render_worker.submit(app, certificate_number)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_certificate_renders(session):
+    session.info.pop('certificates_to_render', None)
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Course Bulk Insert for SkillNova
+Persists a generated course's modules and questions with multi-row INSERT ... RETURNING
+statements (one per table) instead of one ORM unit-of-work INSERT per object
+"""
+
+from typing import Dict, List, Any
+from sqlalchemy import insert
+from models import db, Course, CourseModule, Question
+from question_dedup import question_scope, record_bulk_question_inserts
+from question_selection import mark_question_pools_stale
+
+class CourseBulkWriter:
+    """Bulk persistence for generated courses; the caller commits"""
+
+    def insert_rows(self, model, rows: List[Dict[str, Any]]) -> List[Any]:
+        """
+        Insert rows with one executemany INSERT ... RETURNING id (batched into multi-row
+        VALUES by SQLAlchemy), ids in input order. Python-side column defaults still apply.
+        """
+        if not rows:
+            return []
+        return db.session.scalars(
+            insert(model).returning(model.id, sort_by_parameter_order=True), rows
+        ).all()
+
+    def insert_modules(self, course_id, modules: List[Dict[str, Any]]) -> List[Any]:
+        return self.insert_rows(CourseModule, [
+            {
+                'course_id': course_id,
+                'title': module['title'],
+                'content': module.get('content', ''),
+                'order_index': module.get('order_index', i + 1)
+            }
+            for i, module in enumerate(modules)
+        ])
+
+    def insert_questions(self, course_id, questions: List[Dict[str, Any]], category: str = None) -> List[Any]:
+        question_ids = self.insert_rows(Question, [
+            {
+                'question_text': question['question_text'],
+                'question_type': question['question_type'],
+                'difficulty_level': question['difficulty_level'],
+                'category': question.get('category', category),
+                'course_id': course_id,
+                'correct_answer': question.get('correct_answer'),
+                'options': question.get('options')
+            }
+            for question in questions
+        ])
+
+        # Bulk INSERTs bypass the flush events the question caches listen to
+        if question_ids:
+            record_bulk_question_inserts(db.session, {
+                str(question_id): (question['question_text'], question_scope(course_id))
+                for question_id, question in zip(question_ids, questions)
+            })
+            mark_question_pools_stale(db.session)
+        return question_ids
+
+    def create_course(self, course_fields: Dict[str, Any], modules: List[Dict[str, Any]],
+                      questions: List[Dict[str, Any]] = ()) -> Dict[str, Any]:
+        """Course row through the ORM (so catalog caches see it), modules and questions in bulk"""
+        course = Course(**course_fields)
+        db.session.add(course)
+        db.session.flush()  # Get the course ID
+
+        module_ids = self.insert_modules(course.id, modules)
+        question_ids = self.insert_questions(course.id, list(questions), course_fields.get('title'))
+        return {
+            'course': course,
+            'module_ids': module_ids,
+            'question_ids': question_ids
+        }
+
+# Global instance
+course_bulk_writer = CourseBulkWriter()
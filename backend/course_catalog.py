@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Course Catalog Read Model for SkillNova
+The public course list built with one aggregate query (module counts without loading
+module bodies), serialized once per catalog version and served with an ETag so
+unchanged catalogs cost a 304
+"""
+
+import hashlib
+import json
+import threading
+import time
+from typing import Dict, Any, List, Optional
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+from models import db, Course, CourseModule, CourseRating
+
+# Writes to these models change what the catalog shows
+CATALOG_MODELS = (Course, CourseModule, CourseRating)
+
+class CourseCatalogCache:
+    """
+    In-process catalog snapshot stamped with a version that committed course, module and
+    rating writes bump. max_age_seconds bounds staleness from writes made by other processes.
+    """
+
+    def __init__(self, max_age_seconds: int = 60):
+        self.max_age_seconds = max_age_seconds
+        self.version = 0
+        # (version, built_at, courses, body, etag)
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    def bump(self):
+        with self._lock:
+            self.version += 1
+
+    def load_courses(self) -> List[Dict[str, Any]]:
+        """Active courses with their module counts in one query"""
+        module_counts = db.session.query(
+            CourseModule.course_id, func.count(CourseModule.id).label('modules_count')
+        ).group_by(CourseModule.course_id).subquery()
+
+        rows = db.session.query(
+            Course.id, Course.title, Course.description, Course.skill_level, Course.duration_weeks,
+            Course.cost, Course.is_locked, Course.average_rating, Course.total_ratings, Course.created_at,
+            func.coalesce(module_counts.c.modules_count, 0)
+        ).outerjoin(
+            module_counts, module_counts.c.course_id == Course.id
+        ).filter(Course.is_active == True).order_by(Course.created_at, Course.id).all()
+
+        return [
+            {
+                'id': str(course_id),
+                'title': title,
+                'description': description,
+                'skill_level': skill_level,
+                'duration_weeks': duration_weeks,
+                'modules_count': modules_count,
+                'cost': float(cost) if cost else 0.0,
+                'is_locked': is_locked or False,
+                # Keep rating for backward compatibility
+                'average_rating': average_rating or 0.0,
+                'total_ratings': total_ratings or 0,
+                'created_at': created_at.isoformat()
+            }
+            for (course_id, title, description, skill_level, duration_weeks, cost, is_locked,
+                 average_rating, total_ratings, created_at, modules_count) in rows
+        ]
+
+    def _current(self) -> Optional[tuple]:
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot and snapshot[0] == self.version and time.monotonic() - snapshot[1] < self.max_age_seconds:
+                return snapshot
+            return None
+
+    def snapshot(self):
+        """(courses, serialized response body, etag) for the current catalog version"""
+        snapshot = self._current()
+        if snapshot is None:
+            with self._lock:
+                version = self.version
+            courses = self.load_courses()
+            body = json.dumps({'success': True, 'courses': courses}, separators=(',', ':')).encode()
+            # Content hash, so every process agrees on the tag for the same catalog
+            etag = hashlib.sha1(body).hexdigest()
+            snapshot = (version, time.monotonic(), courses, body, etag)
+            with self._lock:
+                # A write committed during the build leaves the version ahead, so the next call rebuilds
+                self._snapshot = snapshot
+        return snapshot[2], snapshot[3], snapshot[4]
+
+    def courses(self) -> List[Dict[str, Any]]:
+        return self.snapshot()[0]
+
+# Global instance
+course_catalog_cache = CourseCatalogCache()
+
+# Bump the catalog version once a course, module or rating write commits
+
+@event.listens_for(Session, 'after_flush')
+def _collect_catalog_changes(session, flush_context):
+    if any(isinstance(obj, CATALOG_MODELS) for obj in (*session.new, *session.dirty, *session.deleted)):
+        session.info['course_catalog_stale'] = True
+
+@event.listens_for(Session, 'after_commit')
+def _apply_catalog_changes(session):
+    if session.info.pop('course_catalog_stale', False):
+        course_catalog_cache.bump()
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_catalog_changes(session):
+    session.info.pop('course_catalog_stale', None)
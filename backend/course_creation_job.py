@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Course Creation Job Service for SkillNova
+Runs AI course generation and the inserts for POST /api/admin/courses in a background
+thread, reporting per-module progress while the request returns immediately
+"""
+
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+from flask import current_app
+from models import db
+from ai_course_generator import ai_course_generator
+from course_bulk_insert import course_bulk_writer
+from question_dedup import question_duplicate_index
+
+class CourseCreationJobService:
+    """In-memory course creation jobs; the most recent MAX_JOBS are kept for polling"""
+
+    MAX_JOBS = 100
+
+    def __init__(self):
+        self._jobs: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def start_job(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Queue generation of a course from the validated create-course payload"""
+        modules_count = int(data.get('modules_count', 8))
+        now = datetime.utcnow().isoformat()
+        job = {
+            'job_id': uuid.uuid4().hex,
+            'status': 'queued',
+            'stage': 'queued',
+            'title': data['title'],
+            'skill_level': data['skill_level'].capitalize(),
+            # Content and questions for every module, then one step to save the course
+            'steps_done': 0,
+            'steps_total': 2 * modules_count + 1,
+            'course': None,
+            'ai_generated_content': None,
+            'error': None,
+            'created_at': now,
+            'updated_at': now
+        }
+
+        with self._lock:
+            self._jobs[job['job_id']] = job
+            while len(self._jobs) > self.MAX_JOBS:
+                self._jobs.popitem(last=False)
+
+        app = current_app._get_current_object()
+        threading.Thread(target=self._run, args=(app, job['job_id'], dict(data)), daemon=True,
+                         name=f"course-creation-{job['job_id'][:8]}").start()
+        return self.public_view(job)
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        return self.public_view(job) if job else None
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [self.public_view(job) for job in reversed(jobs)]
+
+    def public_view(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        view = dict(job)
+        view['progress_percentage'] = round((job['steps_done'] / job['steps_total']) * 100, 1) if job['steps_total'] else 0
+        return view
+
+    # Job execution
+
+    def _update(self, job: Dict[str, Any], **fields):
+        with self._lock:
+            job.update(fields)
+            job['updated_at'] = datetime.utcnow().isoformat()
+
+    def _run(self, app, job_id: str, data: Dict[str, Any]):
+        job = self._jobs[job_id]
+
+        def progress(stage: str, done: int, total: int):
+            # Modules are generated first, then their questions
+            offset = 0 if stage == 'modules' else total
+            self._update(job, stage=stage, steps_done=offset + done, steps_total=2 * total + 1)
+
+        with app.app_context():
+            try:
+                self._update(job, status='running', stage='modules')
+                course_content = ai_course_generator.generate_complete_course(
+                    course_title=data['title'],
+                    skill_level=data['skill_level'].capitalize(),
+                    duration_weeks=data.get('duration_weeks', 8),
+                    modules_count=data.get('modules_count', 8),
+                    progress=progress
+                )
+                print(f"✅ AI generated course with {len(course_content['modules'])} modules and {len(course_content['questions'])} questions")
+
+                self._update(job, stage='saving')
+                course, questions_created = self._save_course(data, course_content)
+
+                self._update(
+                    job,
+                    status='completed',
+                    stage='completed',
+                    steps_done=job['steps_total'],
+                    course={
+                        'id': str(course.id),
+                        'title': course.title,
+                        'description': course.description,
+                        'skill_level': course.skill_level,
+                        'duration_weeks': course.duration_weeks,
+                        'modules_count': len(course_content['modules']),
+                        'questions_count': len(course_content['questions']),
+                        'created_at': course.created_at.isoformat()
+                    },
+                    ai_generated_content={
+                        'modules': len(course_content['modules']),
+                        'questions': questions_created,
+                        'learning_path': course_content['learning_path'],
+                        'assessments': len(course_content['assessments']),
+                        'completion_criteria': course_content['completion_criteria']
+                    }
+                )
+                print(f"🚀 Course created successfully: {course.title} with {len(course_content['modules'])} modules")
+            except Exception as e:
+                db.session.rollback()
+                self._update(job, status='failed', error=str(e))
+                print(f"❌ Error creating course: {str(e)}")
+                import traceback
+                traceback.print_exc()
+            finally:
+                db.session.remove()
+
+    def _save_course(self, data: Dict[str, Any], course_content: Dict[str, Any]):
+        """Insert the course, its modules and (if requested) its non-duplicate questions in one transaction"""
+        questions = []
+        if data.get('generate_questions', False) and course_content['questions']:
+            # The course is new, so its questions can only repeat each other
+            duplicates = question_duplicate_index.batch(check_bank=False)
+            questions = [question_data for question_data in course_content['questions']
+                         if duplicates.accept(question_data['question_text'])]
+
+        created = course_bulk_writer.create_course(
+            {
+                'title': data['title'],
+                'description': data.get('description') or course_content['course_info'].get('description', f"Comprehensive {data['title']} course with AI-generated content"),
+                'skill_level': data['skill_level'].capitalize(),
+                'duration_weeks': data.get('duration_weeks', 8)
+            },
+            course_content['modules'],
+            questions
+        )
+
+        db.session.commit()
+        return created['course'], len(created['question_ids'])
+
+# Global instance
+course_creation_job_service = CourseCreationJobService()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Precompiled keyword matcher
+Counts keyword hits for many keyword groups in a single pass over the text
+"""
+
+from typing import Dict, List, Set, FrozenSet
+
+class KeywordMatcher:
+    """
+    Substring matcher over groups of keywords (e.g. skill categories).
+
+    A keyword without whitespace can only occur inside one whitespace-delimited token,
+    so the text is scanned once, token by token, and the keywords contained in each
+    distinct token are memoized. Multi-word keywords are checked directly against the
+    text. Results are identical to testing `keyword in text` for every keyword.
+    """
+
+    # Bound on memoized tokens; the memo is simply reset when it grows past this
+    MAX_CACHED_TOKENS = 50000
+
+    def __init__(self, keyword_groups: Dict[str, List[str]]):
+        self.group_order = list(keyword_groups.keys())
+        self.keyword_to_groups = {}
+
+        for group, keywords in keyword_groups.items():
+            for keyword in keywords:
+                keyword = keyword.lower()
+                groups = self.keyword_to_groups.setdefault(keyword, [])
+                if keyword and group not in groups:
+                    groups.append(group)
+
+        self.keyword_to_groups.pop('', None)
+        self.group_index = {group: index for index, group in enumerate(self.group_order)}
+        self.token_keywords = [k for k in self.keyword_to_groups if not any(c.isspace() for c in k)]
+        self.phrase_keywords = [k for k in self.keyword_to_groups if any(c.isspace() for c in k)]
+        self._token_cache: Dict[str, FrozenSet[str]] = {}
+
+    def _keywords_in_token(self, token: str) -> FrozenSet[str]:
+        cached = self._token_cache.get(token)
+        if cached is None:
+            if len(self._token_cache) >= self.MAX_CACHED_TOKENS:
+                self._token_cache.clear()
+            cached = frozenset(k for k in self.token_keywords if k in token)
+            self._token_cache[token] = cached
+        return cached
+
+    def matched_keywords(self, text: str) -> Set[str]:
+        """Return every keyword that occurs in text"""
+        found = set()
+        if not text:
+            return found
+
+        text = text.lower()
+        cache_get = self._token_cache.get
+        for token in set(text.split()):
+            keywords = cache_get(token)
+            if keywords is None:
+                keywords = self._keywords_in_token(token)
+            if keywords:
+                found |= keywords
+        for phrase in self.phrase_keywords:
+            if phrase in text:
+                found.add(phrase)
+        return found
+
+    def count(self, text: str) -> Dict[str, int]:
+        """Return {group: number of distinct group keywords found in text} for every group"""
+        counts = {group: 0 for group in self.group_order}
+        for keyword in self.matched_keywords(text):
+            for group in self.keyword_to_groups[keyword]:
+                counts[group] += 1
+        return counts
+
+    def matching_groups(self, text: str) -> List[str]:
+        """Return groups with at least one keyword in text, in declaration order"""
+        counts = self.count(text)
+        return [group for group in self.group_order if counts[group] > 0]
+
+    def first_match(self, text: str):
+        """Return the first group (in declaration order) with a keyword in text, or None"""
+        indices = [self.group_index[group]
+                   for keyword in self.matched_keywords(text)
+                   for group in self.keyword_to_groups[keyword]]
+        return self.group_order[min(indices)] if indices else None
+
+    def has_any(self, text: str) -> bool:
+        """Return True if any keyword occurs in text"""
+        return bool(self.matched_keywords(text))
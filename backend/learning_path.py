@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Learning Path Read Model for SkillNova
+A course's learning path (modules, module tests and final project) is assembled from one
+joined query and cached per course; a learner's completion state and final project status
+come from one more query and are overlaid on a copy of the cached path
+"""
+
+import threading
+import time
+from typing import Dict, Any, Optional
+from sqlalchemy import and_, event, func
+from sqlalchemy.orm import Session
+from models import (db, Course, CourseModule, ModuleTest, CourseFinalProject, CourseEnrollment,
+                    ModuleCompletion, UserFinalProjectSubmission)
+
+# Writes to these models change the course part of a learning path
+LEARNING_PATH_MODELS = (Course, CourseModule, ModuleTest, CourseFinalProject)
+
+PREVIEW_LENGTH = 200
+
+class LearningPathReadModel:
+    """
+    Per-course learning path cache stamped with a version that committed course, module,
+    module test and final project writes bump. max_age_seconds bounds staleness from writes
+    made by other processes.
+    """
+
+    def __init__(self, max_age_seconds: int = 300, max_courses: int = 500):
+        self.max_age_seconds = max_age_seconds
+        self.max_courses = max_courses
+        self.version = 0
+        # course id -> (version, built_at, path)
+        self._paths: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def bump(self):
+        with self._lock:
+            self.version += 1
+            self._paths.clear()
+
+    def load_course_path(self, course_id) -> Optional[Dict[str, Any]]:
+        """Course, active modules with content preview, active module tests and active final projects in one query"""
+        rows = db.session.query(
+            Course.id, Course.title, Course.skill_level, Course.duration_weeks,
+            CourseModule.id, CourseModule.title, CourseModule.order_index,
+            func.substr(CourseModule.content, 1, PREVIEW_LENGTH + 1),
+            ModuleTest.id, ModuleTest.title, ModuleTest.duration_minutes, ModuleTest.passing_score,
+            CourseFinalProject.id, CourseFinalProject.title, CourseFinalProject.passing_percentage
+        ).outerjoin(
+            CourseModule, and_(CourseModule.course_id == Course.id, CourseModule.is_active == True)
+        ).outerjoin(
+            ModuleTest, and_(ModuleTest.module_id == CourseModule.id, ModuleTest.is_active == True)
+        ).outerjoin(
+            CourseFinalProject, and_(CourseFinalProject.course_id == Course.id, CourseFinalProject.is_active == True)
+        ).filter(
+            Course.id == course_id
+        ).order_by(
+            CourseModule.order_index, CourseModule.id, ModuleTest.created_at, CourseFinalProject.created_at
+        ).all()
+
+        if not rows:
+            return None
+
+        course = {
+            'id': str(rows[0][0]),
+            'title': rows[0][1],
+            'skill_level': rows[0][2],
+            'duration_weeks': rows[0][3]
+        }
+        modules = {}
+        final_projects = {}
+        for (_, _, _, _, module_id, module_title, order_index, content,
+             test_id, test_title, test_minutes, test_passing, project_id, project_title, project_passing) in rows:
+            if module_id is not None and module_id not in modules:
+                content = content or ''
+                modules[module_id] = {
+                    'id': str(module_id),
+                    'title': module_title,
+                    'order_index': order_index,
+                    'content': content[:PREVIEW_LENGTH] + '...' if len(content) > PREVIEW_LENGTH else content,
+                    'tests': {}
+                }
+            if test_id is not None:
+                modules[module_id]['tests'][test_id] = {
+                    'id': str(test_id),
+                    'title': test_title,
+                    'duration_minutes': test_minutes,
+                    'passing_score': test_passing
+                }
+            if project_id is not None and project_id not in final_projects:
+                final_projects[project_id] = {
+                    'id': str(project_id),
+                    'title': project_title,
+                    'passing_percentage': project_passing
+                }
+
+        module_list = list(modules.values())
+        for module in module_list:
+            module['tests'] = list(module['tests'].values())
+
+        # Imported here; the generator pulls in the AI stack
+        from ai_course_generator import ai_course_generator
+
+        learning_path = ai_course_generator._generate_learning_path(course['title'], course['skill_level'], module_list)
+        for step, module in zip(learning_path['learning_sequence'], module_list):
+            step['module_id'] = module['id']
+            step['module_tests'] = module['tests']
+        final_project_list = list(final_projects.values())
+        learning_path['final_project'] = final_project_list[0] if final_project_list else None
+
+        course['modules_count'] = len(module_list)
+        return {'course': course, 'learning_path': learning_path}
+
+    def course_path(self, course_id) -> Optional[Dict[str, Any]]:
+        """Cached {'course', 'learning_path'} for a course, or None if the course does not exist"""
+        key = str(course_id)
+        with self._lock:
+            version = self.version
+            entry = self._paths.get(key)
+            if entry and entry[0] == version and time.monotonic() - entry[1] < self.max_age_seconds:
+                return entry[2]
+
+        path = self.load_course_path(course_id)
+        if path is not None:
+            with self._lock:
+                if len(self._paths) >= self.max_courses:
+                    self._paths.pop(next(iter(self._paths)))
+                # A write committed during the build leaves the version ahead, so the next call rebuilds
+                self._paths[key] = (version, time.monotonic(), path)
+        return path
+
+    @staticmethod
+    def load_user_state(user_id, course_id) -> Optional[Dict[str, Any]]:
+        """Enrollment, completed module ids and final project submission in one query; None if not enrolled"""
+        rows = db.session.query(
+            CourseEnrollment, ModuleCompletion.module_id,
+            UserFinalProjectSubmission.status, UserFinalProjectSubmission.completion_percentage,
+            UserFinalProjectSubmission.created_at
+        ).outerjoin(
+            ModuleCompletion, ModuleCompletion.enrollment_id == CourseEnrollment.id
+        ).outerjoin(
+            UserFinalProjectSubmission, and_(UserFinalProjectSubmission.user_id == CourseEnrollment.user_id,
+                                             UserFinalProjectSubmission.course_id == CourseEnrollment.course_id)
+        ).filter(
+            CourseEnrollment.user_id == user_id,
+            CourseEnrollment.course_id == course_id
+        ).all()
+
+        if not rows:
+            return None
+
+        completed = {str(module_id) for _, module_id, _, _, _ in rows if module_id is not None}
+        submissions = sorted({(created_at, status, percentage) for _, _, status, percentage, created_at in rows
+                              if created_at is not None}, key=lambda submission: submission[0])
+        submission = submissions[-1] if submissions else None
+        return {
+            'enrollment': rows[0][0],
+            'completed_module_ids': completed,
+            'final_project': {'status': submission[1], 'completion_percentage': submission[2] or 0.0}
+                             if submission else None
+        }
+
+    def user_path(self, course_path: Dict[str, Any], user_state: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy of the cached learning path with the learner's completion state overlaid"""
+        from progress_buffer import progress_write_buffer
+
+        enrollment = user_state['enrollment']
+        completed = user_state['completed_module_ids']
+        learning_path = dict(course_path['learning_path'])
+        learning_path['learning_sequence'] = [
+            dict(step, completed=step['module_id'] in completed) for step in learning_path['learning_sequence']
+        ]
+        if learning_path['final_project']:
+            learning_path['final_project'] = dict(learning_path['final_project'],
+                                                  submission=user_state['final_project'])
+
+        learning_path['user_progress'] = {
+            'enrollment_date': enrollment.enrolled_at.isoformat(),
+            'progress_percentage': progress_write_buffer.progress(enrollment),
+            'status': enrollment.status,
+            'completed_at': enrollment.completed_at.isoformat() if enrollment.completed_at else None,
+            'completed_modules': sum(1 for step in learning_path['learning_sequence'] if step['completed']),
+            'final_project': user_state['final_project']
+        }
+        return learning_path
+
+# Global instance
+learning_path_read_model = LearningPathReadModel()
+
+# Drop cached learning paths once a course, module, module test or final project write commits
+
+@event.listens_for(Session, 'after_flush')
+def _collect_learning_path_changes(session, flush_context):
+    if any(isinstance(obj, LEARNING_PATH_MODELS) for obj in (*session.new, *session.dirty, *session.deleted)):
+        session.info['learning_paths_stale'] = True
+
+@event.listens_for(Session, 'after_commit')
+def _apply_learning_path_changes(session):
+    if session.info.pop('learning_paths_stale', False):
+        learning_path_read_model.bump()
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_learning_path_changes(session):
+    session.info.pop('learning_paths_stale', None)
@@ -59,7 +59,7 @@ class Course(db.Model):
     
     id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     title = db.Column(db.String(200), nullable=False)
-    description = db.Column(db.Text)
+    description = db.deferred(db.Column(db.Text))  # Deferred; see summary_queries
     skill_level = db.Column(db.String(50), nullable=False)  # Beginner, Intermediate, Advanced
     duration_weeks = db.Column(db.Integer)
     is_active = db.Column(db.Boolean, default=True)
@@ -85,7 +85,7 @@ class CourseModule(db.Model):
     id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     course_id = db.Column(UUID(as_uuid=True), db.ForeignKey('courses.id'), nullable=False)
     title = db.Column(db.String(200), nullable=False)
-    content = db.Column(db.Text)
+    content = db.deferred(db.Column(db.Text))  # Deferred; see summary_queries
     order_index = db.Column(db.Integer, nullable=False)
     is_active = db.Column(db.Boolean, default=True)
 
@@ -104,6 +104,17 @@ class CourseEnrollment(db.Model):
     final_project_completion_percentage = db.Column(db.Float, default=0.0)
     course_unlocked = db.Column(db.Boolean, default=True)  # FALSE if final project < 75%
 
+class ModuleCompletion(db.Model):
+    __tablename__ = 'module_completions'
+    __table_args__ = (
+        db.UniqueConstraint('enrollment_id', 'module_id', name='unique_enrollment_module_completion'),
+    )
+    
+    id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    enrollment_id = db.Column(UUID(as_uuid=True), db.ForeignKey('course_enrollments.id', ondelete='CASCADE'), nullable=False)
+    module_id = db.Column(UUID(as_uuid=True), db.ForeignKey('course_modules.id', ondelete='CASCADE'), nullable=False)
+    completed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
 class CourseRating(db.Model):
     __tablename__ = 'course_ratings'
     
@@ -169,6 +180,19 @@ class Assessment(db.Model):
     time_taken_minutes = db.Column(db.Integer)
     completed_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+class AssessmentSession(db.Model):
+    __tablename__ = 'assessment_sessions'
+    
+    id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = db.Column(UUID(as_uuid=True), db.ForeignKey('users.id'), nullable=False)
+    assessment_type = db.Column(db.String(50), nullable=False)  # ai_personalized, database
+    questions_order = db.Column(db.JSON, nullable=False)  # {'question_ids': [...], 'answer_key': {...}} as served; never sent to the client
+    user_profile = db.Column(db.JSON)  # Profile the questions were generated from, reused for recommendations at submit
+    status = db.Column(db.String(20), default='served')  # served, submitted
+    assessment_id = db.Column(UUID(as_uuid=True), db.ForeignKey('assessments.id'), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    submitted_at = db.Column(db.DateTime)
+
 class Question(db.Model):
     __tablename__ = 'questions'
     
@@ -181,7 +205,7 @@ class Question(db.Model):
     module_id = db.Column(UUID(as_uuid=True), db.ForeignKey('course_modules.id'), nullable=True)
     correct_answer = db.Column(db.Text)
     options = db.Column(db.JSON)  # For multiple choice questions
-    explanation = db.Column(db.Text)  # Explanation for the correct answer
+    explanation = db.deferred(db.Column(db.Text))  # Explanation for the correct answer (deferred)
     is_active = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
@@ -254,6 +278,9 @@ class Certificate(db.Model):
     issued_at = db.Column(db.DateTime, default=datetime.utcnow)
     certificate_data = db.Column(db.JSON)  # Store certificate details for AI generation
     pdf_path = db.Column(db.String(500))  # Path to generated PDF certificate
+    content_hash = db.Column(db.String(64))  # SHA-256 of the PDF, its key in certificate storage
+    status = db.Column(db.String(20), default='pending')  # pending, ready, failed (PDF render state)
+    rendered_at = db.Column(db.DateTime)
     is_valid = db.Column(db.Boolean, default=True)
     
     # Relationships
@@ -368,7 +395,7 @@ class WeeklyEvaluationAttempt(db.Model):
     earned_points = db.Column(db.Integer)
     time_taken_minutes = db.Column(db.Integer)
     status = db.Column(db.String(50), default='in_progress')  # in_progress, completed, auto_submitted
-    ai_evaluation_results = db.Column(db.JSON)  # Store AI evaluation details
+    ai_evaluation_results = db.deferred(db.Column(db.JSON))  # Store AI evaluation details (deferred)
     started_at = db.Column(db.DateTime, default=datetime.utcnow)
     completed_at = db.Column(db.DateTime)
     
@@ -457,7 +484,7 @@ class UserFinalProjectSubmission(db.Model):
     user_id = db.Column(UUID(as_uuid=True), db.ForeignKey('users.id'), nullable=False)
     course_id = db.Column(UUID(as_uuid=True), db.ForeignKey('courses.id'), nullable=False)
     final_project_id = db.Column(UUID(as_uuid=True), db.ForeignKey('course_final_projects.id'), nullable=False)
-    submission_data = db.Column(db.JSON)  # Store project files, code, etc.
+    submission_data = db.deferred(db.Column(db.JSON))  # Store project files, code, etc. (deferred)
     completion_percentage = db.Column(db.Float, default=0.0)
     mentor_feedback = db.Column(db.Text)
     mentor_score = db.Column(db.Float)
@@ -469,4 +496,17 @@ class UserFinalProjectSubmission(db.Model):
     
     # Relationships
     user = db.relationship('User', backref='final_project_submissions')
-    course = db.relationship('Course', backref='final_project_submissions')
\ No newline at end of file
+    course = db.relationship('Course', backref='final_project_submissions')
+
+
+class UserProfileAnalysis(db.Model):
+    __tablename__ = 'user_profile_analyses'
+    
+    id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = db.Column(UUID(as_uuid=True), db.ForeignKey('users.id'), unique=True, nullable=False)
+    version_hash = db.Column(db.String(64), nullable=False)  # Hash of bio data + assessment scores used for the analysis
+    analysis = db.Column(db.JSON, nullable=False)  # Output of ai_engine.analyze_user_profile
+    computed_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    # Relationships
+    user = db.relationship('User', backref=db.backref('profile_analysis', uselist=False, cascade='all, delete-orphan'))
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Module Progress Service for SkillNova
+Idempotent module completion: one module_completions row per (enrollment, module), with
+course progress computed from the completions of modules that are still active
+"""
+
+from typing import Dict, Any
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from models import db, CourseEnrollment, CourseModule, ModuleCompletion
+from progress_buffer import progress_write_buffer
+
+class ModuleProgressService:
+    """Records module completions and derives enrollment progress from them"""
+
+    @staticmethod
+    def total_modules(course_id) -> int:
+        return db.session.query(func.count(CourseModule.id)).filter(
+            CourseModule.course_id == course_id,
+            CourseModule.is_active == True
+        ).scalar() or 0
+
+    @staticmethod
+    def completed_modules(enrollment_id) -> int:
+        """
+        Completed modules that are still active, counted over the (enrollment_id, module_id)
+        unique index; deleted modules lose their rows by cascade, deactivated ones drop out here
+        """
+        return db.session.query(func.count(ModuleCompletion.id)).join(
+            CourseModule, CourseModule.id == ModuleCompletion.module_id
+        ).filter(
+            ModuleCompletion.enrollment_id == enrollment_id,
+            CourseModule.is_active == True
+        ).scalar() or 0
+
+    def record_completion(self, enrollment: CourseEnrollment, module_id) -> bool:
+        """
+        Insert the completion row; False (and nothing changed) if the module was already
+        completed. The unique key settles concurrent repeats.
+        """
+        try:
+            with db.session.begin_nested():
+                db.session.add(ModuleCompletion(enrollment_id=enrollment.id, module_id=module_id))
+        except IntegrityError:
+            return False
+        return True
+
+    def complete_module(self, enrollment: CourseEnrollment, module: CourseModule) -> Dict[str, Any]:
+        """
+        Record the completion and update progress_percentage; the caller commits.
+        Progress set before completions were tracked is kept as a floor for display; callers
+        gate course completion on all_completed, which needs a row for every active module.
+        """
+        newly_completed = self.record_completion(enrollment, module.id)
+        total_modules = self.total_modules(module.course_id)
+        completed_modules = self.completed_modules(enrollment.id)
+
+        percentage = (completed_modules / total_modules * 100.0) if total_modules > 0 else 0.0
+        # A buffered player ping is folded in here and written through with the completion
+        buffered = progress_write_buffer.discard(enrollment.id)
+        all_completed = total_modules > 0 and completed_modules >= total_modules
+        percentage = max(enrollment.progress_percentage or 0.0, buffered or 0.0, percentage)
+        enrollment.progress_percentage = percentage
+
+        return {
+            'newly_completed': newly_completed,
+            'completed_modules': completed_modules,
+            'total_modules': total_modules,
+            'percentage': percentage,
+            'all_completed': all_completed
+        }
+
+# Global instance
+module_progress_service = ModuleProgressService()
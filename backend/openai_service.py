@@ -1,93 +1,386 @@
 """
 Google Gemini AI Service - Free AI Integration
+Async API with per-call deadlines, a global limit on concurrent upstream calls and
+token-bucket rate limiting; the blocking methods are thin wrappers around it.
+A circuit breaker stops calling Gemini while it is failing or slow, so callers go
+straight to their template fallbacks.
 """
 import os
+import asyncio
+import threading
+import time
+from collections import deque
 from google import genai
 from google.genai import types
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Callable
 import json
 
+class AsyncTokenBucket:
+    """`capacity` calls in a burst, refilled at `rate_per_second`; acquire() waits for a token"""
+
+    def __init__(self, rate_per_second: float, capacity: int):
+        self.rate_per_second = rate_per_second
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate_per_second)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate_per_second)
+
+class CircuitBreaker:
+    """
+    closed -> open when, over the last `window_seconds` (at least `min_calls` calls), the share
+    of failed calls reaches `error_rate_threshold` or the share of calls slower than
+    `slow_call_seconds` reaches `slow_call_rate_threshold`. After `cooldown_seconds` one probe
+    call is let through (half_open): success closes the breaker, failure reopens it.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, window_seconds: float = 60, min_calls: int = 5, error_rate_threshold: float = 0.5,
+                 slow_call_seconds: float = 8, slow_call_rate_threshold: float = 0.8,
+                 cooldown_seconds: float = 30):
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.error_rate_threshold = error_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.cooldown_seconds = cooldown_seconds
+
+        self.state = self.CLOSED
+        self.opened_at = None
+        self.probe_in_flight = False
+        self._calls = deque()  # (finished_at, succeeded, latency_seconds)
+        self._lock = threading.Lock()
+
+        self.total_calls = 0
+        self.total_failures = 0
+        self.rejected_calls = 0
+        self.times_opened = 0
+        self.last_error = None
+
+    def _prune(self, now: float):
+        while self._calls and now - self._calls[0][0] > self.window_seconds:
+            self._calls.popleft()
+
+    def _open(self, now: float, reason: str):
+        self.state = self.OPEN
+        self.opened_at = now
+        self.probe_in_flight = False
+        self.times_opened += 1
+        print(f"⚡ Gemini circuit breaker opened: {reason}")
+
+    def is_open(self) -> bool:
+        """True while calls would be rejected; does not claim the half-open probe"""
+        with self._lock:
+            if self.state == self.OPEN:
+                return time.monotonic() - self.opened_at < self.cooldown_seconds
+            return self.state == self.HALF_OPEN and self.probe_in_flight
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.cooldown_seconds:
+                    self.rejected_calls += 1
+                    return False
+                self.state = self.HALF_OPEN
+                self.probe_in_flight = False
+            if self.state == self.HALF_OPEN:
+                if self.probe_in_flight:
+                    self.rejected_calls += 1
+                    return False
+                self.probe_in_flight = True
+            return True
+
+    def record(self, succeeded: bool, latency_seconds: float, error: str = None):
+        now = time.monotonic()
+        with self._lock:
+            self.total_calls += 1
+            if not succeeded:
+                self.total_failures += 1
+                self.last_error = error
+            slow = latency_seconds >= self.slow_call_seconds
+
+            if self.state == self.HALF_OPEN:
+                if succeeded and not slow:
+                    self.state = self.CLOSED
+                    self.probe_in_flight = False
+                    self._calls.clear()
+                    print("✅ Gemini circuit breaker closed")
+                else:
+                    self._open(now, 'recovery probe failed' if not succeeded else 'recovery probe was slow')
+                return
+            if self.state == self.OPEN:
+                # A call started before the breaker opened
+                return
+
+            self._calls.append((now, succeeded, latency_seconds))
+            self._prune(now)
+            count = len(self._calls)
+            if count < self.min_calls:
+                return
+            failures = sum(1 for _, ok, _ in self._calls if not ok)
+            slow_calls = sum(1 for _, _, latency in self._calls if latency >= self.slow_call_seconds)
+            if failures / count >= self.error_rate_threshold:
+                self._open(now, f"{failures}/{count} calls failed, last error: {self.last_error}")
+            elif slow_calls / count >= self.slow_call_rate_threshold:
+                self._open(now, f"{slow_calls}/{count} calls slower than {self.slow_call_seconds}s")
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.monotonic()
+            self._prune(now)
+            latencies = sorted(latency for _, _, latency in self._calls)
+            count = len(self._calls)
+            return {
+                'state': self.state,
+                'open_for_seconds': round(now - self.opened_at, 1) if self.state != self.CLOSED else 0,
+                'window_calls': count,
+                'window_error_rate': round(sum(1 for _, ok, _ in self._calls if not ok) / count, 3) if count else 0,
+                'window_p50_latency_ms': round(latencies[count // 2] * 1000) if count else None,
+                'window_p95_latency_ms': round(latencies[min(count - 1, int(count * 0.95))] * 1000) if count else None,
+                'total_calls': self.total_calls,
+                'total_failures': self.total_failures,
+                'rejected_calls': self.rejected_calls,
+                'times_opened': self.times_opened,
+                'last_error': self.last_error
+            }
+
+class GeminiBackend:
+    """Google Gemini through the SDK's native async client"""
+
+    def __init__(self, api_key: str, model_id: str = 'gemini-2.0-flash-exp',  # Latest free model
+                 timeout_seconds: float = 30):
+        self.client = genai.Client(
+            api_key=api_key,
+            http_options=types.HttpOptions(timeout=int(timeout_seconds * 1000))
+        )
+        self.model_id = model_id
+
+    async def generate(self, full_prompt: str, temperature: float, max_tokens: int,
+                       json_mode: bool = False) -> str:
+        config = types.GenerateContentConfig(
+            temperature=temperature,
+            max_output_tokens=max_tokens,
+            response_mime_type="application/json" if json_mode else None
+        )
+        response = await self.client.aio.models.generate_content(
+            model=self.model_id,
+            contents=full_prompt,
+            config=config
+        )
+        return response.text.strip()
+
+class FakeGeminiBackend:
+    """
+    Local stand-in for tests and offline development (AI_BACKEND=fake): no network,
+    optional latency and failures, and canned output from `responder(prompt, json_mode)`.
+    """
+
+    model_id = 'fake'
+
+    def __init__(self, responder: Callable[[str, bool], Any] = None, latency_seconds: float = 0.0,
+                 error: Exception = None):
+        self.responder = responder
+        self.latency_seconds = latency_seconds
+        self.error = error
+        self.calls = 0
+
+    async def generate(self, full_prompt: str, temperature: float, max_tokens: int,
+                       json_mode: bool = False) -> str:
+        self.calls += 1
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+        if self.error:
+            raise self.error
+        if self.responder:
+            result = self.responder(full_prompt, json_mode)
+            return result if isinstance(result, str) else json.dumps(result)
+        return '{}' if json_mode else f"Fake completion for: {full_prompt[:80]}"
+
 class GeminiAIService:
-    def __init__(self):
+    def __init__(self, backend=None, timeout_seconds: float = None, max_concurrency: int = None,
+                 rate_per_minute: float = None, breaker: CircuitBreaker = None):
+        # Per-call deadline, covering the wait for a concurrency slot and a rate token
+        self.timeout_seconds = timeout_seconds or float(os.getenv('GEMINI_TIMEOUT_SECONDS', 20))
+        self.max_concurrency = max_concurrency or int(os.getenv('GEMINI_MAX_CONCURRENCY', 4))
+        self.rate_per_minute = rate_per_minute or float(os.getenv('GEMINI_RATE_PER_MINUTE', 60))
+
+        # All upstream calls run on one background event loop, so the semaphore and the
+        # token bucket are shared by every Flask worker thread in the process
+        self._loop = None
+        self._loop_lock = threading.Lock()
+        self._semaphore = None
+        self._rate_limiter = None
+
+        self.breaker = breaker or CircuitBreaker(
+            cooldown_seconds=float(os.getenv('GEMINI_BREAKER_COOLDOWN_SECONDS', 30))
+        )
+
+        self.backend = backend or self._default_backend()
+        self.model_id = getattr(self.backend, 'model_id', None)
+
+    def is_available(self) -> bool:
+        """Whether a call may reach Gemini now; False means go straight to the template fallback"""
+        return self.backend is not None and not self.breaker.is_open()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            'backend': type(self.backend).__name__ if self.backend else None,
+            'max_concurrency': self.max_concurrency,
+            'rate_per_minute': self.rate_per_minute,
+            'circuit_breaker': self.breaker.metrics()
+        }
+
+    def _default_backend(self):
+        if os.getenv('AI_BACKEND') == 'fake':
+            print("AI backend: fake (no network calls)")
+            return FakeGeminiBackend()
+
         api_key = os.getenv('GEMINI_API_KEY')
         if not api_key:
             print("WARNING: GEMINI_API_KEY not found in environment variables")
             print("AI features will use fallback templates. Set GEMINI_API_KEY in .env for full AI functionality.")
-            self.client = None
-            self.model_id = None
-            return
-        
+            return None
+
         try:
-            self.client = genai.Client(api_key=api_key)
-            self.model_id = 'gemini-2.0-flash-exp'  # Latest free model
+            return GeminiBackend(api_key, timeout_seconds=self.timeout_seconds)
         except Exception as e:
             print(f"WARNING: Failed to initialize Gemini client: {e}")
             print("AI features will use fallback templates.")
-            self.client = None
-            self.model_id = None
-        
-    def generate_completion(self, prompt: str, system_message: str = None, 
-                          temperature: float = 0.7, max_tokens: int = 1000) -> str:
-        """Generate a completion using Google Gemini API"""
-        if not self.client:
             return None
-            
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        with self._loop_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name='gemini-loop', daemon=True).start()
+                self._semaphore = asyncio.Semaphore(self.max_concurrency)
+                # Bursts are bounded by the concurrency limit anyway
+                self._rate_limiter = AsyncTokenBucket(self.rate_per_minute / 60.0, self.max_concurrency)
+                self._loop = loop
+            return self._loop
+
+    async def _call_upstream(self, full_prompt: str, temperature: float, max_tokens: int, json_mode: bool) -> str:
+        async with self._semaphore:
+            await self._rate_limiter.acquire()
+            return await self.backend.generate(full_prompt, temperature, max_tokens, json_mode)
+
+    async def _run(self, full_prompt: str, temperature: float, max_tokens: int, json_mode: bool,
+                   timeout: float = None) -> Optional[str]:
+        """
+        Run one upstream call on the service loop, from any loop; None on error or deadline,
+        and immediately while the circuit breaker is open
+        """
+        if not self.breaker.allow_request():
+            return None
+        loop = self._get_loop()
+        timeout = timeout or self.timeout_seconds
+        call = asyncio.wait_for(self._call_upstream(full_prompt, temperature, max_tokens, json_mode), timeout)
+        started = time.monotonic()
         try:
-            # Combine system message and prompt
-            full_prompt = prompt
-            if system_message:
-                full_prompt = f"{system_message}\n\n{prompt}"
-            
-            response = self.client.models.generate_content(
-                model=self.model_id,
-                contents=full_prompt,
-                config=types.GenerateContentConfig(
-                    temperature=temperature,
-                    max_output_tokens=max_tokens,
-                )
-            )
-            
-            return response.text.strip()
+            if asyncio.get_running_loop() is loop:
+                content = await call
+            else:
+                content = await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(call, loop))
+        except asyncio.TimeoutError:
+            error = f"no response within {timeout}s"
+            print(f"Gemini API Error: {error}")
+            self.breaker.record(False, time.monotonic() - started, error)
+            return None
+        except asyncio.CancelledError:
+            self.breaker.record(False, time.monotonic() - started, 'cancelled')
+            raise
         except Exception as e:
             print(f"Gemini API Error: {str(e)}")
+            self.breaker.record(False, time.monotonic() - started, str(e) or type(e).__name__)
             return None
-    
-    def generate_json_completion(self, prompt: str, system_message: str = None,
-                                temperature: float = 0.7) -> Optional[Dict]:
-        """Generate a JSON response using Google Gemini API"""
-        if not self.client:
-            return None
-            
+        self.breaker.record(True, time.monotonic() - started)
+        return content
+
+    @staticmethod
+    def _parse_json(content: str) -> Optional[Dict]:
+        # Extract JSON from markdown code blocks if present
+        if '```json' in content:
+            content = content.split('```json')[1].split('```')[0].strip()
+        elif '```' in content:
+            content = content.split('```')[1].split('```')[0].strip()
         try:
-            # Add JSON instruction to prompt
-            json_prompt = f"{prompt}\n\nIMPORTANT: Respond ONLY with valid JSON. No other text."
-            
-            full_prompt = json_prompt
-            if system_message:
-                full_prompt = f"{system_message}\n\n{json_prompt}"
-            
-            response = self.client.models.generate_content(
-                model=self.model_id,
-                contents=full_prompt,
-                config=types.GenerateContentConfig(
-                    temperature=temperature,
-                    max_output_tokens=2000,
-                    response_mime_type="application/json"
-                )
-            )
-            
-            content = response.text.strip()
-            
-            # Extract JSON from markdown code blocks if present
-            if '```json' in content:
-                content = content.split('```json')[1].split('```')[0].strip()
-            elif '```' in content:
-                content = content.split('```')[1].split('```')[0].strip()
-            
             return json.loads(content)
         except Exception as e:
             print(f"Gemini JSON API Error: {str(e)}")
             return None
 
+    async def agenerate_completion(self, prompt: str, system_message: str = None,
+                                   temperature: float = 0.7, max_tokens: int = 1000,
+                                   timeout: float = None) -> Optional[str]:
+        """Generate a completion using Google Gemini API"""
+        if not self.backend:
+            return None
+
+        # Combine system message and prompt
+        full_prompt = prompt
+        if system_message:
+            full_prompt = f"{system_message}\n\n{prompt}"
+
+        return await self._run(full_prompt, temperature, max_tokens, False, timeout)
+
+    async def agenerate_json_completion(self, prompt: str, system_message: str = None,
+                                        temperature: float = 0.7, timeout: float = None) -> Optional[Dict]:
+        """Generate a JSON response using Google Gemini API"""
+        if not self.backend:
+            return None
+
+        # Add JSON instruction to prompt
+        json_prompt = f"{prompt}\n\nIMPORTANT: Respond ONLY with valid JSON. No other text."
+
+        full_prompt = json_prompt
+        if system_message:
+            full_prompt = f"{system_message}\n\n{json_prompt}"
+
+        content = await self._run(full_prompt, temperature, 2000, True, timeout)
+        return self._parse_json(content) if content is not None else None
+
+    def _run_sync(self, coroutine, timeout: float = None):
+        """Block the calling thread on a coroutine run by the service loop"""
+        future = asyncio.run_coroutine_threadsafe(coroutine, self._get_loop())
+        # The coroutine enforces the deadline itself; the margin only guards against a stuck loop
+        try:
+            return future.result((timeout or self.timeout_seconds) + 5)
+        except Exception as e:
+            future.cancel()
+            print(f"Gemini API Error: {str(e) or type(e).__name__}")
+            return None
+
+    def generate_completion(self, prompt: str, system_message: str = None,
+                          temperature: float = 0.7, max_tokens: int = 1000,
+                          timeout: float = None) -> Optional[str]:
+        """Blocking wrapper around agenerate_completion"""
+        if not self.backend:
+            return None
+        return self._run_sync(
+            self.agenerate_completion(prompt, system_message, temperature, max_tokens, timeout), timeout
+        )
+
+    def generate_json_completion(self, prompt: str, system_message: str = None,
+                                temperature: float = 0.7, timeout: float = None) -> Optional[Dict]:
+        """Blocking wrapper around agenerate_json_completion"""
+        if not self.backend:
+            return None
+        return self._run_sync(
+            self.agenerate_json_completion(prompt, system_message, temperature, timeout), timeout
+        )
+
 # Global instance
 gemini_service = GeminiAIService()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Profile Analysis Service for SkillNova
+Persists ai_engine.analyze_user_profile results so analytics endpoints can
+aggregate stored profiles instead of re-analyzing every user per request
+"""
+
+import hashlib
+import json
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+from models import db, Assessment, UserProfileAnalysis
+from ai_recommendations_simple import ai_engine
+
+class ProfileAnalysisService:
+    """Service for reading and refreshing stored user profile analyses"""
+
+    @staticmethod
+    def build_bio_dict(bio_data) -> Dict:
+        """Convert a BioData row into the dict expected by ai_engine"""
+        return {
+            'skills': bio_data.skills,
+            'goals': bio_data.goals,
+            'interests': bio_data.interests,
+            'education': bio_data.education,
+            'experience_level': bio_data.experience_level
+        }
+
+    @staticmethod
+    def compute_version_hash(bio_dict: Dict, assessment_scores: Optional[List[float]]) -> str:
+        """Hash the inputs of a profile analysis so stale results can be detected"""
+        payload = json.dumps({
+            'bio_data': bio_dict,
+            'assessment_scores': assessment_scores or []
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get_assessment_scores(self, user_ids: List) -> Dict[Any, List[float]]:
+        """Load assessment scores for many users in a single query"""
+        scores = {}
+        if not user_ids:
+            return scores
+
+        rows = db.session.query(Assessment.user_id, Assessment.score_percentage).filter(
+            Assessment.user_id.in_(user_ids)
+        ).order_by(Assessment.user_id, Assessment.completed_at).all()
+
+        for user_id, score in rows:
+            if score is not None:
+                scores.setdefault(user_id, []).append(score)
+
+        return scores
+
+    def get_profiles(self, users_with_bio: List) -> Dict[Any, Dict]:
+        """
+        Return {user_id: {'profile': ..., 'assessment_scores': [...]}} for (User, BioData) pairs.
+        Stored analyses are reused when their version hash still matches; only users whose
+        bio data or assessment scores changed are re-analyzed.
+        """
+        results = {}
+        if not users_with_bio:
+            return results
+
+        user_ids = [user.id for user, _ in users_with_bio]
+        scores_by_user = self.get_assessment_scores(user_ids)
+        stored = {
+            row.user_id: row
+            for row in UserProfileAnalysis.query.filter(UserProfileAnalysis.user_id.in_(user_ids)).all()
+        }
+
+        refreshed = 0
+        for user, bio_data in users_with_bio:
+            bio_dict = self.build_bio_dict(bio_data)
+            assessment_scores = scores_by_user.get(user.id) or None
+            version_hash = self.compute_version_hash(bio_dict, assessment_scores)
+
+            record = stored.get(user.id)
+            if record is None or record.version_hash != version_hash:
+                profile = ai_engine.analyze_user_profile(bio_dict, assessment_scores)
+                if record is None:
+                    record = UserProfileAnalysis(user_id=user.id)
+                    db.session.add(record)
+                record.version_hash = version_hash
+                record.analysis = profile
+                record.computed_at = datetime.utcnow()
+                refreshed += 1
+
+            results[user.id] = {
+                'profile': record.analysis,
+                'assessment_scores': assessment_scores
+            }
+
+        if refreshed:
+            try:
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                print(f"Error saving profile analyses: {e}")
+
+        return results
+
+    def get_profile(self, user, bio_data) -> Dict:
+        """Return the stored (or freshly computed) profile analysis for one user"""
+        return self.get_profiles([(user, bio_data)])[user.id]['profile']
+
+# Global instance
+profile_analysis_service = ProfileAnalysisService()
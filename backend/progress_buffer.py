@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Progress Write Buffer for SkillNova
+Write-behind buffer for course player progress pings: the latest percentage per enrollment
+is held in memory and written in one batched UPDATE per flush interval (and at shutdown),
+so database writes grow with active enrollments per interval rather than with pings
+"""
+
+import atexit
+import os
+import threading
+from typing import Dict, Optional
+from flask import current_app
+from sqlalchemy import func, update
+from models import db, CourseEnrollment
+
+class ProgressWriteBuffer:
+    """
+    Coalesces progress updates per enrollment. Reads go through progress() so a learner
+    sees their latest ping before it is flushed. Only plain progress is buffered; reaching
+    100% changes the enrollment status and is written through by the caller.
+    """
+
+    def __init__(self, flush_interval_seconds: float = None, max_pending: int = 5000):
+        self.flush_interval_seconds = flush_interval_seconds or float(os.getenv('PROGRESS_FLUSH_INTERVAL_SECONDS', '5'))
+        # Flush early if this many enrollments are waiting
+        self.max_pending = max_pending
+        # enrollment id -> latest progress percentage
+        self._pending: Dict = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._app = None
+        self._thread = None
+
+    def _ensure_flusher(self):
+        with self._lock:
+            if self._thread is None:
+                self._app = current_app._get_current_object()
+                self._thread = threading.Thread(target=self._flush_loop, daemon=True, name='progress-flush')
+                self._thread.start()
+                atexit.register(self.flush)
+
+    def record(self, enrollment_id, progress_percentage: float):
+        """Buffer the latest progress for an enrollment; later pings replace earlier ones"""
+        self._ensure_flusher()
+        with self._lock:
+            self._pending[enrollment_id] = progress_percentage
+            full = len(self._pending) >= self.max_pending
+        if full:
+            self._wakeup.set()
+
+    def pending(self, enrollment_id) -> Optional[float]:
+        with self._lock:
+            return self._pending.get(enrollment_id)
+
+    def discard(self, enrollment_id) -> Optional[float]:
+        """Drop a buffered value that a write-through update supersedes"""
+        with self._lock:
+            return self._pending.pop(enrollment_id, None)
+
+    def progress(self, enrollment: CourseEnrollment) -> float:
+        """Enrollment progress including a buffered, not yet flushed update"""
+        buffered = self.pending(enrollment.id)
+        return buffered if buffered is not None else enrollment.progress_percentage
+
+    def flush(self) -> int:
+        """Write every buffered update in one executemany UPDATE; returns the number of rows"""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+            if not batch or self._app is None:
+                return 0
+
+            with self._app.app_context():
+                try:
+                    # Never move a completed enrollment, in case a completion committed after this batch was taken.
+                    # The flush has its own session, so there are no loaded objects to synchronize.
+                    db.session.execute(
+                        update(CourseEnrollment).where(
+                            func.coalesce(CourseEnrollment.status, 'active') != 'completed'
+                        ).execution_options(synchronize_session=None),
+                        [{'id': enrollment_id, 'progress_percentage': progress}
+                         for enrollment_id, progress in batch.items()]
+                    )
+                    db.session.commit()
+                except Exception as e:
+                    db.session.rollback()
+                    # Put the batch back unless newer pings arrived meanwhile
+                    with self._lock:
+                        for enrollment_id, progress in batch.items():
+                            self._pending.setdefault(enrollment_id, progress)
+                    print(f"❌ Progress flush failed ({len(batch)} enrollments): {e}")
+                    return 0
+                finally:
+                    db.session.remove()
+            return len(batch)
+
+    def _flush_loop(self):
+        while True:
+            self._wakeup.wait(self.flush_interval_seconds)
+            self._wakeup.clear()
+            self.flush()
+
+# Global instance
+progress_write_buffer = ProgressWriteBuffer()
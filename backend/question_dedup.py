@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+Question Duplicate Index for SkillNova
+MinHash signatures over character shingles of normalized question text, bucketed with
+LSH bands, so near-identical questions are found before insert and the existing bank
+can be deduplicated in one pass. Questions are only compared within their scope: the
+(course, module) of course questions, the category of bank questions.
+"""
+
+import re
+import threading
+import time
+import zlib
+import numpy as np
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Iterable
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from models import db, Question
+
+NON_WORD_PATTERN = re.compile(r"[^a-z0-9+#]+")
+
+# Largest prime below 2**32: a * x + b stays inside uint64 for 32-bit a, b and x
+HASH_PRIME = np.uint64(4294967291)
+
+def question_scope(course_id=None, module_id=None, category: str = None) -> tuple:
+    """Questions of a course are compared per (course, module); bank questions per category"""
+    if course_id or module_id:
+        return ('course', str(course_id) if course_id else None, str(module_id) if module_id else None)
+    return ('category', (category or '').strip().lower())
+
+class MinHasher:
+    """Fixed random permutations; signatures are comparable across processes"""
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 5, seed: int = 7):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.RandomState(seed)
+        self.a = rng.randint(1, int(HASH_PRIME), size=num_perm, dtype=np.uint64)
+        self.b = rng.randint(0, int(HASH_PRIME), size=num_perm, dtype=np.uint64)
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Case, punctuation and whitespace differences do not make a question new"""
+        return NON_WORD_PATTERN.sub(' ', (text or '').lower()).strip()
+
+    def shingles(self, normalized: str) -> np.ndarray:
+        size = self.shingle_size
+        grams = {normalized[i:i + size] for i in range(max(1, len(normalized) - size + 1))}
+        # crc32 is stable across processes, unlike the built-in hash()
+        return np.fromiter((zlib.crc32(gram.encode('utf-8')) for gram in grams), dtype=np.uint64, count=len(grams))
+
+    def signature(self, normalized: str) -> np.ndarray:
+        hashes = self.shingles(normalized) % HASH_PRIME
+        permuted = (self.a[:, None] * hashes[None, :] + self.b[:, None]) % HASH_PRIME
+        return permuted.min(axis=1).astype(np.uint32)
+
+class QuestionDuplicateIndex:
+    """In-process near-duplicate index over the question bank"""
+
+    def __init__(self, num_perm: int = 128, bands: int = 32, threshold: float = 0.75):
+        self.hasher = MinHasher(num_perm)
+        self.bands = bands
+        self.rows_per_band = num_perm // bands
+        # Estimated Jaccard similarity of shingle sets at or above which two questions are duplicates
+        self.threshold = threshold
+        self._signatures: Dict[str, np.ndarray] = {}
+        self._normalized: Dict[str, str] = {}  # question id -> normalized text
+        self._scopes: Dict[str, tuple] = {}  # question id -> question_scope()
+        self._texts: Dict[tuple, set] = {}  # (scope, normalized text) -> question ids, for exact matches
+        self._buckets: List[Dict[tuple, set]] = [{} for _ in range(bands)]  # (scope, band key) -> question ids
+        self._built_at = None
+        self._lock = threading.RLock()
+
+    def _band_keys(self, scope: tuple, signature: np.ndarray) -> List[tuple]:
+        rows = self.rows_per_band
+        return [(scope, signature[band * rows:(band + 1) * rows].tobytes()) for band in range(self.bands)]
+
+    # Index maintenance
+
+    def build(self):
+        """(Re)load every active question's text and scope in one streamed query"""
+        signatures, normalized, scopes, texts = {}, {}, {}, {}
+        buckets = [{} for _ in range(self.bands)]
+        # No autoflush: uncommitted questions of the current request must not enter the index
+        with db.session.no_autoflush:
+            # Deactivated questions (including removed duplicates) must not block new inserts
+            rows = db.session.query(
+                Question.id, Question.question_text, Question.course_id, Question.module_id, Question.category
+            ).filter(
+                Question.is_active == True
+            ).execution_options(yield_per=1000)
+            for question_id, question_text, course_id, module_id, category in rows:
+                self._insert(str(question_id), question_text, question_scope(course_id, module_id, category),
+                             signatures, normalized, scopes, texts, buckets)
+
+        with self._lock:
+            self._signatures, self._normalized, self._scopes = signatures, normalized, scopes
+            self._texts, self._buckets = texts, buckets
+            self._built_at = time.monotonic()
+        print(f"🧬 Question duplicate index built: {len(signatures)} questions")
+
+    def _ensure_built(self):
+        """Build on first use if startup did not; commit hooks keep a built index current"""
+        with self._lock:
+            built = self._built_at is not None
+        if not built:
+            self.build()
+
+    def _insert(self, question_id: str, question_text: str, scope: tuple,
+                signatures, normalized_texts, scopes, texts, buckets):
+        normalized = self.hasher.normalize(question_text)
+        if not normalized:
+            return
+        signature = self.hasher.signature(normalized)
+        signatures[question_id] = signature
+        normalized_texts[question_id] = normalized
+        scopes[question_id] = scope
+        texts.setdefault((scope, normalized), set()).add(question_id)
+        for band, key in enumerate(self._band_keys(scope, signature)):
+            buckets[band].setdefault(key, set()).add(question_id)
+
+    def add(self, question_id, question_text: str, scope: tuple):
+        with self._lock:
+            if self._built_at is None:
+                return
+            self.remove(question_id)
+            self._insert(str(question_id), question_text, scope, self._signatures, self._normalized,
+                         self._scopes, self._texts, self._buckets)
+
+    def remove(self, question_id):
+        question_id = str(question_id)
+        with self._lock:
+            signature = self._signatures.pop(question_id, None)
+            if signature is None:
+                return
+            scope = self._scopes.pop(question_id)
+            for band, key in enumerate(self._band_keys(scope, signature)):
+                members = self._buckets[band].get(key)
+                if members:
+                    members.discard(question_id)
+                    if not members:
+                        del self._buckets[band][key]
+            normalized = self._normalized.pop(question_id)
+            owners = self._texts.get((scope, normalized))
+            if owners:
+                owners.discard(question_id)
+                if not owners:
+                    del self._texts[(scope, normalized)]
+
+    def invalidate(self):
+        with self._lock:
+            self._built_at = None
+
+    # Lookups
+
+    def similarity(self, first: np.ndarray, second: np.ndarray) -> float:
+        return float(np.count_nonzero(first == second)) / len(first)
+
+    def _candidates(self, scope: tuple, signature: np.ndarray) -> set:
+        candidates = set()
+        for band, key in enumerate(self._band_keys(scope, signature)):
+            candidates.update(self._buckets[band].get(key, ()))
+        return candidates
+
+    def find_duplicate(self, question_text: str, course_id=None, module_id=None, category: str = None,
+                       exclude: Iterable = ()) -> Optional[Dict[str, Any]]:
+        """Most similar existing question of the same scope at or above the threshold, or None"""
+        self._ensure_built()
+        normalized = self.hasher.normalize(question_text)
+        if not normalized:
+            return None
+        scope = question_scope(course_id, module_id, category)
+        excluded = {str(question_id) for question_id in exclude}
+
+        with self._lock:
+            exact = self._texts.get((scope, normalized), set()) - excluded
+            if exact:
+                return {'question_id': min(exact), 'similarity': 1.0}
+
+        signature = self.hasher.signature(normalized)
+        with self._lock:
+            best = None
+            for question_id in self._candidates(scope, signature) - excluded:
+                score = self.similarity(signature, self._signatures[question_id])
+                if score >= self.threshold and (best is None or score > best['similarity']):
+                    best = {'question_id': question_id, 'similarity': round(score, 3)}
+            return best
+
+    def is_duplicate(self, question_text: str, course_id=None, module_id=None, category: str = None) -> bool:
+        return self.find_duplicate(question_text, course_id, module_id, category) is not None
+
+    def batch(self, check_bank: bool = True) -> 'DuplicateBatch':
+        """
+        Guard for a loop of inserts: the index only learns new rows once they commit.
+        check_bank=False for the questions of a course not created yet, which can only repeat each other.
+        """
+        return DuplicateBatch(self, check_bank)
+
+    def duplicate_groups(self) -> List[List[str]]:
+        """
+        Clusters of near-identical questions of the same scope (union-find over verified LSH
+        candidate pairs; bucket keys include the scope)
+        """
+        self.build()
+        parent = {}
+
+        def find(question_id):
+            parent.setdefault(question_id, question_id)
+            while parent[question_id] != question_id:
+                parent[question_id] = parent[parent[question_id]]
+                question_id = parent[question_id]
+            return question_id
+
+        with self._lock:
+            for band_buckets in self._buckets:
+                for members in band_buckets.values():
+                    if len(members) < 2:
+                        continue
+                    members = sorted(members)
+                    for i, first in enumerate(members):
+                        for second in members[i + 1:]:
+                            if find(first) != find(second) and self.similarity(
+                                    self._signatures[first], self._signatures[second]) >= self.threshold:
+                                parent[find(second)] = find(first)
+
+        groups = {}
+        for question_id in parent:
+            groups.setdefault(find(question_id), []).append(question_id)
+        return [members for members in groups.values() if len(members) > 1]
+
+    def deduplicate(self, apply: bool = False) -> Dict[str, Any]:
+        """
+        Batch dedup job over the existing bank. In each group (one course module or bank category)
+        the oldest active question is kept and the rest are deactivated (never deleted, so past
+        answers stay resolvable).
+        With apply=False only the report is produced.
+        """
+        groups = self.duplicate_groups()
+        question_ids = [question_id for group in groups for question_id in group]
+        rows = {}
+        if question_ids:
+            for question in Question.query.filter(Question.id.in_(question_ids)).all():
+                rows[str(question.id)] = question
+
+        report = []
+        deactivated = 0
+        for group in groups:
+            members = sorted(
+                (rows[question_id] for question_id in group if question_id in rows),
+                key=lambda q: (not q.is_active, q.created_at or datetime.min)
+            )
+            if len(members) < 2:
+                continue
+            keep, duplicates = members[0], members[1:]
+            report.append({
+                'kept': str(keep.id),
+                'question_text': keep.question_text[:120],
+                'duplicates': [str(q.id) for q in duplicates]
+            })
+            if apply:
+                for question in duplicates:
+                    if question.is_active:
+                        question.is_active = False
+                        deactivated += 1
+
+        if apply:
+            db.session.commit()
+
+        return {
+            'groups': len(report),
+            'duplicate_questions': sum(len(group['duplicates']) for group in report),
+            'deactivated': deactivated,
+            'applied': apply,
+            'details': report
+        }
+
+class DuplicateBatch:
+    """
+    Rejects questions duplicating the bank or an earlier question accepted in the same batch,
+    within the scope each question is inserted into
+    """
+
+    def __init__(self, index: QuestionDuplicateIndex, check_bank: bool = True):
+        self.index = index
+        self.check_bank = check_bank
+        # scope -> signatures / normalized texts accepted so far
+        self.signatures: Dict[tuple, list] = {}
+        self.texts: Dict[tuple, set] = {}
+        self.skipped = 0
+        # Id of the bank question the last rejected text duplicated (None for a batch duplicate)
+        self.last_duplicate = None
+
+    def accept(self, question_text: str, course_id=None, module_id=None, category: str = None) -> bool:
+        self.last_duplicate = None
+        normalized = self.index.hasher.normalize(question_text)
+        if not normalized:
+            return True
+        scope = question_scope(course_id, module_id, category)
+        texts = self.texts.setdefault(scope, set())
+        signatures = self.signatures.setdefault(scope, [])
+        existing = None
+        if normalized not in texts and self.check_bank:
+            existing = self.index.find_duplicate(question_text, course_id, module_id, category)
+        self.last_duplicate = existing['question_id'] if existing else None
+        duplicate = normalized in texts or existing is not None
+        signature = None
+        if not duplicate:
+            signature = self.index.hasher.signature(normalized)
+            duplicate = any(self.index.similarity(signature, other) >= self.index.threshold
+                            for other in signatures)
+        if duplicate:
+            self.skipped += 1
+            return False
+        texts.add(normalized)
+        signatures.append(signature)
+        return True
+
+# Global instance
+question_duplicate_index = QuestionDuplicateIndex()
+
+# Keep a built index in step with committed question inserts, text and scope edits,
+# (de)activations and deletes
+
+# Columns whose changes move a question within the index
+INDEXED_QUESTION_COLUMNS = ('question_text', 'is_active', 'course_id', 'module_id', 'category')
+
+def _indexed_entry(question: Question) -> Optional[tuple]:
+    """(text, scope) to index, or None for an inactive question"""
+    if question.is_active is False:
+        return None
+    return question.question_text, question_scope(question.course_id, question.module_id, question.category)
+
+@event.listens_for(Session, 'after_flush')
+def _collect_question_text_changes(session, flush_context):
+    pending = session.info.setdefault('question_dedup_changes', {})
+    for obj in session.new:
+        if isinstance(obj, Question):
+            pending[str(obj.id)] = _indexed_entry(obj)
+    for obj in session.dirty:
+        if isinstance(obj, Question):
+            attrs = inspect(obj).attrs
+            if any(attrs[column].history.has_changes() for column in INDEXED_QUESTION_COLUMNS):
+                # Deactivation drops the question from the index; reactivation puts it back
+                pending[str(obj.id)] = _indexed_entry(obj)
+    for obj in session.deleted:
+        if isinstance(obj, Question):
+            pending[str(obj.id)] = None
+
+def record_bulk_question_inserts(session, questions: Dict[str, tuple]):
+    """Queue questions written with a bulk INSERT (no flush events) for the index on commit: id -> (text, scope)"""
+    session.info.setdefault('question_dedup_changes', {}).update(questions)
+
+@event.listens_for(Session, 'after_commit')
+def _apply_question_text_changes(session):
+    for question_id, entry in (session.info.pop('question_dedup_changes', None) or {}).items():
+        if entry is None:
+            question_duplicate_index.remove(question_id)
+        else:
+            question_duplicate_index.add(question_id, *entry)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_question_text_changes(session):
+    session.info.pop('question_dedup_changes', None)
+
+if __name__ == "__main__":
+    # Batch dedup: python question_dedup.py [--apply]
+    import sys
+    from app import app
+    with app.app_context():
+        result = question_duplicate_index.deduplicate(apply='--apply' in sys.argv)
+        print(f"✅ {result['groups']} duplicate groups, {result['duplicate_questions']} duplicate questions, "
+              f"{result['deactivated']} deactivated")
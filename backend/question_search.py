@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Question Search Service for SkillNova
+Admin question bank listing: full-text search over question text, explanation and category
+(PostgreSQL tsvector with a GIN index), filters, keyset pagination and facet counts
+computed in SQL
+"""
+
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Dict, Any, Optional
+from sqlalchemy import func, literal, literal_column, case, cast, null, or_, and_, select, union_all, String, DateTime
+from models import db, Question
+
+# Questions without created_at sort as the oldest
+EPOCH = datetime(1970, 1, 1)
+
+class QuestionSearchService:
+    """Paginated, filterable and searchable question listing"""
+
+    DEFAULT_LIMIT = 50
+    MAX_LIMIT = 200
+
+    # Must match the expression of idx_questions_created_at_id (migration 011) for the index to be used
+    SORT_KEY = func.coalesce(Question.created_at, literal(EPOCH, DateTime))
+
+    # Facet name -> grouped expression; each facet is counted with every other filter applied
+    FACETS = {
+        'category': Question.category,
+        'difficulty': Question.difficulty_level,
+        'type': Question.question_type,
+        'status': case((Question.is_active == True, 'active'), else_='inactive')
+    }
+
+    @staticmethod
+    def search_document():
+        """Must match the expression of idx_questions_search (migration 010) for the index to be used"""
+        return func.to_tsvector(
+            literal_column("'english'"),
+            func.coalesce(Question.question_text, literal_column("''"))
+            + literal_column("' '")
+            + func.coalesce(Question.explanation, literal_column("''"))
+            + literal_column("' '")
+            + func.coalesce(Question.category, literal_column("''"))
+        )
+
+    def _search_condition(self, text: str):
+        if db.engine.dialect.name == 'postgresql':
+            return self.search_document().op('@@')(func.websearch_to_tsquery(literal_column("'english'"), text))
+        # Other databases (local development) fall back to substring matching
+        return or_(
+            Question.question_text.icontains(text, autoescape=True),
+            Question.explanation.icontains(text, autoescape=True),
+            Question.category.icontains(text, autoescape=True)
+        )
+
+    def _conditions(self, search: Optional[str], course_id, filters: Dict[str, Any], skip: str = None) -> list:
+        conditions = []
+        if search:
+            conditions.append(self._search_condition(search))
+        if course_id:
+            conditions.append(Question.course_id == course_id)
+        for name, value in filters.items():
+            if name != skip and value is not None:
+                conditions.append(self.FACETS[name] == value)
+        return conditions
+
+    @staticmethod
+    def encode_cursor(question: Question) -> str:
+        payload = json.dumps([(question.created_at or EPOCH).isoformat(), str(question.id)])
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    @staticmethod
+    def decode_cursor(cursor: str):
+        """(created_at, id) of the last row of the previous page; ValueError if malformed"""
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            created_at, question_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            return datetime.fromisoformat(created_at), uuid.UUID(question_id)
+        except Exception:
+            raise ValueError('Invalid cursor')
+
+    def facets(self, search: Optional[str], course_id, filters: Dict[str, Any]) -> Dict[str, Any]:
+        """Facet counts and the total match count in one UNION ALL statement"""
+        parts = []
+        for name, expression in self.FACETS.items():
+            parts.append(
+                select(
+                    literal(name, String).label('facet'),
+                    cast(expression, String).label('value'),
+                    func.count().label('count')
+                ).select_from(Question).where(
+                    *self._conditions(search, course_id, filters, skip=name)
+                ).group_by(expression)
+            )
+        parts.append(
+            select(
+                literal('total', String).label('facet'),
+                cast(null(), String).label('value'),
+                func.count().label('count')
+            ).select_from(Question).where(*self._conditions(search, course_id, filters))
+        )
+
+        facets = {name: [] for name in self.FACETS}
+        total = 0
+        for facet, value, count in db.session.execute(union_all(*parts)).all():
+            if facet == 'total':
+                total = count
+            else:
+                facets[facet].append({'value': value, 'count': count})
+
+        for values in facets.values():
+            values.sort(key=lambda item: (-item['count'], item['value'] or ''))
+        return {'total': total, 'facets': facets}
+
+    def search(self, search: str = None, category: str = None, difficulty: str = None,
+               question_type: str = None, status: str = None, course_id=None,
+               limit: int = None, cursor: str = None) -> Dict[str, Any]:
+        """
+        One page of questions, newest first, continuing after `cursor`; the next page's
+        cursor is returned while more rows remain. Facets and the total are the same for
+        every page, so they are only computed for the first one.
+        """
+        limit = max(1, min(int(limit or self.DEFAULT_LIMIT), self.MAX_LIMIT))
+        search = (search or '').strip() or None
+        filters = {
+            'category': category or None,
+            'difficulty': difficulty or None,
+            'type': question_type or None,
+            'status': status or None
+        }
+
+        query = Question.query.filter(*self._conditions(search, course_id, filters))
+        if cursor:
+            created_at, question_id = self.decode_cursor(cursor)
+            query = query.filter(or_(
+                self.SORT_KEY < created_at,
+                and_(self.SORT_KEY == created_at, Question.id < question_id)
+            ))
+
+        rows = query.order_by(self.SORT_KEY.desc(), Question.id.desc()).limit(limit + 1).all()
+        questions = rows[:limit]
+        next_cursor = self.encode_cursor(questions[-1]) if len(rows) > limit else None
+
+        result = {
+            'questions': questions,
+            'next_cursor': next_cursor,
+            'limit': limit
+        }
+        if not cursor:
+            result.update(self.facets(search, course_id, filters))
+        return result
+
+# Global instance
+question_search_service = QuestionSearchService()
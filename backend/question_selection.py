@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Question Selection Service for SkillNova
+Random question sampling stratified by difficulty from cached per-bucket id arrays,
+built with one indexed query per topic, category or course, and avoiding questions
+a user has recently been served
+"""
+
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, List, Optional, Iterable
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from models import db, Question, UserTestAttempt
+
+class QuestionSelectionService:
+    """Stratified random question sampling without per-user repeats"""
+
+    def __init__(self, pool_ttl_seconds: int = 300, max_pools: int = 1000,
+                 history_size: int = 500, max_users: int = 10000):
+        self.pool_ttl_seconds = pool_ttl_seconds
+        self.max_pools = max_pools
+        self.history_size = history_size
+        self.max_users = max_users
+        # (kind, value) -> (expires_at, {(question_type, difficulty): [question ids]})
+        self._pools: OrderedDict = OrderedDict()
+        # user id -> ordered set of recently served question ids, oldest first
+        self._served: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    # Candidate pools
+
+    def _pool_query(self, kind: str, value):
+        query = db.session.query(
+            Question.id, Question.question_type, Question.difficulty_level
+        ).filter(Question.is_active == True)
+
+        if kind == 'topic':
+            # Substring match on category, served by the trigram index
+            query = query.filter(Question.category.icontains(value, autoescape=True))
+        elif kind == 'category':
+            query = query.filter(Question.category == value)
+        elif kind == 'course':
+            query = query.filter(Question.course_id == value)
+        return query
+
+    def _pool(self, kind: str, value=None) -> Dict[tuple, List[str]]:
+        key = (kind, value.lower() if kind == 'topic' else value)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._pools.get(key)
+            if entry and entry[0] > now:
+                self._pools.move_to_end(key)
+                return entry[1]
+
+        buckets = {}
+        for question_id, question_type, difficulty in self._pool_query(kind, value).all():
+            buckets.setdefault((question_type, (difficulty or 'medium').lower()), []).append(str(question_id))
+
+        with self._lock:
+            self._pools[key] = (now + self.pool_ttl_seconds, buckets)
+            self._pools.move_to_end(key)
+            while len(self._pools) > self.max_pools:
+                self._pools.popitem(last=False)
+        return buckets
+
+    def invalidate(self):
+        with self._lock:
+            self._pools.clear()
+
+    # Per-user history
+
+    def _history(self, user_id: str) -> OrderedDict:
+        """Recently served ids, seeded on first use from the user's persisted test attempts"""
+        with self._lock:
+            history = self._served.get(user_id)
+            if history is not None:
+                self._served.move_to_end(user_id)
+                return history
+
+        history = OrderedDict()
+        try:
+            attempts = db.session.query(UserTestAttempt.questions_order).filter(
+                UserTestAttempt.user_id == user_id
+            ).order_by(UserTestAttempt.started_at.desc()).limit(20).all()
+            for (order,) in reversed(attempts):
+                question_ids = order.get('question_ids', []) if isinstance(order, dict) else (order or [])
+                for question_id in question_ids:
+                    history[str(question_id)] = True
+        except Exception as e:
+            print(f"Question history load error: {e}")
+
+        with self._lock:
+            history = self._served.setdefault(user_id, history)
+            self._trim(history)
+            self._served.move_to_end(user_id)
+            while len(self._served) > self.max_users:
+                self._served.popitem(last=False)
+        return history
+
+    def _trim(self, history: OrderedDict):
+        while len(history) > self.history_size:
+            history.popitem(last=False)
+
+    def mark_served(self, user_id, question_ids: Iterable):
+        if not user_id:
+            return
+        history = self._history(str(user_id))
+        with self._lock:
+            for question_id in question_ids:
+                history.pop(str(question_id), None)
+                history[str(question_id)] = True
+            self._trim(history)
+
+    # Sampling
+
+    @staticmethod
+    def _allocate(count: int, weights: Dict[str, float], capacity: Dict[str, int]) -> Dict[str, int]:
+        """Split count across difficulties by weight (largest remainder), capped by what each bucket holds"""
+        allocation = {difficulty: 0 for difficulty in weights}
+        remaining = count
+        while remaining > 0:
+            active = {d: w for d, w in weights.items() if w > 0 and allocation[d] < capacity.get(d, 0)}
+            if not active:
+                break
+            total = sum(active.values())
+            shares = {d: remaining * w / total for d, w in active.items()}
+            assigned = 0
+            for difficulty, share in shares.items():
+                take = min(int(share), capacity[difficulty] - allocation[difficulty])
+                allocation[difficulty] += take
+                assigned += take
+            if assigned == 0:
+                # Every share is below one: hand out single questions by largest remainder
+                for difficulty in sorted(shares, key=lambda d: shares[d] - int(shares[d]), reverse=True):
+                    if assigned == remaining:
+                        break
+                    allocation[difficulty] += 1
+                    assigned += 1
+            remaining -= assigned
+        return allocation
+
+    def sample_ids(self, count: int, topic: str = None, category: str = None, course_id=None,
+                   question_type: str = None, difficulty: str = None,
+                   difficulty_mix: Optional[Dict[str, float]] = None,
+                   user_id=None, exclude: Iterable = ()) -> List[str]:
+        """
+        Pick up to `count` question ids from one pool (topic substring, exact category, course,
+        or the whole bank), stratified by difficulty_mix (weights or counts per difficulty,
+        equal across the pool's difficulties by default). Questions the user was served
+        recently are used only when the pool has nothing fresh left, oldest first.
+        """
+        if topic:
+            pool = self._pool('topic', topic)
+        elif category:
+            pool = self._pool('category', category)
+        elif course_id:
+            pool = self._pool('course', uuid.UUID(str(course_id)))
+        else:
+            pool = self._pool('all')
+
+        if difficulty:
+            difficulty_mix = {difficulty.lower(): 1}
+        elif not difficulty_mix:
+            difficulty_mix = {pool_difficulty: 1 for _, pool_difficulty in pool}
+
+        excluded = {str(question_id) for question_id in exclude}
+        served = []
+        if user_id:
+            history = self._history(str(user_id))
+            with self._lock:
+                served = list(history)
+        history = set(served)
+
+        fresh = {}
+        recent = []
+        for (pool_type, pool_difficulty), question_ids in pool.items():
+            if question_type and pool_type != question_type:
+                continue
+            if pool_difficulty not in difficulty_mix:
+                continue
+            for question_id in question_ids:
+                if question_id in excluded:
+                    continue
+                if question_id in history:
+                    recent.append(question_id)
+                else:
+                    fresh.setdefault(pool_difficulty, []).append(question_id)
+
+        allocation = self._allocate(count, difficulty_mix, {d: len(ids) for d, ids in fresh.items()})
+        selected = []
+        leftover = []
+        for pool_difficulty, question_ids in fresh.items():
+            take = allocation.get(pool_difficulty, 0)
+            random.shuffle(question_ids)
+            selected.extend(question_ids[:take])
+            leftover.extend(question_ids[take:])
+
+        # Buckets that ran short are topped up from the other fresh questions, then from
+        # the least recently served ones
+        if len(selected) < count:
+            selected.extend(random.sample(leftover, min(count - len(selected), len(leftover))))
+        if len(selected) < count and recent:
+            order = {question_id: position for position, question_id in enumerate(served)}
+            recent.sort(key=lambda question_id: order.get(question_id, 0))
+            selected.extend(recent[:count - len(selected)])
+
+        random.shuffle(selected)
+        self.mark_served(user_id, selected)
+        return selected
+
+    def sample(self, count: int, load_options: Iterable = (), **criteria) -> List[Question]:
+        """
+        sample_ids() loaded as Question rows with one IN query, in sampled order; load_options
+        (e.g. undefer(Question.explanation)) are applied to that query
+        """
+        question_ids = self.sample_ids(count, **criteria)
+        if not question_ids:
+            return []
+        questions = Question.query.filter(
+            Question.id.in_([uuid.UUID(q) for q in question_ids])
+        ).options(*load_options).all()
+        by_id = {str(question.id): question for question in questions}
+        return [by_id[question_id] for question_id in question_ids if question_id in by_id]
+
+# Global instance
+question_selection_service = QuestionSelectionService()
+
+# Pools are rebuilt after any committed change to the question bank
+
+@event.listens_for(Session, 'after_flush')
+def _collect_question_changes(session, flush_context):
+    if any(isinstance(obj, Question) for obj in (*session.new, *session.dirty, *session.deleted)):
+        session.info['question_pools_stale'] = True
+
+def mark_question_pools_stale(session):
+    """For question writes that bypass flush events, such as bulk INSERTs"""
+    session.info['question_pools_stale'] = True
+
+@event.listens_for(Session, 'after_commit')
+def _apply_question_changes(session):
+    if session.info.pop('question_pools_stale', False):
+        question_selection_service.invalidate()
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_question_changes(session):
+    session.info.pop('question_pools_stale', None)
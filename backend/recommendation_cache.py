@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Recommendation Cache for SkillNova
+Per-user, per-kind cache of recommendation payloads with TTL, LRU eviction and
+invalidation on bio data, assessment, enrollment and catalog writes
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from models import BioData, Assessment, CourseEnrollment, Course, CourseModule, Mentor
+
+# Recommendation kinds served from the cache
+COURSES = 'courses'
+MENTORS = 'mentors'
+PRACTICE = 'practice'
+TESTS = 'tests'
+LEARNING_PATH = 'learning_path'
+COURSE_AI = 'course_ai'
+
+# Models whose writes change a single user's recommendations
+USER_SCOPED_MODELS = (BioData, Assessment, CourseEnrollment)
+
+# Models whose writes change recommendations for everyone, and the kinds they affect
+CATALOG_MODELS = {
+    Course: (COURSES, LEARNING_PATH, COURSE_AI),
+    CourseModule: (COURSES, LEARNING_PATH, COURSE_AI),
+    Mentor: (MENTORS,)
+}
+
+class Uncached(Exception):
+    """Raised by a compute function to return a degraded value without caching it"""
+
+    def __init__(self, value: Any):
+        super().__init__()
+        self.value = value
+
+class RecommendationCache:
+    """Thread-safe LRU + TTL cache keyed by (user_id, kind)"""
+
+    def __init__(self, max_entries: int = 5000, ttl_seconds: int = 600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict = OrderedDict()
+        # Bumping a kind's generation invalidates every cached entry of that kind in O(1)
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id, kind: str):
+        """Return the cached value, or None if missing, expired or invalidated"""
+        key = (str(user_id), kind)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, expires_at, generation = entry
+            if expires_at < time.monotonic() or generation != self._generations.get(kind, 0):
+                del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, user_id, kind: str, value: Any):
+        key = (str(user_id), kind)
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl_seconds, self._generations.get(kind, 0))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, user_id, kind: str, compute: Callable[[], Any]):
+        """Serve from cache, computing and storing the value on a miss unless compute raises Uncached"""
+        value = self.get(user_id, kind)
+        if value is None:
+            try:
+                value = compute()
+            except Uncached as uncached:
+                return uncached.value
+            if value is not None:
+                self.set(user_id, kind, value)
+        return value
+
+    def invalidate_user(self, user_id):
+        """Drop every cached recommendation kind for one user"""
+        user_id = str(user_id)
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == user_id]:
+                del self._entries[key]
+
+    def invalidate_kinds(self, *kinds: str):
+        """Invalidate the given kinds for all users"""
+        with self._lock:
+            for kind in kinds:
+                self._generations[kind] = self._generations.get(kind, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round((self.hits / total) * 100, 1) if total else 0
+            }
+
+# Global instance
+recommendation_cache = RecommendationCache()
+
+# Invalidation hooks: collect affected users/kinds at flush, apply them only once the
+# transaction commits so a rolled-back write never evicts anything
+
+@event.listens_for(Session, 'after_flush')
+def _collect_recommendation_invalidations(session, flush_context):
+    pending = session.info.setdefault('recommendation_invalidations', {'users': set(), 'kinds': set()})
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, USER_SCOPED_MODELS) and getattr(obj, 'user_id', None):
+            pending['users'].add(str(obj.user_id))
+        for model, kinds in CATALOG_MODELS.items():
+            if isinstance(obj, model):
+                pending['kinds'].update(kinds)
+
+@event.listens_for(Session, 'after_commit')
+def _apply_recommendation_invalidations(session):
+    pending = session.info.pop('recommendation_invalidations', None)
+    if not pending:
+        return
+    for user_id in pending['users']:
+        recommendation_cache.invalidate_user(user_id)
+    if pending['kinds']:
+        recommendation_cache.invalidate_kinds(*pending['kinds'])
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_recommendation_invalidations(session):
+    session.info.pop('recommendation_invalidations', None)
@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Local Recommendation Index for SkillNova
+Hashed TF-IDF embeddings of courses and mentors, queried with NumPy dot products
+so course/mentor recommendations need no network call
+"""
+
+import json
+import os
+import re
+import threading
+import zlib
+import numpy as np
+from flask import current_app, has_app_context
+from typing import Dict, List, Any, Optional, Callable
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9+#]+")
+
+class HashingTfidfEmbedder:
+    """Unigram + bigram feature hashing with IDF weights learned from a corpus"""
+
+    def __init__(self, n_features: int = 4096):
+        self.n_features = n_features
+        self.idf = np.ones(n_features, dtype=np.float32)
+
+    def _feature_indices(self, text: str) -> List[int]:
+        tokens = TOKEN_PATTERN.findall((text or '').lower())
+        features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        # crc32 is stable across processes, unlike the built-in hash()
+        return [zlib.crc32(feature.encode('utf-8')) % self.n_features for feature in features]
+
+    def _term_counts(self, texts: List[str]) -> np.ndarray:
+        counts = np.zeros((len(texts), self.n_features), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for index in self._feature_indices(text):
+                counts[row, index] += 1.0
+        return counts
+
+    def fit(self, texts: List[str]) -> 'HashingTfidfEmbedder':
+        counts = self._term_counts(texts)
+        document_frequency = (counts > 0).sum(axis=0)
+        self.idf = (np.log((1.0 + len(texts)) / (1.0 + document_frequency)) + 1.0).astype(np.float32)
+        return self
+
+    def transform(self, texts: List[str]) -> np.ndarray:
+        vectors = np.log1p(self._term_counts(texts)) * self.idf
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+class VectorIndex:
+    """Row-normalized embedding matrix plus the payload for each row"""
+
+    def __init__(self, embedder: HashingTfidfEmbedder, vectors: np.ndarray, payloads: List[Dict]):
+        self.embedder = embedder
+        self.vectors = vectors
+        self.payloads = payloads
+
+    @classmethod
+    def build(cls, texts: List[str], payloads: List[Dict], n_features: int = 4096) -> 'VectorIndex':
+        embedder = HashingTfidfEmbedder(n_features).fit(texts)
+        return cls(embedder, embedder.transform(texts), payloads)
+
+    def __len__(self):
+        return len(self.payloads)
+
+    def query(self, text: str, k: int = 5) -> List[tuple]:
+        """Return up to k (payload, cosine similarity) pairs, best first"""
+        if not self.payloads or k <= 0:
+            return []
+
+        query_vector = self.embedder.transform([text])[0]
+        scores = self.vectors @ query_vector
+        # Stable sort keeps ties in build order so results are reproducible
+        order = np.argsort(-scores, kind='stable')[:k]
+        return [(self.payloads[i], float(scores[i])) for i in order]
+
+class RecommendationIndex:
+    """Course and mentor indexes, persisted to disk and loaded lazily"""
+
+    REBUILD_DELAY_SECONDS = 5
+
+    def __init__(self, index_path: str = None):
+        self.index_path = index_path or os.path.join(os.path.dirname(__file__), '..', 'data', 'recommendation_index.npz')
+        self.courses: Optional[VectorIndex] = None
+        self.mentors: Optional[VectorIndex] = None
+        self._loaded = False
+        self._loaded_mtime = None
+        # Set when a course or mentor write commits; a debounced background rebuild follows
+        self._stale = False
+        self._rebuild_timer = None
+        self._lock = threading.Lock()
+        self._rebuild_lock = threading.Lock()
+
+    @staticmethod
+    def course_text(course: Dict) -> str:
+        return f"{course.get('title', '')} {course.get('title', '')} {course.get('description') or ''} {course.get('skill_level') or ''}"
+
+    @staticmethod
+    def mentor_text(mentor: Dict) -> str:
+        return f"{mentor.get('expertise') or ''} {mentor.get('expertise') or ''} {mentor.get('bio') or ''}"
+
+    @staticmethod
+    def profile_text(user_profile: Dict) -> str:
+        """Query text for a user: analyzed interests and goals plus raw bio text when available"""
+        parts = list(user_profile.get('interests') or [])
+        parts += list(user_profile.get('recommended_focus') or [])
+        parts.append(str(user_profile.get('goals') or ''))
+        parts.append(str(user_profile.get('skill_level') or ''))
+        parts.append(str(user_profile.get('bio_text') or ''))
+        return ' '.join(parts)
+
+    def build(self, courses: List[Dict], mentors: List[Dict]):
+        """Build both indexes from plain dicts (see build_from_db for the expected keys)"""
+        courses_index = VectorIndex.build([self.course_text(c) for c in courses], courses)
+        mentors_index = VectorIndex.build([self.mentor_text(m) for m in mentors], mentors)
+        with self._lock:
+            self.courses = courses_index
+            self.mentors = mentors_index
+            self._loaded = True
+
+    def build_from_db(self):
+        """Build from active courses and available mentors; requires an app context"""
+        from models import Course, Mentor
+        from summary_queries import with_course_description
+
+        courses = [{
+            'id': str(course.id),
+            'title': course.title,
+            'description': course.description,
+            'skill_level': course.skill_level,
+            'duration_weeks': course.duration_weeks,
+            'rating': course.average_rating or 0.0
+        } for course in Course.query.filter_by(is_active=True).options(
+            with_course_description()
+        ).order_by(Course.created_at).all()]
+
+        mentors = [{
+            'id': str(mentor.id),
+            'name': mentor.name,
+            'expertise': mentor.expertise,
+            'bio': mentor.bio,
+            'experience_years': mentor.experience_years or 0,
+            'rating': mentor.rating or 0.0,
+            'is_available': mentor.is_available
+        } for mentor in Mentor.query.filter_by(is_available=True).order_by(Mentor.created_at).all()]
+
+        self.build(courses, mentors)
+
+    def save(self):
+        """Persist both indexes so other processes can load them without rebuilding"""
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        tmp_path = f"{self.index_path}.tmp.npz"
+        np.savez_compressed(
+            tmp_path,
+            course_vectors=self.courses.vectors,
+            course_idf=self.courses.embedder.idf,
+            mentor_vectors=self.mentors.vectors,
+            mentor_idf=self.mentors.embedder.idf,
+            payloads=np.array(json.dumps({
+                'courses': self.courses.payloads,
+                'mentors': self.mentors.payloads
+            }))
+        )
+        os.replace(tmp_path, self.index_path)
+
+    def load(self) -> bool:
+        """Load the persisted indexes; returns False if none has been built yet"""
+        with self._lock:
+            # Not marked loaded until a read succeeds, so an index saved later is still picked up
+            if not os.path.exists(self.index_path):
+                return False
+            try:
+                mtime = os.path.getmtime(self.index_path)
+                data = np.load(self.index_path)
+                payloads = json.loads(str(data['payloads']))
+                indexes = []
+                for kind in ('course', 'mentor'):
+                    idf = data[f'{kind}_idf']
+                    embedder = HashingTfidfEmbedder(len(idf))
+                    embedder.idf = idf
+                    indexes.append(VectorIndex(embedder, data[f'{kind}_vectors'], payloads[f'{kind}s']))
+                self.courses, self.mentors = indexes
+                self._loaded = True
+                self._loaded_mtime = mtime
+                return True
+            except Exception as e:
+                print(f"Error loading recommendation index: {e}")
+                return False
+
+    def mark_stale(self, app):
+        """
+        Schedule a rebuild after committed course or mentor writes. Writes within
+        REBUILD_DELAY_SECONDS share one rebuild, which runs in the background while
+        queries keep using the current index.
+        """
+        with self._rebuild_lock:
+            self._stale = True
+            if self._rebuild_timer is None:
+                self._rebuild_timer = threading.Timer(self.REBUILD_DELAY_SECONDS, self._rebuild, args=(app,))
+                self._rebuild_timer.daemon = True
+                self._rebuild_timer.start()
+
+    def _rebuild(self, app):
+        with self._rebuild_lock:
+            self._rebuild_timer = None
+            if not self._stale:
+                return
+            self._stale = False
+        # Only an index that is in use is kept current
+        if self.courses is None and not os.path.exists(self.index_path):
+            return
+
+        with app.app_context():
+            try:
+                self.build_from_db()
+                self.save()
+                self._loaded_mtime = os.path.getmtime(self.index_path)
+            except Exception as e:
+                print(f"Error rebuilding recommendation index: {e}")
+                self.mark_stale(app)
+            finally:
+                from models import db
+                db.session.remove()
+
+    def _ensure_loaded(self):
+        # Reload when another process has saved a newer index
+        if not self._loaded:
+            self.load()
+        elif self._loaded_mtime is not None and os.path.exists(self.index_path):
+            if os.path.getmtime(self.index_path) != self._loaded_mtime:
+                self.load()
+
+    def is_ready(self) -> bool:
+        self._ensure_loaded()
+        return bool(self.courses and len(self.courses)) or bool(self.mentors and len(self.mentors))
+
+    def text_similarity(self, user_profile: Dict, text: str, kind: str = 'course') -> float:
+        """Cosine similarity between a profile and arbitrary text in the course or mentor space; 0.0 without an index"""
+        self._ensure_loaded()
+        index = self.courses if kind == 'course' else self.mentors
+        if not index:
+            return 0.0
+        vectors = index.embedder.transform([self.profile_text(user_profile), text])
+        return max(0.0, float(vectors[0] @ vectors[1]))
+
+    def recommend_courses(self, user_profile: Dict, limit: int = 5,
+                          categorize: Callable[[str], Optional[str]] = None) -> List[Dict]:
+        """
+        Top-k catalog courses for a profile, in the same shape as the rule-based recommendations.
+        categorize maps a course's text to its category; courses have no category column.
+        """
+        self._ensure_loaded()
+        if not self.courses or not len(self.courses):
+            return []
+
+        recommendations = []
+        for course, similarity in self.courses.query(self.profile_text(user_profile), limit):
+            interests = user_profile.get('interests') or ['Programming']
+            recommendations.append({
+                'id': course['id'],
+                'title': course['title'],
+                'category': (categorize(self.course_text(course)) if categorize else None) or 'General',
+                'difficulty': course.get('skill_level') or user_profile.get('skill_level', 'Beginner'),
+                'match_score': int(round(60 + 38 * similarity)),
+                'description': course.get('description') or '',
+                'duration': f"{course['duration_weeks']} weeks" if course.get('duration_weeks') else 'Self-paced',
+                'rating': round(course.get('rating') or 0.0, 1),
+                'reason': f"Matches your interest in {', '.join(interests[:2])}",
+                'skills_gained': [],
+                'career_paths': []
+            })
+        return recommendations
+
+    def recommend_mentors(self, user_profile: Dict, limit: int = 5) -> List[Dict]:
+        """Top-k available mentors for a profile, in the same shape as the rule-based recommendations"""
+        self._ensure_loaded()
+        if not self.mentors or not len(self.mentors):
+            return []
+
+        recommendations = []
+        for mentor, similarity in self.mentors.query(self.profile_text(user_profile), limit):
+            recommendations.append({
+                'id': mentor['id'],
+                'name': mentor['name'],
+                'expertise': mentor.get('expertise') or '',
+                'experience': f"{mentor.get('experience_years', 0)} years",
+                'match_score': int(round(60 + 38 * similarity)),
+                'rating': round(mentor.get('rating') or 0.0, 1),
+                'availability': 'Available' if mentor.get('is_available', True) else 'Unavailable',
+                'description': mentor.get('bio') or f"Mentor with expertise in {mentor.get('expertise') or 'technology'}"
+            })
+        return recommendations
+
+# Global instance
+recommendation_index = RecommendationIndex()
+
+# Columns that feed the index text or decide which rows are indexed
+INDEXED_COURSE_COLUMNS = ('title', 'description', 'skill_level', 'duration_weeks', 'is_active')
+INDEXED_MENTOR_COLUMNS = ('name', 'expertise', 'bio', 'experience_years', 'is_available')
+
+# Rebuild once a write to an indexed course or mentor column commits
+
+@event.listens_for(Session, 'after_flush')
+def _collect_index_changes(session, flush_context):
+    from models import Course, Mentor
+    indexed = {Course: INDEXED_COURSE_COLUMNS, Mentor: INDEXED_MENTOR_COLUMNS}
+    for obj in (*session.new, *session.deleted):
+        if isinstance(obj, (Course, Mentor)):
+            session.info['recommendation_index_stale'] = True
+            return
+    for obj in session.dirty:
+        columns = indexed.get(type(obj))
+        if columns:
+            # Rating and counter updates do not change what the index matches on
+            attrs = inspect(obj).attrs
+            if any(attrs[column].history.has_changes() for column in columns):
+                session.info['recommendation_index_stale'] = True
+                return
+
+@event.listens_for(Session, 'after_commit')
+def _apply_index_changes(session):
+    if session.info.pop('recommendation_index_stale', False) and has_app_context():
+        recommendation_index.mark_stale(current_app._get_current_object())
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_index_changes(session):
+    session.info.pop('recommendation_index_stale', None)
+
+if __name__ == "__main__":
+    # Offline build: python recommendation_index.py
+    from app import app
+    with app.app_context():
+        recommendation_index.build_from_db()
+        recommendation_index.save()
+        print(f"✅ Recommendation index built: {len(recommendation_index.courses)} courses, "
+              f"{len(recommendation_index.mentors)} mentors -> {recommendation_index.index_path}")
@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
+import numpy as np
 import sys
 import os
 
@@ -12,6 +13,18 @@ from models import (db, User, Course, CourseModule, CourseEnrollment, Mentor, Qu
                    MentorSession, ChatRoom, ChatMessage)
 from ai_recommendations_simple import ai_engine
 from ai_question_generator import ai_question_generator
+from profile_analysis_service import profile_analysis_service
+from success_prediction_engine import success_prediction_engine
+from recommendation_index import recommendation_index
+from certificate_bulk_job import certificate_bulk_job_service
+from course_creation_job import course_creation_job_service
+from progress_buffer import progress_write_buffer
+from learning_path import learning_path_read_model
+from course_bulk_insert import course_bulk_writer
+from summary_queries import with_course_description, with_module_content, module_counts
+from certificate_stats import certificate_stats_service
+from question_search import question_search_service
+from question_dedup import question_duplicate_index
 
 admin_bp = Blueprint('admin', __name__)
 
@@ -222,7 +235,10 @@ def get_admin_courses():
         courses_with_stats = db.session.query(
             Course,
             func.count(CourseEnrollment.id).label('enrollment_count')
-        ).outerjoin(CourseEnrollment).group_by(Course.id).all()
+        ).outerjoin(CourseEnrollment).group_by(Course.id).options(with_course_description()).all()
+        
+        # Counted in SQL; len(course.modules) loaded every module body
+        modules_count = module_counts()
         
         courses_data = []
         for course, enrollment_count in courses_with_stats:
@@ -233,7 +249,7 @@ def get_admin_courses():
                 'skill_level': course.skill_level,
                 'duration_weeks': course.duration_weeks,
                 'is_active': course.is_active,
-                'modules_count': len(course.modules),
+                'modules_count': modules_count.get(course.id, 0),
                 'enrollment_count': enrollment_count or 0,
                 'created_at': course.created_at.isoformat()
             })
@@ -253,7 +269,7 @@ def get_admin_courses():
 @jwt_required()
 @admin_required
 def create_course():
-    """Create a new course with comprehensive AI-generated content"""
+    """Start creating a new course with comprehensive AI-generated content; poll the returned job"""
     try:
         data = request.get_json()
         print(f"📝 Received course creation request: {data}")
@@ -266,107 +282,62 @@ def create_course():
         
         print(f"🤖 Creating AI-powered course: {data['title']} ({data['skill_level']})")
         
-        # Import AI course generator
-        try:
-            from ai_course_generator import ai_course_generator
-            print("✅ AI course generator imported successfully")
-        except Exception as import_error:
-            print(f"❌ Failed to import AI course generator: {import_error}")
-            raise import_error
-        
-        # Generate complete course content using AI
-        try:
-            course_content = ai_course_generator.generate_complete_course(
-                course_title=data['title'],
-                skill_level=data['skill_level'].capitalize(),
-                duration_weeks=data.get('duration_weeks', 8),
-                modules_count=data.get('modules_count', 8)
-            )
-            print("✅ AI course content generated successfully")
-        except Exception as ai_error:
-            print(f"❌ AI course generation failed: {ai_error}")
-            import traceback
-            traceback.print_exc()
-            raise ai_error
-        
-        print(f"✅ AI generated course with {len(course_content['modules'])} modules and {len(course_content['questions'])} questions")
-        
-        # Create the course
-        course = Course(
-            title=data['title'],
-            description=data.get('description') or course_content['course_info'].get('description', f"Comprehensive {data['title']} course with AI-generated content"),
-            skill_level=data['skill_level'].capitalize(),
-            duration_weeks=data.get('duration_weeks', 8)
-        )
-        
-        db.session.add(course)
-        db.session.flush()  # Get the course ID
-        
-        # Create AI-generated modules
-        for module_data in course_content['modules']:
-            module = CourseModule(
-                course_id=course.id,
-                title=module_data['title'],
-                content=module_data['content'],
-                order_index=module_data.get('order_index', 1)
-            )
-            db.session.add(module)
-        
-        # Create AI-generated questions with course_id only if requested
-        questions_created = 0
-        if data.get('generate_questions', False) and course_content['questions']:
-            for question_data in course_content['questions']:
-                question = Question(
-                    question_text=question_data['question_text'],
-                    question_type=question_data['question_type'],
-                    difficulty_level=question_data['difficulty_level'],
-                    category=question_data.get('category', data['title']),
-                    course_id=course.id,  # Link question to the course
-                    correct_answer=question_data['correct_answer'],
-                    options=question_data.get('options')
-                )
-                db.session.add(question)
-                questions_created += 1
-        
-        db.session.commit()
+        job = course_creation_job_service.start_job(data)
         
-        # Prepare response with comprehensive course information
-        response_data = {
+        return jsonify({
             'success': True,
-            'message': f'🎉 Course "{course.title}" created successfully with comprehensive AI-generated content!',
-            'course': {
-                'id': str(course.id),
-                'title': course.title,
-                'description': course.description,
-                'skill_level': course.skill_level,
-                'duration_weeks': course.duration_weeks,
-                'modules_count': len(course_content['modules']),
-                'questions_count': len(course_content['questions']),
-                'created_at': course.created_at.isoformat()
-            },
-            'ai_generated_content': {
-                'modules': len(course_content['modules']),
-                'questions': questions_created,
-                'learning_path': course_content['learning_path'],
-                'assessments': len(course_content['assessments']),
-                'completion_criteria': course_content['completion_criteria']
-            }
-        }
-        
-        print(f"🚀 Course created successfully: {course.title} with {len(course_content['modules'])} modules")
-        
-        return jsonify(response_data), 201
+            'message': f'Course "{data["title"]}" is being generated',
+            'job': job
+        }), 202
         
     except Exception as e:
-        db.session.rollback()
         print(f"❌ Error creating course: {str(e)}")
-        import traceback
-        traceback.print_exc()
         return jsonify({
             'success': False,
             'message': f'Failed to create course: {str(e)}'
         }), 500
 
+@admin_bp.route('/courses/jobs', methods=['GET'])
+@jwt_required()
+@admin_required
+def get_course_creation_jobs():
+    """List recent course creation jobs with their progress"""
+    try:
+        jobs = course_creation_job_service.list_jobs()
+        return jsonify({
+            'success': True,
+            'jobs': jobs,
+            'total_jobs': len(jobs)
+        }), 200
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Failed to get course creation jobs: {str(e)}'
+        }), 500
+
+@admin_bp.route('/courses/jobs/<job_id>', methods=['GET'])
+@jwt_required()
+@admin_required
+def get_course_creation_job(job_id):
+    """Get progress, and once completed the created course, for a course creation job"""
+    try:
+        job = course_creation_job_service.get_job(job_id)
+        if not job:
+            return jsonify({
+                'success': False,
+                'message': 'Course creation job not found'
+            }), 404
+        
+        return jsonify({
+            'success': True,
+            'job': job
+        }), 200
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Failed to get course creation job: {str(e)}'
+        }), 500
+
 @admin_bp.route('/courses/<course_id>', methods=['DELETE'])
 @jwt_required()
 @admin_required
@@ -444,7 +415,7 @@ def get_course_enrollments(course_id):
                 },
                 'enrolled_at': enrollment.enrolled_at.isoformat(),
                 'completed_at': enrollment.completed_at.isoformat() if enrollment.completed_at else None,
-                'progress_percentage': enrollment.progress_percentage,
+                'progress_percentage': progress_write_buffer.progress(enrollment),
                 'status': enrollment.status
             })
         
@@ -504,48 +475,18 @@ def exit_student_from_course(enrollment_id):
 def get_course_learning_path(course_id):
     """Get AI-generated learning path for a course"""
     try:
-        course = Course.query.get(course_id)
-        if not course:
+        # Modules, module tests and final project from the per-course read model
+        course_path = learning_path_read_model.course_path(course_id)
+        if not course_path:
             return jsonify({
                 'success': False,
                 'message': 'Course not found'
             }), 404
         
-        # Get course modules
-        modules = CourseModule.query.filter_by(
-            course_id=course_id,
-            is_active=True
-        ).order_by(CourseModule.order_index).all()
-        
-        # Import AI course generator
-        from ai_course_generator import ai_course_generator
-        
-        # Generate learning path
-        modules_data = [
-            {
-                'title': module.title,
-                'order_index': module.order_index,
-                'content': module.content[:200] + '...' if len(module.content) > 200 else module.content
-            }
-            for module in modules
-        ]
-        
-        learning_path = ai_course_generator._generate_learning_path(
-            course.title,
-            course.skill_level,
-            modules_data
-        )
-        
         return jsonify({
             'success': True,
-            'learning_path': learning_path,
-            'course_info': {
-                'id': str(course.id),
-                'title': course.title,
-                'skill_level': course.skill_level,
-                'duration_weeks': course.duration_weeks,
-                'modules_count': len(modules)
-            }
+            'learning_path': course_path['learning_path'],
+            'course_info': course_path['course']
         }), 200
         
     except Exception as e:
@@ -798,6 +739,20 @@ def send_mentor_welcome_email(mentor_name, mentor_email, password):
         print(f"Failed to send mentor welcome email: {str(e)}")
         return False
 
+def duplicate_question_response(question_text, allow_duplicate=False, course_id=None, category=None):
+    """409 naming the existing near-identical question in the same course or category, unless the admin allows it"""
+    if allow_duplicate:
+        return None
+    duplicate = question_duplicate_index.find_duplicate(question_text, course_id=course_id, category=category)
+    if not duplicate:
+        return None
+    return jsonify({
+        'success': False,
+        'message': 'A near-identical question already exists',
+        'duplicate_of': duplicate['question_id'],
+        'similarity': duplicate['similarity']
+    }), 409
+
 @admin_bp.route('/questions', methods=['POST'])
 @jwt_required()
 @admin_required
@@ -813,6 +768,11 @@ def create_question():
                 'message': 'Question text, type, difficulty level, and correct answer are required'
             }), 400
         
+        duplicate_response = duplicate_question_response(data['question_text'], data.get('allow_duplicate'),
+                                                         data.get('course_id'), data.get('category'))
+        if duplicate_response:
+            return duplicate_response
+        
         question = Question(
             question_text=data['question_text'],
             question_type=data['question_type'],
@@ -955,35 +915,27 @@ def get_ai_user_insights():
         skill_level_distribution = {'beginner': 0, 'intermediate': 0, 'advanced': 0}
         user_profiles = []
         
+        # Stored analyses are only recomputed for users whose bio data or scores changed
+        analyses = profile_analysis_service.get_profiles(users_with_bio)
+        
         for user, bio_data in users_with_bio:
-            # Prepare bio data for AI analysis
-            bio_dict = {
-                'skills': bio_data.skills,
-                'goals': bio_data.goals,
-                'interests': bio_data.interests,
-                'education': bio_data.education,
-                'experience_level': bio_data.experience_level
-            }
-            
-            # Get assessment scores
-            assessment_scores = [a.score_percentage for a in user.assessments] if user.assessments else None
-            
-            # Analyze user profile
-            profile = ai_engine.analyze_user_profile(bio_dict, assessment_scores)
+            profile = analyses[user.id]['profile']
+            assessment_scores = analyses[user.id]['assessment_scores']
             
             # Count interests
             for interest in profile['interests']:
                 interest_distribution[interest] = interest_distribution.get(interest, 0) + 1
             
             # Count skill levels
-            skill_level_distribution[profile['skill_level']] += 1
+            skill_key = str(profile['skill_level']).lower()
+            skill_level_distribution[skill_key] = skill_level_distribution.get(skill_key, 0) + 1
             
             user_profiles.append({
                 'user_id': str(user.id),
                 'user_name': user.name,
                 'profile': profile,
                 'course_count': len(user.enrollments),
-                'assessment_count': len(user.assessments),
+                'assessment_count': len(assessment_scores) if assessment_scores else 0,
                 'avg_score': sum(assessment_scores) / len(assessment_scores) if assessment_scores else 0
             })
         
@@ -1114,17 +1066,10 @@ def get_ai_course_recommendations():
         demand_analysis = {}
         skill_gaps = {}
         
+        analyses = profile_analysis_service.get_profiles(users_with_bio)
+        
         for user, bio_data in users_with_bio:
-            bio_dict = {
-                'skills': bio_data.skills,
-                'goals': bio_data.goals,
-                'interests': bio_data.interests,
-                'education': bio_data.education,
-                'experience_level': bio_data.experience_level
-            }
-            
-            assessment_scores = [a.score_percentage for a in user.assessments] if user.assessments else None
-            profile = ai_engine.analyze_user_profile(bio_dict, assessment_scores)
+            profile = analyses[user.id]['profile']
             
             # Track demand for each interest area
             for interest in profile['interests']:
@@ -1423,20 +1368,30 @@ def toggle_mentor_availability(user_id):
 @jwt_required()
 @admin_required
 def get_all_questions():
-    """Get all questions for admin management with optional course filtering"""
+    """Search and page through questions for admin management, with optional course filtering"""
     try:
         # Get optional course_id filter from query parameters
         course_id = request.args.get('course_id')
         
-        if course_id:
-            # Filter questions by course_id
-            questions = Question.query.filter_by(course_id=course_id).all()
-        else:
-            # Get all questions
-            questions = Question.query.all()
+        try:
+            page = question_search_service.search(
+                search=request.args.get('q'),
+                category=request.args.get('category'),
+                difficulty=request.args.get('difficulty'),
+                question_type=request.args.get('type'),
+                status=request.args.get('status'),
+                course_id=course_id,
+                limit=request.args.get('limit', type=int),
+                cursor=request.args.get('cursor')
+            )
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
         
         questions_data = []
-        for question in questions:
+        for question in page['questions']:
             questions_data.append({
                 'id': str(question.id),
                 'question_text': question.question_text,
@@ -1450,12 +1405,18 @@ def get_all_questions():
                 'created_at': question.created_at.isoformat()
             })
         
-        return jsonify({
+        response = {
             'success': True,
             'questions': questions_data,
-            'total_questions': len(questions_data),
+            'next_cursor': page['next_cursor'],
+            'limit': page['limit'],
             'filtered_by_course': course_id is not None
-        }), 200
+        }
+        if 'facets' in page:
+            response['total_questions'] = page['total']
+            response['facets'] = page['facets']
+        
+        return jsonify(response), 200
         
     except Exception as e:
         return jsonify({
@@ -1569,6 +1530,28 @@ def toggle_question_active(question_id):
             'message': f'Failed to toggle question status: {str(e)}'
         }), 500
 
+@admin_bp.route('/questions/deduplicate', methods=['POST'])
+@jwt_required()
+@admin_required
+def deduplicate_questions():
+    """Find near-identical questions within each course module or bank category; with apply=true deactivate all but the oldest of each group"""
+    try:
+        data = request.get_json(silent=True) or {}
+        result = question_duplicate_index.deduplicate(apply=bool(data.get('apply', False)))
+        
+        return jsonify({
+            'success': True,
+            'message': f"Found {result['duplicate_questions']} duplicate questions in {result['groups']} groups",
+            **result
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'message': f'Failed to deduplicate questions: {str(e)}'
+        }), 500
+
 @admin_bp.route('/questions/generate-ai', methods=['POST'])
 @jwt_required()
 @admin_required
@@ -1582,6 +1565,7 @@ def generate_ai_questions():
         question_type = data.get('question_type', 'multiple_choice')
         
         generated_questions = []
+        duplicates = question_duplicate_index.batch()
         
         for i in range(count):
             # Generate question using AI
@@ -1589,6 +1573,10 @@ def generate_ai_questions():
                 question_type, difficulty, category
             )
             
+            # Skip near-identical repeats of questions already in the bank
+            if not duplicates.accept(question_data['question_text'], category=category):
+                continue
+            
             question = Question(
                 question_text=question_data['question_text'],
                 question_type=question_type,
@@ -1613,7 +1601,8 @@ def generate_ai_questions():
             'success': True,
             'message': f'Successfully generated {len(generated_questions)} AI practice questions',
             'questions': generated_questions,
-            'questions_count': len(generated_questions)
+            'questions_count': len(generated_questions),
+            'duplicates_skipped': duplicates.skipped
         }), 201
         
     except Exception as e:
@@ -1629,100 +1618,60 @@ def generate_ai_questions():
 def get_success_predictions():
     """Get AI predictions for user success rates"""
     try:
-        # Get users with complete data
-        users_with_data = db.session.query(User).filter(
-            User.is_admin == False,
-            User.bio_data.has(),
-            User.assessments.any()
-        ).all()
+        limit = request.args.get('limit', 100, type=int)
         
-        if not users_with_data:
+        # One aggregate query for all learners, scored as NumPy arrays
+        features = success_prediction_engine.load_features()
+        
+        if len(features['user_ids']) == 0:
             return jsonify({
                 'success': False,
                 'message': 'Insufficient user data for predictions'
             }), 404
         
+        probabilities = success_prediction_engine.predict(features)
+        summary = success_prediction_engine.summarize(probabilities)
+        
+        # Only the top-ranked users are expanded into detailed predictions
+        top_indices = np.argsort(-probabilities, kind='stable')[:limit]
+        top_user_ids = [features['user_ids'][i] for i in top_indices]
+        users_with_bio = db.session.query(User, BioData).join(BioData).filter(User.id.in_(top_user_ids)).all()
+        analyses = profile_analysis_service.get_profiles(users_with_bio)
+        
         predictions = []
-        success_categories = {'high': 0, 'medium': 0, 'low': 0}
-        
-        for user in users_with_data:
-            bio_data = user.bio_data
-            bio_dict = {
-                'skills': bio_data.skills,
-                'goals': bio_data.goals,
-                'interests': bio_data.interests,
-                'education': bio_data.education,
-                'experience_level': bio_data.experience_level
-            }
+        for i in top_indices:
+            user_id = features['user_ids'][i]
+            success_probability = float(probabilities[i])
+            profile = analyses.get(user_id, {}).get('profile') or {}
+            interests = profile.get('interests') or []
+            profile_completeness = profile.get('profile_completeness', 0)
+            course_progress = features['course_progress'][i]
+            assessment_score = features['assessment_score'][i]
             
-            # Get user progress data
-            assessment_scores = [a.score_percentage for a in user.assessments]
-            course_progress = sum([e.progress_percentage for e in user.enrollments]) / len(user.enrollments) if user.enrollments else 0
-            
-            # Analyze profile
-            profile = ai_engine.analyze_user_profile(bio_dict, assessment_scores)
-            
-            # Get learning recommendations
-            recommendations = ai_engine.get_learning_recommendations(profile, course_progress, assessment_scores)
+            if success_probability >= success_prediction_engine.HIGH_SUCCESS_THRESHOLD:
+                success_level = 'high'
+            elif success_probability >= success_prediction_engine.AT_RISK_THRESHOLD:
+                success_level = 'medium'
+            else:
+                success_level = 'low'
             
-            if recommendations:
-                best_recommendation = recommendations[0]  # Highest confidence recommendation
-                success_probability = best_recommendation['confidence']
-                
-                # Categorize success level
-                if success_probability >= 80:
-                    success_level = 'high'
-                    success_categories['high'] += 1
-                elif success_probability >= 60:
-                    success_level = 'medium'
-                    success_categories['medium'] += 1
-                else:
-                    success_level = 'low'
-                    success_categories['low'] += 1
-                
-                predictions.append({
-                    'user_id': str(user.id),
-                    'user_name': user.name,
-                    'success_probability': success_probability,
-                    'success_level': success_level,
-                    'predicted_path': best_recommendation['career_title'],
-                    'current_progress': {
-                        'avg_assessment_score': round(sum(assessment_scores) / len(assessment_scores), 1),
-                        'course_completion': round(course_progress, 1),
-                        'profile_completeness': profile['profile_completeness']
-                    },
-                    'recommendations': [
-                        'Complete more assessments' if len(assessment_scores) < 3 else 'Continue current progress',
-                        'Enroll in more courses' if len(user.enrollments) < 2 else 'Focus on course completion',
-                        'Update profile information' if profile['profile_completeness'] < 80 else 'Profile looks good'
-                    ]
-                })
-        
-        # Sort by success probability
-        predictions.sort(key=lambda x: x['success_probability'], reverse=True)
-        
-        # Generate summary insights
-        total_users = len(predictions)
-        summary = {
-            'total_users_analyzed': total_users,
-            'success_distribution': {
-                'high_success': {
-                    'count': success_categories['high'],
-                    'percentage': round((success_categories['high'] / total_users) * 100, 1)
+            predictions.append({
+                'user_id': str(user_id),
+                'user_name': features['user_names'][i],
+                'success_probability': success_probability,
+                'success_level': success_level,
+                'predicted_path': f"{interests[0]} Track" if interests else 'General Learning Track',
+                'current_progress': {
+                    'avg_assessment_score': 0 if np.isnan(assessment_score) else round(float(assessment_score), 1),
+                    'course_completion': 0 if np.isnan(course_progress) else round(float(course_progress), 1),
+                    'profile_completeness': profile_completeness
                 },
-                'medium_success': {
-                    'count': success_categories['medium'],
-                    'percentage': round((success_categories['medium'] / total_users) * 100, 1)
-                },
-                'low_success': {
-                    'count': success_categories['low'],
-                    'percentage': round((success_categories['low'] / total_users) * 100, 1)
-                }
-            },
-            'average_success_rate': round(sum([p['success_probability'] for p in predictions]) / total_users, 1),
-            'at_risk_users': len([p for p in predictions if p['success_probability'] < 60]),
-            'high_potential_users': len([p for p in predictions if p['success_probability'] >= 80])
-        }
+                'recommendations': [
+                    'Complete more assessments' if features['assessment_count'][i] < 3 else 'Continue current progress',
+                    'Enroll in more courses' if features['enrollment_count'][i] < 2 else 'Focus on course completion',
+                    'Update profile information' if profile_completeness < 80 else 'Profile looks good'
+                ]
+            })
         
         return jsonify({
             'success': True,
@@ -1755,17 +1704,9 @@ def get_mentor_matching_insights():
         
         # Analyze user interests
         interest_demand = {}
+        analyses = profile_analysis_service.get_profiles(users_with_bio)
         for user, bio_data in users_with_bio:
-            bio_dict = {
-                'skills': bio_data.skills,
-                'goals': bio_data.goals,
-                'interests': bio_data.interests,
-                'education': bio_data.education,
-                'experience_level': bio_data.experience_level
-            }
-            
-            assessment_scores = [a.score_percentage for a in user.assessments] if user.assessments else None
-            profile = ai_engine.analyze_user_profile(bio_dict, assessment_scores)
+            profile = analyses[user.id]['profile']
             
             for interest in profile['interests']:
                 interest_demand[interest] = interest_demand.get(interest, 0) + 1
@@ -1777,10 +1718,9 @@ def get_mentor_matching_insights():
             for area in expertise_areas:
                 area = area.strip()
                 # Map expertise to our interest categories
-                for category in ai_engine.skill_categories.keys():
-                    if any(keyword in area for keyword in ai_engine.skill_categories[category]['keywords']):
-                        mentor_coverage[category] = mentor_coverage.get(category, 0) + 1
-                        break
+                category = ai_engine.category_matcher.first_match(area)
+                if category:
+                    mentor_coverage[category] = mentor_coverage.get(category, 0) + 1
         
         # Identify gaps and recommendations
         gaps = []
@@ -1811,16 +1751,7 @@ def get_mentor_matching_insights():
         # Generate matching suggestions
         matching_suggestions = []
         for user, bio_data in users_with_bio[:10]:  # Top 10 users for example
-            bio_dict = {
-                'skills': bio_data.skills,
-                'goals': bio_data.goals,
-                'interests': bio_data.interests,
-                'education': bio_data.education,
-                'experience_level': bio_data.experience_level
-            }
-            
-            assessment_scores = [a.score_percentage for a in user.assessments] if user.assessments else None
-            profile = ai_engine.analyze_user_profile(bio_dict, assessment_scores)
+            profile = analyses[user.id]['profile']
             
             # Find best matching mentors
             mentor_matches = ai_engine.recommend_mentors(profile, limit=3)
@@ -1859,13 +1790,37 @@ def get_mentor_matching_insights():
             'message': f'Failed to generate mentor matching insights: {str(e)}'
         }), 500
 
+@admin_bp.route('/ai-analytics/recommendation-index/rebuild', methods=['POST'])
+@jwt_required()
+@admin_required
+def rebuild_recommendation_index():
+    """Rebuild the local course/mentor recommendation index from the current catalog"""
+    try:
+        recommendation_index.build_from_db()
+        recommendation_index.save()
+        
+        return jsonify({
+            'success': True,
+            'message': 'Recommendation index rebuilt successfully',
+            'indexed_courses': len(recommendation_index.courses),
+            'indexed_mentors': len(recommendation_index.mentors),
+            'generated_at': datetime.utcnow().isoformat()
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Failed to rebuild recommendation index: {str(e)}'
+        }), 500
+
 @admin_bp.route('/courses', methods=['GET'])
 @jwt_required()
 @admin_required
 def get_all_courses():
     """Get all courses for admin management"""
     try:
-        courses = Course.query.all()
+        courses = Course.query.options(with_course_description()).all()
+        modules_count = module_counts()
         
         courses_data = []
         for course in courses:
@@ -1881,7 +1836,7 @@ def get_all_courses():
                 'skill_level': course.skill_level,
                 'duration_weeks': course.duration_weeks,
                 'is_active': course.is_active,
-                'modules_count': len(course.modules),
+                'modules_count': modules_count.get(course.id, 0),
                 'statistics': {
                     'total_enrollments': total_enrollments,
                     'completed_enrollments': completed_enrollments,
@@ -1958,7 +1913,9 @@ def get_course_modules_admin(course_id):
                 'message': 'Course not found'
             }), 404
         
-        modules = CourseModule.query.filter_by(course_id=course_id).order_by(CourseModule.order_index).all()
+        modules = CourseModule.query.filter_by(course_id=course_id).options(
+            with_module_content()
+        ).order_by(CourseModule.order_index).all()
         
         modules_data = []
         for module in modules:
@@ -2068,35 +2025,27 @@ def create_course_with_modules():
                 'message': 'Title and skill level are required'
             }), 400
         
-        # Create the course
-        course = Course(
-            title=data['title'],
-            description=data.get('description'),
-            skill_level=data['skill_level'].capitalize(),  # Ensure proper capitalization
-            duration_weeks=data.get('duration_weeks', 8)
-        )
-        
-        db.session.add(course)
-        db.session.flush()  # Get the course ID
-        
-        # Add modules if provided
+        # Add modules if provided (order follows the submitted list, untitled entries skipped)
         modules_data = data.get('modules', [])
-        created_modules = []
-        
-        for i, module_data in enumerate(modules_data):
-            if module_data.get('title'):
-                module = CourseModule(
-                    course_id=course.id,
-                    title=module_data['title'],
-                    content=module_data.get('content', ''),
-                    order_index=i + 1
-                )
-                db.session.add(module)
-                created_modules.append({
-                    'title': module.title,
-                    'content': module.content,
-                    'order_index': module.order_index
-                })
+        created_modules = [
+            {
+                'title': module_data['title'],
+                'content': module_data.get('content', ''),
+                'order_index': i + 1
+            }
+            for i, module_data in enumerate(modules_data) if module_data.get('title')
+        ]
+        
+        # Create the course with its modules inserted in bulk
+        course = course_bulk_writer.create_course(
+            {
+                'title': data['title'],
+                'description': data.get('description'),
+                'skill_level': data['skill_level'].capitalize(),  # Ensure proper capitalization
+                'duration_weeks': data.get('duration_weeks', 8)
+            },
+            created_modules
+        )['course']
         
         db.session.commit()
         
@@ -3326,6 +3275,136 @@ def get_all_certificates():
             'message': f'Failed to get certificates: {str(e)}'
         }), 500
 
+@admin_bp.route('/certificates/stats', methods=['GET'])
+@jwt_required()
+@admin_required
+def get_platform_certificate_stats():
+    """Platform-wide certificate statistics, grouped by course"""
+    try:
+        stats = certificate_stats_service.platform_stats()
+        
+        return jsonify({
+            'success': True,
+            'stats': stats,
+            'generated_at': datetime.utcnow().isoformat()
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Failed to get certificate stats: {str(e)}'
+        }), 500
+
+@admin_bp.route('/certificates/bulk-jobs', methods=['POST'])
+@jwt_required()
+@admin_required
+def start_certificate_bulk_job():
+    """Issue missing certificates and re-render existing ones for a course or set of enrollments"""
+    try:
+        data = request.get_json() or {}
+        course_id = data.get('course_id')
+        enrollment_ids = data.get('enrollment_ids')
+        
+        if not course_id and not enrollment_ids:
+            return jsonify({
+                'success': False,
+                'message': 'course_id or enrollment_ids is required'
+            }), 400
+        
+        if course_id and not Course.query.get(course_id):
+            return jsonify({
+                'success': False,
+                'message': 'Course not found'
+            }), 404
+        
+        job = certificate_bulk_job_service.start_job(
+            course_id=course_id,
+            enrollment_ids=enrollment_ids,
+            issue_missing=data.get('issue_missing', True),
+            rerender=data.get('rerender', True)
+        )
+        
+        return jsonify({
+            'success': True,
+            'message': 'Certificate bulk job started',
+            'job': job
+        }), 202
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Failed to start certificate bulk job: {str(e)}'
+        }), 500
+
+@admin_bp.route('/certificates/bulk-jobs', methods=['GET'])
+@jwt_required()
+@admin_required
+def get_certificate_bulk_jobs():
+    """List certificate bulk jobs with their progress"""
+    try:
+        jobs = certificate_bulk_job_service.list_jobs()
+        
+        return jsonify({
+            'success': True,
+            'jobs': jobs,
+            'total_jobs': len(jobs)
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Failed to get certificate bulk jobs: {str(e)}'
+        }), 500
+
+@admin_bp.route('/certificates/bulk-jobs/<job_id>', methods=['GET'])
+@jwt_required()
+@admin_required
+def get_certificate_bulk_job(job_id):
+    """Get progress for a certificate bulk job"""
+    try:
+        job = certificate_bulk_job_service.get_job(job_id)
+        if not job:
+            return jsonify({
+                'success': False,
+                'message': 'Job not found'
+            }), 404
+        
+        return jsonify({
+            'success': True,
+            'job': job
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Failed to get certificate bulk job: {str(e)}'
+        }), 500
+
+@admin_bp.route('/certificates/bulk-jobs/<job_id>/resume', methods=['POST'])
+@jwt_required()
+@admin_required
+def resume_certificate_bulk_job(job_id):
+    """Resume an interrupted or failed certificate bulk job from its checkpoint"""
+    try:
+        job = certificate_bulk_job_service.resume_job(job_id)
+        if not job:
+            return jsonify({
+                'success': False,
+                'message': 'Job not found'
+            }), 404
+        
+        return jsonify({
+            'success': True,
+            'message': 'Certificate bulk job resumed' if job['status'] != 'completed' else 'Job already completed',
+            'job': job
+        }), 202
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Failed to resume certificate bulk job: {str(e)}'
+        }), 500
+
 @admin_bp.route('/ai-questions/generate', methods=['POST'])
 @jwt_required()
 @admin_required
@@ -3386,6 +3465,11 @@ def save_ai_generated_question():
                 'message': 'All required fields must be provided'
             }), 400
         
+        duplicate_response = duplicate_question_response(question_text, data.get('allow_duplicate'),
+                                                         course_id, category)
+        if duplicate_response:
+            return duplicate_response
+        
         # Create new question
         new_question = Question(
             question_text=question_text,
@@ -3518,18 +3602,22 @@ def batch_generate_questions():
             }), 400
         
         generated_questions = []
+        duplicates = question_duplicate_index.batch()
         for i in range(count):
             question = ai_question_generator.generate_question(
                 question_type=question_type,
                 difficulty=difficulty,
                 category=category
             )
-            generated_questions.append(question)
+            # Drop repeats so the admin only reviews questions that can actually be saved
+            if duplicates.accept(question.get('question_text'), category=category):
+                generated_questions.append(question)
         
         return jsonify({
             'success': True,
             'questions': generated_questions,
             'count': len(generated_questions),
+            'duplicates_skipped': duplicates.skipped,
             'message': f'{len(generated_questions)} questions generated successfully'
         }), 200
         
@@ -4,8 +4,9 @@ from datetime import datetime
 import random
 import json
 
-from models import db, Assessment, Question
+from models import db, Assessment, AssessmentSession, Question, BioData
 from ai_recommendations_simple import ai_engine
+from answer_grading import answer_grading_engine
 
 assessments_bp = Blueprint('assessments', __name__)
 
@@ -54,17 +55,13 @@ def get_assessment_questions():
             ai_questions = ai_engine.generate_intelligent_assessment_questions(user_profile, 20)
             print(f"Generated {len(ai_questions)} AI-personalized questions")
             
-            # Shuffle questions uniquely for each user
-            import random
-            seed = hash(f"{user_id}_assessment_{datetime.now().date()}")
-            random.seed(seed)
+            # Shuffle questions uniquely for each serving; the order is persisted below
             shuffled_questions = ai_questions.copy()
             random.shuffle(shuffled_questions)
-            random.seed()  # Reset seed
             
             # Prepare questions for frontend (without correct answers)
             questions_data = []
-            correct_answers_map = {}
+            answer_key = {}
             for i, question in enumerate(shuffled_questions, 1):
                 question_id = f'ai_personalized_{i}'
                 questions_data.append({
@@ -77,9 +74,12 @@ def get_assessment_questions():
                     'points': question.get('points', 5)
                 })
                 # Store correct answer separately (not sent to frontend)
-                correct_answers_map[question_id] = question['correct_answer']
+                answer_key[question_id] = {
+                    'correct_answer': question['correct_answer'],
+                    'question_type': question['question_type']
+                }
             
-
+            assessment_type = 'ai_personalized'
             
         except Exception as ai_error:
             print(f"AI question generation failed: {ai_error}")
@@ -87,23 +87,21 @@ def get_assessment_questions():
             db_questions = Question.query.filter_by(is_active=True).all()
             
             # Shuffle and select 20 questions
-            import random
-            seed = hash(f"{user_id}_fallback_{datetime.now().date()}")
-            random.seed(seed)
             selected_questions = random.sample(db_questions, min(20, len(db_questions)))
-            random.seed()
             
             questions_data = []
+            answer_key = {}
             for i, question in enumerate(selected_questions, 1):
+                question_id = f'db_{question.id}'
                 question_data = {
-                    'id': f'db_{question.id}',
+                    'id': question_id,
                     'question_text': question.question_text,
                     'question_type': question.question_type,
                     'difficulty_level': question.difficulty_level,
                     'category': question.category,
-                    'correct_answer': question.correct_answer,
                     'points': 5
                 }
+                answer_key[question_id] = answer_grading_engine.key_entry(question)
                 
                 if question.question_type == 'multiple_choice' and question.options:
                     if isinstance(question.options, dict):
@@ -122,11 +120,27 @@ def get_assessment_questions():
                 'confidence_score': 0.5,
                 'recommended_focus': 'Foundation Building'
             }
+            assessment_type = 'database'
+        
+        # Persist the served set and its answer key so submission is graded by lookup
+        assessment_session = AssessmentSession(
+            user_id=user_id,
+            assessment_type=assessment_type,
+            questions_order={
+                'question_ids': [question['id'] for question in questions_data],
+                'answer_key': answer_key
+            },
+            user_profile=user_profile,
+            status='served'
+        )
+        db.session.add(assessment_session)
+        db.session.commit()
         
         print(f"Returning {len(questions_data)} personalized questions")
         
         return jsonify({
             'success': True,
+            'assessment_session_id': str(assessment_session.id),
             'questions': questions_data,
             'user_profile': user_profile,
             'assessment_type': 'ai_personalized',
@@ -174,77 +188,53 @@ def submit_assessment():
         print(f"⏱️ Time taken: {time_taken} minutes")
         print(f"📋 Assessment type: {assessment_type}")
         
-        # Calculate score - handle both AI-generated and database questions
-        total_questions = len(answers)
-        correct_answers = 0
+        # Answer key persisted when the assessment was served: the requested session,
+        # or the user's most recently served one for clients that do not send its id
+        assessment_session_id = data.get('assessment_session_id')
+        session_query = AssessmentSession.query.filter_by(user_id=user_id)
+        if assessment_session_id:
+            assessment_session = session_query.filter_by(id=assessment_session_id).first()
+            if not assessment_session:
+                return jsonify({
+                    'success': False,
+                    'message': 'Assessment session not found'
+                }), 404
+            if assessment_session.status == 'submitted':
+                return jsonify({
+                    'success': False,
+                    'message': 'This assessment has already been submitted'
+                }), 409
+        else:
+            assessment_session = session_query.filter_by(status='served').order_by(
+                AssessmentSession.created_at.desc()
+            ).first()
+        
+        # Database questions may be answered as 'db_<id>' or by bare id
+        question_ids = {
+            question_id: question_id.replace('db_', '', 1) if question_id.startswith('db_') else question_id
+            for question_id in answers
+        }
         
-        print(f"🧮 Starting scoring for {total_questions} questions")
+        if assessment_session:
+            answer_key = answer_grading_engine.answer_key_for_attempt(assessment_session, answers.keys())
+        elif any(question_id.startswith('ai_personalized_') for question_id in answers):
+            return jsonify({
+                'success': False,
+                'message': 'Assessment session not found. Please start the assessment again.'
+            }), 400
+        else:
+            db_answer_key = answer_grading_engine.load_answer_key(question_ids.values())
+            answer_key = {question_id: db_answer_key[db_id]
+                          for question_id, db_id in question_ids.items() if db_id in db_answer_key}
         
-        # For AI-generated questions, we need to regenerate the same questions deterministically
-        try:
-            biodata = BioData.query.filter_by(user_id=user_id).first()
-            if biodata:
-                bio_data = {
-                    'skills': biodata.skills or 'General Programming',
-                    'goals': biodata.goals or 'Learn programming',
-                    'interests': biodata.interests or 'Web Development',
-                    'education': biodata.education or 'Self-taught',
-                    'experience_level': biodata.experience_level or 'Beginner'
-                }
-                
-                # Generate the same questions using the same seed
-                user_profile = ai_engine.analyze_bio_data_with_ai(bio_data)
-                
-                # Use deterministic seed for consistent question generation
-                import random
-                seed = hash(f"{user_id}_assessment_{datetime.now().date()}")
-                random.seed(seed)
-                
-                ai_questions = ai_engine.generate_intelligent_assessment_questions(user_profile, 20)
-                
-                # Shuffle with same seed
-                shuffled_questions = ai_questions.copy()
-                random.shuffle(shuffled_questions)
-                random.seed()  # Reset seed
-                
-                # Create answer key
-                question_answers = {}
-                for i, question in enumerate(shuffled_questions, 1):
-                    question_answers[f'ai_personalized_{i}'] = question['correct_answer']
-                
-                # Score the answers
-                for question_id, user_answer in answers.items():
-                    if question_id.startswith('ai_personalized_'):
-                        correct_answer = question_answers.get(question_id)
-                        if correct_answer and str(user_answer).strip() == str(correct_answer).strip():
-                            correct_answers += 1
-                    elif question_id.startswith('db_'):
-                        # Database question
-                        db_question_id = question_id.replace('db_', '')
-                        question = Question.query.get(db_question_id)
-                        if question and question.correct_answer:
-                            if str(user_answer).strip() == str(question.correct_answer).strip():
-                                correct_answers += 1
-                    else:
-                        # Try database lookup
-                        question = Question.query.get(question_id)
-                        if question and question.correct_answer:
-                            if str(user_answer).strip() == str(question.correct_answer).strip():
-                                correct_answers += 1
-                                
-            else:
-                # No bio data - fallback scoring
-                correct_answers = int(total_questions * 0.6)
-                
-        except Exception as scoring_error:
-            print(f"Error in scoring: {scoring_error}")
-            # Fallback scoring based on reasonable assumptions
-            correct_answers = int(total_questions * 0.65)
+        grading = answer_grading_engine.grade(answers, answer_key, case_sensitive=True)
+        total_questions = grading['total_questions']
+        correct_answers = grading['correct_answers']
+        score_percentage = grading['score_percentage']
         
-        score_percentage = (correct_answers / total_questions * 100) if total_questions > 0 else 0
+        print(f"🧮 Scored {correct_answers}/{total_questions} answers")
         
         # Get user's bio data for personalized recommendations
-        from models import BioData
         biodata = BioData.query.filter_by(user_id=user_id).first()
         
         if biodata:
@@ -266,7 +256,11 @@ def submit_assessment():
         
         # Generate comprehensive user profile and course recommendations
         try:
-            user_profile = ai_engine.analyze_bio_data_with_ai(bio_data)
+            # Reuse the profile the questions were generated from when it was persisted
+            if assessment_session and assessment_session.user_profile:
+                user_profile = dict(assessment_session.user_profile)
+            else:
+                user_profile = ai_engine.analyze_bio_data_with_ai(bio_data)
             
             # Update skill level based on assessment score
             if score_percentage >= 90:
@@ -294,7 +288,8 @@ def submit_assessment():
             # Get SkillNova internal courses
             try:
                 from models import Course
-                internal_courses = Course.query.filter_by(is_active=True).all()
+                from summary_queries import with_course_description
+                internal_courses = Course.query.filter_by(is_active=True).options(with_course_description()).all()
                 skillnova_recommendations = []
                 
                 print(f"📚 Found {len(internal_courses)} internal courses")
@@ -383,6 +378,13 @@ def submit_assessment():
         )
         
         db.session.add(assessment)
+        
+        if assessment_session:
+            db.session.flush()
+            assessment_session.status = 'submitted'
+            assessment_session.assessment_id = assessment.id
+            assessment_session.submitted_at = datetime.utcnow()
+        
         db.session.commit()
         
         # Determine performance level and message
@@ -1,14 +1,15 @@
-from flask import Blueprint, request, jsonify, send_file
+from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
-import os
 
-from models import db, User, Course, CourseEnrollment, Assessment, BioData
-from certificate_service import CertificateGenerator
+from models import db, User, Course, CourseEnrollment, Certificate, Assessment, BioData
+from certificate_worker import certificate_render_worker
+from certificate_verification import certificate_verification_service, verification_rate_limiter, rate_limited
+from certificate_stats import certificate_stats_service
 from ai_recommendations_simple import ai_engine
+from progress_buffer import progress_write_buffer
 
 certificates_bp = Blueprint('certificates', __name__)
-certificate_generator = CertificateGenerator()
 
 @certificates_bp.route('/generate', methods=['POST'])
 @jwt_required()
@@ -36,7 +37,7 @@ def generate_certificate():
             }), 404
         
         # Check if user has completed the course
-        enrollment = Enrollment.query.filter_by(
+        enrollment = CourseEnrollment.query.filter_by(
             user_id=user_id,
             course_id=course_id
         ).first()
@@ -100,25 +101,15 @@ def generate_certificate():
             }
             user_profile = ai_engine.analyze_bio_data_with_ai(bio_dict)
         
-        # Generate certificate with AI integration
-        certificate_result = certificate_generator.generate_certificate(
+        # Issue the certificate; the PDF is rendered in the background after commit
+        certificate = certificate_render_worker.issue_certificate(
+            user_id=user_id,
+            course_id=course_id,
             user_name=user.name,
             course_title=course.title,
             final_score=final_assessment.score_percentage,
             completion_date=enrollment.completed_at or datetime.utcnow()
         )
-        
-        # Save certificate to database
-        certificate = Certificate(
-            user_id=user_id,
-            course_id=course_id,
-            certificate_number=certificate_result['certificate_number'],
-            final_score=final_assessment.score_percentage,
-            pdf_path=certificate_result['pdf_path'],
-            is_valid=True
-        )
-        
-        db.session.add(certificate)
         db.session.commit()
         
         return jsonify({
@@ -128,6 +119,7 @@ def generate_certificate():
                 'certificate_number': certificate.certificate_number,
                 'final_score': certificate.final_score,
                 'issued_date': certificate.issued_at.isoformat(),
+                'status': certificate.status,
                 'download_url': f'/api/certificates/download/{certificate.certificate_number}'
             }
         }), 201
@@ -154,18 +146,15 @@ def download_certificate(certificate_number):
                 'message': 'Certificate not found'
             }), 404
         
-        if not os.path.exists(certificate.pdf_path):
+        # Render on demand if the PDF is pending or missing, then serve it with cache validators
+        response = certificate_render_worker.download_response(certificate)
+        if response is None:
             return jsonify({
                 'success': False,
                 'message': 'Certificate file not found'
             }), 404
         
-        return send_file(
-            certificate.pdf_path,
-            as_attachment=True,
-            download_name=f"certificate_{certificate_number}.pdf",
-            mimetype='application/pdf'
-        )
+        return response
         
     except Exception as e:
         return jsonify({
@@ -174,13 +163,11 @@ def download_certificate(certificate_number):
         }), 500
 
 @certificates_bp.route('/verify/<certificate_number>', methods=['GET'])
+@rate_limited(verification_rate_limiter)
 def verify_certificate(certificate_number):
     """Verify certificate authenticity"""
     try:
-        certificate = Certificate.query.filter_by(
-            certificate_number=certificate_number,
-            is_valid=True
-        ).first()
+        certificate = certificate_verification_service.verify(certificate_number)
         
         if not certificate:
             return jsonify({
@@ -188,17 +175,10 @@ def verify_certificate(certificate_number):
                 'message': 'Certificate not found or invalid'
             })
         
-        user = User.query.get(certificate.user_id)
-        course = Course.query.get(certificate.course_id)
-        
         return jsonify({
             'valid': True,
             'certificate': {
-                'certificate_number': certificate.certificate_number,
-                'student_name': user.name,
-                'course_title': course.title,
-                'final_score': certificate.final_score,
-                'issued_date': certificate.issued_at.isoformat(),
+                **certificate,
                 'verification_date': datetime.utcnow().isoformat()
             },
             'message': 'Certificate is valid and authentic'
@@ -230,7 +210,8 @@ def get_user_certificates():
                 'course_title': course.title if course else 'Unknown Course',
                 'final_score': cert.final_score,
                 'issued_date': cert.issued_at.isoformat(),
-                'download_url': f'/api/certificates/download/{cert.certificate_number}',
+                'status': cert.status,
+                'download_url': certificate_render_worker.download_url(cert, '/api/certificates/download'),
                 'verify_url': f'/api/certificates/verify/{cert.certificate_number}'
             })
         
@@ -253,7 +234,7 @@ def check_certificate_eligibility(course_id):
         user_id = get_jwt_identity()
         
         # Check enrollment
-        enrollment = Enrollment.query.filter_by(
+        enrollment = CourseEnrollment.query.filter_by(
             user_id=user_id,
             course_id=course_id
         ).first()
@@ -268,7 +249,7 @@ def check_certificate_eligibility(course_id):
             return jsonify({
                 'eligible': False,
                 'reason': 'Course not completed',
-                'progress': enrollment.progress_percentage
+                'progress': progress_write_buffer.progress(enrollment)
             })
         
         # Check final assessment
@@ -323,38 +304,12 @@ def get_certificate_stats():
     try:
         user_id = get_jwt_identity()
         
-        # Get user's certificates
-        certificates = Certificate.query.filter_by(
-            user_id=user_id,
-            is_valid=True
-        ).all()
-        
-        # Calculate statistics
-        total_certificates = len(certificates)
-        average_score = sum([cert.final_score for cert in certificates]) / total_certificates if total_certificates > 0 else 0
-        
-        # Get achievement levels
-        achievement_levels = {}
-        for cert in certificates:
-            if cert.final_score >= 90:
-                level = 'Distinction'
-            elif cert.final_score >= 80:
-                level = 'Merit'
-            elif cert.final_score >= 70:
-                level = 'Credit'
-            else:
-                level = 'Pass'
-            
-            achievement_levels[level] = achievement_levels.get(level, 0) + 1
+        # One aggregate query: totals, average and conditional counts per achievement level
+        stats = certificate_stats_service.user_stats(user_id)
         
         return jsonify({
             'success': True,
-            'stats': {
-                'total_certificates': total_certificates,
-                'average_score': round(average_score, 1),
-                'achievement_levels': achievement_levels,
-                'latest_certificate': certificates[-1].issued_at.isoformat() if certificates else None
-            }
+            'stats': stats
         }), 200
         
     except Exception as e:
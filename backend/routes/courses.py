@@ -1,9 +1,16 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
 from sqlalchemy import func
+from sqlalchemy.orm import joinedload
 
 from models import db, Course, CourseEnrollment, CourseModule, Assessment, CourseRating
+from recommendation_cache import recommendation_cache, COURSE_AI
+from course_catalog import course_catalog_cache
+from summary_queries import with_course_description, with_module_content, module_counts
+from module_progress import module_progress_service
+from progress_buffer import progress_write_buffer
+from learning_path import learning_path_read_model
 
 courses_bp = Blueprint('courses', __name__)
 
@@ -14,29 +21,12 @@ def get_courses():
         return '', 200
     
     try:
-        courses = Course.query.filter_by(is_active=True).all()
-        
-        courses_data = []
-        for course in courses:
-            courses_data.append({
-                'id': str(course.id),
-                'title': course.title,
-                'description': course.description,
-                'skill_level': course.skill_level,
-                'duration_weeks': course.duration_weeks,
-                'modules_count': len(course.modules),
-                'cost': float(course.cost) if course.cost else 0.0,
-                'is_locked': course.is_locked or False,
-                # Keep rating for backward compatibility
-                'average_rating': course.average_rating or 0.0,
-                'total_ratings': course.total_ratings or 0,
-                'created_at': course.created_at.isoformat()
-            })
-        
-        return jsonify({
-            'success': True,
-            'courses': courses_data
-        }), 200
+        # Served from the catalog read model; an unchanged catalog is answered with a 304
+        _, body, etag = course_catalog_cache.snapshot()
+        response = current_app.response_class(body, mimetype='application/json')
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'public, no-cache'
+        return response.make_conditional(request)
         
     except Exception as e:
         return jsonify({
@@ -77,7 +67,8 @@ def get_course_recommendations():
         recommended_courses = Course.query.filter_by(
             skill_level=skill_level,
             is_active=True
-        ).all()
+        ).options(with_course_description()).all()
+        modules_count = module_counts(course.id for course in recommended_courses)
         
         recommendations = []
         for course in recommended_courses:
@@ -87,7 +78,7 @@ def get_course_recommendations():
                 'description': course.description,
                 'skill_level': course.skill_level,
                 'duration_weeks': course.duration_weeks,
-                'modules_count': len(course.modules),
+                'modules_count': modules_count.get(course.id, 0),
                 'recommendation_reason': f'Based on your assessment score of {score}%, this {skill_level.lower()} level course is perfect for you.'
             })
         
@@ -231,7 +222,9 @@ def get_my_courses():
         user_id = get_jwt_identity()
         print(f"🔍 Getting courses for user {user_id}")
         
-        enrollments = CourseEnrollment.query.filter_by(user_id=user_id).all()
+        enrollments = CourseEnrollment.query.filter_by(user_id=user_id).options(
+            joinedload(CourseEnrollment.course).options(with_course_description())
+        ).all()
         print(f"📝 Found {len(enrollments)} enrollments")
         
         my_courses = []
@@ -248,7 +241,7 @@ def get_my_courses():
                 },
                 'enrolled_at': enrollment.enrolled_at.isoformat(),
                 'completed_at': enrollment.completed_at.isoformat() if enrollment.completed_at else None,
-                'progress_percentage': enrollment.progress_percentage,
+                'progress_percentage': progress_write_buffer.progress(enrollment),
                 'status': enrollment.status
             }
             my_courses.append(course_data)
@@ -293,7 +286,7 @@ def get_course_modules(course_id):
         modules = CourseModule.query.filter_by(
             course_id=course_id,
             is_active=True
-        ).order_by(CourseModule.order_index).all()
+        ).options(with_module_content()).order_by(CourseModule.order_index).all()
         
         print(f"📚 Found {len(modules)} modules for course")
         
@@ -355,21 +348,22 @@ def update_course_progress(course_id):
                 'message': 'Enrollment not found'
             }), 404
         
-        # Update progress
-        enrollment.progress_percentage = progress_percentage
-        
-        # Mark as completed if 100%
+        # Mark as completed if 100% - written through, since it changes the enrollment status
         if progress_percentage == 100:
+            progress_write_buffer.discard(enrollment.id)
+            enrollment.progress_percentage = progress_percentage
             enrollment.status = 'completed'
             enrollment.completed_at = datetime.utcnow()
-        
-        db.session.commit()
+            db.session.commit()
+        else:
+            # Player pings are coalesced and flushed in batches
+            progress_write_buffer.record(enrollment.id, progress_percentage)
         
         return jsonify({
             'success': True,
             'message': 'Progress updated successfully',
             'enrollment': {
-                'progress_percentage': enrollment.progress_percentage,
+                'progress_percentage': progress_write_buffer.progress(enrollment),
                 'status': enrollment.status,
                 'completed_at': enrollment.completed_at.isoformat() if enrollment.completed_at else None
             }
@@ -399,7 +393,7 @@ def get_course_by_id(course_id):
             'description': course.description,
             'skill_level': course.skill_level,
             'duration_weeks': course.duration_weeks,
-            'modules_count': len(course.modules),
+            'modules_count': module_counts([course.id]).get(course.id, 0),
             'cost': float(course.cost) if course.cost else 0.0,
             'is_locked': course.is_locked or False,
             'created_at': course.created_at.isoformat()
@@ -448,34 +442,18 @@ def complete_module(course_id, module_id):
                 'message': 'Module not found'
             }), 404
         
-        # Get all modules for the course to calculate progress
-        all_modules = CourseModule.query.filter_by(
-            course_id=course_id,
-            is_active=True
-        ).all()
-        
-        # For simplicity, we'll track completed modules in the enrollment record
-        # In a production system, you'd have a separate ModuleCompletion table
-        
-        # Calculate new progress (assuming this module is now completed)
-        total_modules = len(all_modules)
-        # This is a simplified approach - in production, track individual module completions
-        current_progress = enrollment.progress_percentage
-        progress_per_module = 100.0 / total_modules if total_modules > 0 else 0
-        new_progress = min(current_progress + progress_per_module, 100.0)
+        # One completion row per module; repeats leave progress unchanged
+        progress = module_progress_service.complete_module(enrollment, module)
         
-        # Update enrollment progress
-        enrollment.progress_percentage = new_progress
-        
-        # Check if course is now completed
+        # Check if course is now completed (only on the transition, not on repeats)
         certificate_data = None
-        if new_progress >= 100.0:
+        if progress['all_completed'] and enrollment.status != 'completed':
             enrollment.status = 'completed'
             enrollment.completed_at = datetime.utcnow()
             
             # Generate AI certificate for course completion
             try:
-                from certificate_service import CertificateGenerator
+                from certificate_worker import certificate_render_worker
                 from models import User, Certificate
                 
                 user = User.query.get(user_id)
@@ -488,34 +466,24 @@ def complete_module(course_id, module_id):
                 ).first()
                 
                 if not existing_cert:
-                    # Generate AI certificate
-                    cert_generator = CertificateGenerator()
-                    
-                    cert_result = cert_generator.generate_certificate(
+                    # Issue the certificate now; the PDF is rendered in the background after commit
+                    certificate = certificate_render_worker.issue_certificate(
+                        user_id=user_id,
+                        course_id=course_id,
                         user_name=user.name,
                         course_title=course.title,
                         final_score=85.0,  # Default score for course completion
                         completion_date=datetime.utcnow()
                     )
                     
-                    # Save certificate to database
-                    certificate = Certificate(
-                        user_id=user_id,
-                        course_id=course_id,
-                        certificate_number=cert_result['certificate_number'],
-                        final_score=85.0,
-                        certificate_data=cert_result['certificate_data'],
-                        pdf_path=cert_result['pdf_path']
-                    )
-                    db.session.add(certificate)
-                    
                     certificate_data = {
-                        'certificate_number': cert_result['certificate_number'],
-                        'download_url': f'/api/tests/certificates/download/{cert_result["certificate_number"]}',
-                        'issued_date': datetime.utcnow().isoformat()
+                        'certificate_number': certificate.certificate_number,
+                        'download_url': f'/api/tests/certificates/download/{certificate.certificate_number}',
+                        'issued_date': datetime.utcnow().isoformat(),
+                        'status': 'pending'
                     }
                     
-                    print(f"Certificate generated for course completion: {cert_result['certificate_number']}")
+                    print(f"Certificate issued for course completion: {certificate.certificate_number}")
                 
             except Exception as cert_error:
                 print(f"Certificate generation error: {cert_error}")
@@ -525,11 +493,13 @@ def complete_module(course_id, module_id):
         
         response_data = {
             'success': True,
-            'message': f'Module "{module.title}" completed successfully',
+            'message': f'Module "{module.title}" completed successfully' if progress['newly_completed']
+                       else f'Module "{module.title}" was already completed',
+            'already_completed': not progress['newly_completed'],
             'progress': {
-                'percentage': round(new_progress, 1),
-                'completed_modules': int(new_progress / progress_per_module) if progress_per_module > 0 else 0,
-                'total_modules': total_modules
+                'percentage': round(progress['percentage'], 1),
+                'completed_modules': progress['completed_modules'],
+                'total_modules': progress['total_modules']
             }
         }
         
@@ -553,68 +523,30 @@ def get_course_learning_path(course_id):
     try:
         user_id = get_jwt_identity()
         
-        # Check if user is enrolled in the course
-        enrollment = CourseEnrollment.query.filter_by(
-            user_id=user_id,
-            course_id=course_id
-        ).first()
+        # Check if user is enrolled in the course (one query with their completion state)
+        user_state = learning_path_read_model.load_user_state(user_id, course_id)
         
-        if not enrollment:
+        if not user_state:
             return jsonify({
                 'success': False,
                 'message': 'You are not enrolled in this course'
             }), 403
         
-        course = Course.query.get(course_id)
-        if not course:
+        # Modules, module tests and final project from the per-course read model
+        course_path = learning_path_read_model.course_path(course_id)
+        if not course_path:
             return jsonify({
                 'success': False,
                 'message': 'Course not found'
             }), 404
         
-        # Get course modules
-        modules = CourseModule.query.filter_by(
-            course_id=course_id,
-            is_active=True
-        ).order_by(CourseModule.order_index).all()
-        
-        # Import AI course generator
-        from ai_course_generator import ai_course_generator
-        
-        # Generate learning path
-        modules_data = [
-            {
-                'title': module.title,
-                'order_index': module.order_index,
-                'content': module.content[:200] + '...' if len(module.content) > 200 else module.content
-            }
-            for module in modules
-        ]
-        
-        learning_path = ai_course_generator._generate_learning_path(
-            course.title,
-            course.skill_level,
-            modules_data
-        )
-        
-        # Add user progress information
-        learning_path['user_progress'] = {
-            'enrollment_date': enrollment.enrolled_at.isoformat(),
-            'progress_percentage': enrollment.progress_percentage,
-            'status': enrollment.status,
-            'completed_at': enrollment.completed_at.isoformat() if enrollment.completed_at else None
-        }
+        # Overlay user progress information
+        learning_path = learning_path_read_model.user_path(course_path, user_state)
         
         return jsonify({
             'success': True,
             'learning_path': learning_path,
-            'course_info': {
-                'id': str(course.id),
-                'title': course.title,
-                'skill_level': course.skill_level,
-                'duration_weeks': course.duration_weeks,
-                'modules_count': len(modules)
-            }
+            'course_info': course_path['course']
         }), 200
         
     except Exception as e:
@@ -702,68 +634,72 @@ def get_ai_course_recommendations():
     try:
         user_id = get_jwt_identity()
         
-        # Get all available courses (now only Java)
-        courses = Course.query.all()
+        def compute():
+            # Get all available courses (now only Java)
+            courses = Course.query.options(with_course_description()).all()
         
-        # Get user's enrollments
-        enrollments = CourseEnrollment.query.filter_by(user_id=user_id).all()
-        enrolled_course_ids = [str(e.course_id) for e in enrollments]
+            # Get user's enrollments
+            enrollments = CourseEnrollment.query.filter_by(user_id=user_id).all()
+            enrolled_course_ids = [str(e.course_id) for e in enrollments]
         
-        # Create simple recommendations for Java programming
-        recommendations = {
-            'courses': [],
-            'next_steps': [],
-            'skill_gaps': []
-        }
+            # Create simple recommendations for Java programming
+            recommendations = {
+                'courses': [],
+                'next_steps': [],
+                'skill_gaps': []
+            }
         
-        for course in courses:
-            if str(course.id) not in enrolled_course_ids:
-                # Recommend unenrolled courses
-                recommendations['courses'].append({
-                    'id': str(course.id),
-                    'title': course.title,
-                    'description': course.description,
-                    'skill_level': course.skill_level,
-                    'duration_weeks': course.duration_weeks,
-                    'reason': 'Perfect for mastering Java programming fundamentals',
-                    'confidence': 0.95
-                })
-            else:
-                # Suggest next steps for enrolled courses
-                enrollment = next(e for e in enrollments if str(e.course_id) == str(course.id))
-                if enrollment.progress_percentage < 100:
-                    recommendations['next_steps'].append({
-                        'course_id': str(course.id),
-                        'course_title': course.title,
-                        'current_progress': enrollment.progress_percentage,
-                        'suggestion': 'Continue with your Java learning journey',
-                        'next_module': 'Next available module'
+            for course in courses:
+                if str(course.id) not in enrolled_course_ids:
+                    # Recommend unenrolled courses
+                    recommendations['courses'].append({
+                        'id': str(course.id),
+                        'title': course.title,
+                        'description': course.description,
+                        'skill_level': course.skill_level,
+                        'duration_weeks': course.duration_weeks,
+                        'reason': 'Perfect for mastering Java programming fundamentals',
+                        'confidence': 0.95
                     })
-        
-        # Add skill development suggestions
-        recommendations['skill_gaps'] = [
-            {
-                'skill': 'Object-Oriented Programming',
-                'importance': 'High',
-                'description': 'Master OOP concepts in Java for better code structure'
-            },
-            {
-                'skill': 'Data Structures & Algorithms',
-                'importance': 'High', 
-                'description': 'Essential for technical interviews and efficient coding'
-            },
-            {
-                'skill': 'Exception Handling',
-                'importance': 'Medium',
-                'description': 'Learn to handle errors gracefully in Java applications'
+                else:
+                    # Suggest next steps for enrolled courses
+                    enrollment = next(e for e in enrollments if str(e.course_id) == str(course.id))
+                    if progress_write_buffer.progress(enrollment) < 100:
+                        recommendations['next_steps'].append({
+                            'course_id': str(course.id),
+                            'course_title': course.title,
+                            'current_progress': progress_write_buffer.progress(enrollment),
+                            'suggestion': 'Continue with your Java learning journey',
+                            'next_module': 'Next available module'
+                        })
+        
+            # Add skill development suggestions
+            recommendations['skill_gaps'] = [
+                {
+                    'skill': 'Object-Oriented Programming',
+                    'importance': 'High',
+                    'description': 'Master OOP concepts in Java for better code structure'
+                },
+                {
+                    'skill': 'Data Structures & Algorithms',
+                    'importance': 'High', 
+                    'description': 'Essential for technical interviews and efficient coding'
+                },
+                {
+                    'skill': 'Exception Handling',
+                    'importance': 'Medium',
+                    'description': 'Learn to handle errors gracefully in Java applications'
+                }
+            ]
+            
+            return {
+                'success': True,
+                'recommendations': recommendations,
+                'message': 'Java programming recommendations generated successfully'
             }
-        ]
         
-        return jsonify({
-            'success': True,
-            'recommendations': recommendations,
-            'message': 'Java programming recommendations generated successfully'
-        }), 200
+        # Cached per user; enrollments and catalog writes invalidate it
+        return jsonify(recommendation_cache.get_or_compute(user_id, COURSE_AI, compute)), 200
         
     except Exception as e:
         print(f"AI Recommendations error: {str(e)}")
@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
+from sqlalchemy.orm import undefer
 
 from models import db, Course, CourseEnrollment, CourseFinalProject, UserFinalProjectSubmission
 
@@ -289,7 +290,7 @@ def get_mentor_final_projects():
         # Get all submissions that need review
         submissions = UserFinalProjectSubmission.query.filter(
             UserFinalProjectSubmission.status.in_(['submitted', 'in_progress'])
-        ).all()
+        ).options(undefer(UserFinalProjectSubmission.submission_data)).all()
         
         submissions_data = []
         for submission in submissions:
@@ -2,6 +2,9 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 
 from models import db, Question, CourseEnrollment
+from answer_grading import answer_grading_engine
+from question_selection import question_selection_service
+from question_dedup import question_duplicate_index
 
 practice_bp = Blueprint('practice', __name__)
 
@@ -19,17 +22,14 @@ def get_practice_module(module_id):
         category = request.args.get('category', 'general')
         limit = int(request.args.get('limit', 10))
         
-        # Get practice questions
-        questions_query = Question.query.filter_by(
-            is_active=True,
-            difficulty_level=difficulty
+        # Get practice questions, skipping ones this user has seen recently
+        questions = question_selection_service.sample(
+            limit,
+            category=category if category != 'general' else None,
+            difficulty=difficulty,
+            user_id=user_id
         )
         
-        if category != 'general':
-            questions_query = questions_query.filter_by(category=category)
-        
-        questions = questions_query.limit(limit).all()
-        
         practice_questions = []
         for question in questions:
             question_data = {
@@ -64,29 +64,27 @@ def get_practice_module(module_id):
 @practice_bp.route('/questions', methods=['GET', 'OPTIONS'])
 @jwt_required()
 def get_practice_questions():
-    """Get practice questions with filters - prioritize AI-created questions from admin"""
+    """Get practice questions with filters - random sample the user has not seen recently"""
     if request.method == 'OPTIONS':
         return '', 200
     
     try:
+        user_id = get_jwt_identity()
+        
         # Get query parameters
         difficulty = request.args.get('difficulty')
         category = request.args.get('category', 'Programming')  # Default category
         question_type = request.args.get('type', 'multiple_choice')
         limit = int(request.args.get('limit', 20))
         
-        # Build query - prioritize AI-created questions
-        query = Question.query.filter_by(is_active=True)
-        
-        if difficulty:
-            query = query.filter_by(difficulty_level=difficulty)
-        if category:
-            query = query.filter_by(category=category)
-        if question_type:
-            query = query.filter_by(question_type=question_type)
-        
-        # Order by creation date (newest first) to show AI-created questions first
-        questions = query.order_by(Question.created_at.desc()).limit(limit).all()
+        # Random sample across difficulties (or the requested one) from the cached category pool
+        selection = {
+            'category': category,
+            'question_type': question_type,
+            'difficulty': difficulty,
+            'user_id': user_id
+        }
+        questions = question_selection_service.sample(limit, **selection)
         
         # If no questions found, generate them using AI
         if not questions:
@@ -101,12 +99,17 @@ def get_practice_questions():
                 # Mix of difficulties
                 difficulties_to_generate = ['easy'] * 3 + ['medium'] * 4 + ['hard'] * 3
             
+            duplicates = question_duplicate_index.batch()
             for diff in difficulties_to_generate:
                 try:
                     question_data = ai_question_generator.generate_question(
                         question_type, diff, category
                     )
                     
+                    # Skip near-identical repeats of questions already in the bank
+                    if not duplicates.accept(question_data['question_text'], category=category):
+                        continue
+                    
                     new_question = Question(
                         question_text=question_data['question_text'],
                         question_type=question_type,
@@ -125,15 +128,7 @@ def get_practice_questions():
             db.session.commit()
             
             # Reload questions
-            query = Question.query.filter_by(is_active=True)
-            if difficulty:
-                query = query.filter_by(difficulty_level=difficulty)
-            if category:
-                query = query.filter_by(category=category)
-            if question_type:
-                query = query.filter_by(question_type=question_type)
-            
-            questions = query.order_by(Question.created_at.desc()).limit(limit).all()
+            questions = question_selection_service.sample(limit, **selection)
             
             if not questions:
                 return jsonify({
@@ -222,7 +217,7 @@ def submit_practice_answer():
         
         if question.question_type == 'multiple_choice':
             # Strict comparison - exact match required
-            is_correct = str(user_answer).strip().lower() == str(question.correct_answer).strip().lower()
+            is_correct = answer_grading_engine.is_correct(user_answer, question.correct_answer)
             if is_correct:
                 feedback = "✅ Correct! Well done."
             else:
@@ -274,7 +269,7 @@ def submit_practice_answer():
         
         else:
             # For any other question type, strict text comparison
-            is_correct = str(user_answer).strip().lower() == str(question.correct_answer).strip().lower()
+            is_correct = answer_grading_engine.is_correct(user_answer, question.correct_answer)
             if is_correct:
                 feedback = "✅ Correct answer!"
             else:
@@ -332,18 +327,11 @@ def create_practice_quiz():
         category = data.get('category')
         num_questions = min(int(data.get('num_questions', 10)), 50)  # Max 50 questions
         
-        # Build query for quiz questions
-        query = Question.query.filter_by(
-            is_active=True,
-            difficulty_level=difficulty
+        # Get random questions without ORDER BY random() over the whole bank
+        questions = question_selection_service.sample(
+            num_questions, category=category, difficulty=difficulty, user_id=user_id
         )
         
-        if category:
-            query = query.filter_by(category=category)
-        
-        # Get random questions
-        questions = query.order_by(db.func.random()).limit(num_questions).all()
-        
         if not questions:
             return jsonify({
                 'success': False,
@@ -409,12 +397,17 @@ def generate_ai_practice_questions():
         from ai_question_generator import ai_question_generator
         
         generated_questions = []
+        duplicates = question_duplicate_index.batch()
         for i in range(count):
             # Generate question using AI
             question_data = ai_question_generator.generate_question(
                 question_type, difficulty, category
             )
             
+            # Skip near-identical repeats of questions already in the bank
+            if not duplicates.accept(question_data['question_text'], category=category):
+                continue
+            
             question = Question(
                 question_text=question_data['question_text'],
                 question_type=question_type,
@@ -438,7 +431,8 @@ def generate_ai_practice_questions():
             'success': True,
             'message': f'Successfully generated {len(generated_questions)} AI practice questions',
             'questions': generated_questions,
-            'questions_count': len(generated_questions)
+            'questions_count': len(generated_questions),
+            'duplicates_skipped': duplicates.skipped
         }), 201
         
     except Exception as e:
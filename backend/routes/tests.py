@@ -1,9 +1,14 @@
-from flask import Blueprint, request, jsonify, send_file
+from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
-import os
 
 from models import db, Assessment, TestResult, Question, User, UserTestAttempt, Certificate, Course
+from certificate_worker import certificate_render_worker
+from answer_grading import answer_grading_engine
+from question_selection import question_selection_service
+from question_dedup import question_duplicate_index
+from certificate_verification import certificate_verification_service, verification_rate_limiter, rate_limited
+from progress_buffer import progress_write_buffer
 tests_bp = Blueprint('tests', __name__)
 
 @tests_bp.route('/initial-assessment', methods=['GET'])
@@ -53,12 +58,11 @@ def get_initial_assessment():
         # Get or generate assessment questions based on user's topics
         all_questions = []
         
-        # Try to get existing questions for user's topics
+        # Try to get existing questions for user's topics, sampled across difficulties
         for topic in user_topics:
-            topic_questions = Question.query.filter(
-                Question.is_active == True,
-                Question.category.ilike(f'%{topic}%')
-            ).limit(4).all()
+            topic_questions = question_selection_service.sample(
+                4, topic=topic, user_id=user_id, exclude=[q.id for q in all_questions]
+            )
             all_questions.extend(topic_questions)
         
         print(f"Found {len(all_questions)} existing questions for user topics")
@@ -73,6 +77,7 @@ def get_initial_assessment():
             difficulties = ['easy', 'medium', 'hard']
             
             generated_count = 0
+            duplicates = question_duplicate_index.batch()
             for topic in user_topics:
                 for difficulty in difficulties:
                     try:
@@ -82,20 +87,27 @@ def get_initial_assessment():
                         )
                         
                         if question_data and question_data.get('question_text'):
-                            new_question = Question(
-                                question_text=question_data['question_text'],
-                                question_type='multiple_choice',
-                                difficulty_level=difficulty,
-                                category=topic,
-                                correct_answer=question_data.get('correct_answer'),
-                                options=question_data.get('options'),
-                                explanation=question_data.get('explanation'),
-                                is_active=True
-                            )
-                            db.session.add(new_question)
-                            all_questions.append(new_question)
-                            generated_count += 1
-                            print(f"Generated question {generated_count} for {topic}")
+                            if not duplicates.accept(question_data['question_text'], category=topic):
+                                # Near-identical question already in the bank: serve it instead of inserting a repeat
+                                existing = Question.query.get(duplicates.last_duplicate) if duplicates.last_duplicate else None
+                                if existing and existing.is_active and existing not in all_questions:
+                                    all_questions.append(existing)
+                                    generated_count += 1
+                            else:
+                                new_question = Question(
+                                    question_text=question_data['question_text'],
+                                    question_type='multiple_choice',
+                                    difficulty_level=difficulty,
+                                    category=topic,
+                                    correct_answer=question_data.get('correct_answer'),
+                                    options=question_data.get('options'),
+                                    explanation=question_data.get('explanation'),
+                                    is_active=True
+                                )
+                                db.session.add(new_question)
+                                all_questions.append(new_question)
+                                generated_count += 1
+                                print(f"Generated question {generated_count} for {topic}")
                         
                         if generated_count >= 20:
                             break
@@ -199,29 +211,14 @@ def submit_test():
                 'message': 'Invalid ID format'
             }), 400
         
-        # Calculate score
+        # Calculate score - one query for the whole answer key
         total_questions = len(answers)
-        correct_answers = 0
+        submitted = {str(answer_data.get('question_id')): answer_data.get('answer', '') for answer_data in answers}
+        answer_key = answer_grading_engine.load_answer_key(submitted.keys())
         
-        import uuid
-        for answer_data in answers:
-            question_id = answer_data.get('question_id')
-            user_answer = answer_data.get('answer', '').strip()
-            
-            # Convert question_id to UUID if it's a string
-            try:
-                if isinstance(question_id, str):
-                    question_id = uuid.UUID(question_id)
-            except (ValueError, AttributeError):
-                print(f"Invalid question_id format: {question_id}")
-                continue
-            
-            question = Question.query.get(question_id)
-            if question and question.correct_answer:
-                if question.question_type == 'multiple_choice':
-                    if user_answer.lower() == question.correct_answer.strip().lower():
-                        correct_answers += 1
-                # For other question types, we'd need more sophisticated evaluation
+        # Only multiple choice is auto-graded; other question types need more sophisticated evaluation
+        grading = answer_grading_engine.grade(submitted, answer_key, gradable_types=['multiple_choice'])
+        correct_answers = grading['correct_answers']
         
         score_percentage = (correct_answers / total_questions * 100) if total_questions > 0 else 0
         
@@ -280,7 +277,6 @@ def submit_test():
         certificate_data = None
         if test_type in ['course_final', 'final'] and score_percentage >= 60:
             try:
-                from certificate_service import CertificateGenerator
                 from models import User, Course, Certificate, CourseEnrollment
                 
                 user = User.query.get(user_id)
@@ -304,49 +300,41 @@ def submit_test():
                         ).first()
                         
                         if not existing_cert:
-                            # Generate AI certificate
-                            cert_generator = CertificateGenerator()
-                            
-                            cert_result = cert_generator.generate_certificate(
+                            # Issue the certificate now; the PDF is rendered in the background after commit
+                            certificate = certificate_render_worker.issue_certificate(
+                                user_id=user_id,
+                                course_id=course_id,
                                 user_name=user.name,
                                 course_title=course.title,
                                 final_score=score_percentage,
                                 completion_date=datetime.utcnow()
                             )
                             
-                            # Save certificate to database
-                            certificate = Certificate(
-                                user_id=user_id,
-                                course_id=course_id,
-                                certificate_number=cert_result['certificate_number'],
-                                final_score=score_percentage,
-                                certificate_data=cert_result['certificate_data'],
-                                pdf_path=cert_result['pdf_path']
-                            )
-                            db.session.add(certificate)
-                            
                             # Mark course as completed if enrollment exists
                             if enrollment:
                                 enrollment.status = 'completed'
                                 enrollment.completed_at = datetime.utcnow()
                                 enrollment.progress_percentage = 100
+                                progress_write_buffer.discard(enrollment.id)
                             
                             certificate_data = {
-                                'certificate_number': cert_result['certificate_number'],
-                                'download_url': f'/api/tests/certificates/download/{cert_result["certificate_number"]}',
+                                'certificate_number': certificate.certificate_number,
+                                'download_url': f'/api/tests/certificates/download/{certificate.certificate_number}',
                                 'issued_date': datetime.utcnow().isoformat(),
                                 'course_title': course.title,
-                                'final_score': score_percentage
+                                'final_score': score_percentage,
+                                'status': 'pending'
                             }
                             
-                            print(f"🎓 Certificate generated for course completion: {cert_result['certificate_number']}")
+                            print(f"🎓 Certificate issued for course completion: {certificate.certificate_number}")
                         else:
                             certificate_data = {
                                 'certificate_number': existing_cert.certificate_number,
-                                'download_url': f'/api/tests/certificates/download/{existing_cert.certificate_number}',
+                                'download_url': certificate_render_worker.download_url(existing_cert, '/api/tests/certificates/download'),
                                 'issued_date': existing_cert.issued_at.isoformat(),
                                 'course_title': course.title,
                                 'final_score': existing_cert.final_score,
+                                'status': existing_cert.status,
                                 'already_issued': True
                             }
                 
@@ -368,19 +356,20 @@ def submit_test():
                     ).first()
                     
                     if enrollment:
-                        # Mark module as completed and update progress
-                        total_modules = CourseModule.query.filter_by(course_id=module.course_id).count()
-                        progress_increment = 100 / total_modules if total_modules > 0 else 0
-                        new_progress = min(100, enrollment.progress_percentage + progress_increment)
-                        enrollment.progress_percentage = new_progress
+                        # Mark module as completed; retaking a passed module test does not add progress again
+                        from module_progress import module_progress_service
+                        progress = module_progress_service.complete_module(enrollment, module)
+                        new_progress = progress['percentage']
                         
                         # If all modules completed, mark course as ready for final test
-                        if new_progress >= 100:
+                        if progress['all_completed'] and enrollment.status not in ('ready_for_final', 'completed'):
                             enrollment.status = 'ready_for_final'
                         
+                        db.session.commit()
                         print(f"📈 Module {module.title} completed! Course progress: {new_progress}%")
                         
             except Exception as e:
+                db.session.rollback()
                 print(f"Error updating course progress: {e}")
         
         # Determine performance level and recommendations (60% pass requirement)
@@ -460,19 +449,15 @@ def download_certificate(certificate_number):
                 'message': 'Certificate not found or access denied'
             }), 404
         
-        # Check if PDF file exists
-        if not certificate.pdf_path or not os.path.exists(certificate.pdf_path):
+        # Render on demand if the PDF is pending or missing, then serve it with cache validators
+        response = certificate_render_worker.download_response(certificate, private=True)
+        if response is None:
             return jsonify({
                 'success': False,
                 'message': 'Certificate file not found'
             }), 404
         
-        return send_file(
-            certificate.pdf_path,
-            as_attachment=True,
-            download_name=f"certificate_{certificate_number}.pdf",
-            mimetype='application/pdf'
-        )
+        return response
         
     except Exception as e:
         return jsonify({
@@ -497,7 +482,8 @@ def get_user_certificates():
                 'course_title': cert.course.title if cert.course else 'Unknown Course',
                 'final_score': cert.final_score,
                 'issued_at': cert.issued_at.isoformat(),
-                'download_url': f'/api/tests/certificates/download/{cert.certificate_number}'
+                'status': cert.status,
+                'download_url': certificate_render_worker.download_url(cert, '/api/tests/certificates/download')
             })
         
         return jsonify({
@@ -529,29 +515,20 @@ def get_module_test(module_id):
                 'message': 'Module not found'
             }), 404
         
-        # Get questions specific to this course first, then general questions
-        course_questions = Question.query.filter_by(
-            course_id=module.course_id,
-            is_active=True
-        ).all()
+        # Get questions specific to this course first, then general questions -
+        # 5 questions for module test, not recently served to this user
+        shuffled_questions = question_selection_service.sample(5, course_id=module.course_id, user_id=user_id)
         
         # If no course-specific questions, get general questions
-        if not course_questions:
-            course_questions = Question.query.filter_by(is_active=True).all()
+        if not shuffled_questions:
+            shuffled_questions = question_selection_service.sample(5, user_id=user_id)
         
-        if not course_questions:
+        if not shuffled_questions:
             return jsonify({
                 'success': False,
                 'message': 'No questions available for this module'
             }), 404
         
-        # Shuffle questions uniquely for each user - 5 questions for module test
-        import random
-        seed = hash(f"{user_id}_{module_id}_{datetime.utcnow().date()}")
-        random.seed(seed)
-        shuffled_questions = random.sample(course_questions, min(5, len(course_questions)))
-        random.seed()  # Reset seed
-        
         test_questions = []
         for i, question in enumerate(shuffled_questions, 1):
             question_data = {
@@ -625,50 +602,29 @@ def get_course_assessment(course_id):
                 'message': 'Course not found'
             }), 404
         
-        # Get course-specific questions
-        course_questions = Question.query.filter_by(
-            course_id=course_id,
-            is_active=True
-        ).all()
-        
-        # If no course-specific questions, get questions by category matching course title
-        if not course_questions:
-            course_questions = Question.query.filter(
-                Question.category.ilike(f'%{course.title}%'),
-                Question.is_active == True
-            ).all()
+        # Aim for 5 easy, 7 medium, 3 hard (15 total), topping up from other difficulties
+        difficulty_mix = {'easy': 5, 'medium': 7, 'hard': 3}
         
-        # If still no questions, get general questions
-        if not course_questions:
-            course_questions = Question.query.filter_by(is_active=True).limit(15).all()
+        # Course-specific questions first, then questions by category matching course title,
+        # then general questions
+        selected_questions = question_selection_service.sample(
+            15, course_id=course.id, difficulty_mix=difficulty_mix, user_id=user_id
+        )
+        if not selected_questions:
+            selected_questions = question_selection_service.sample(
+                15, topic=course.title, difficulty_mix=difficulty_mix, user_id=user_id
+            )
+        if not selected_questions:
+            selected_questions = question_selection_service.sample(
+                15, difficulty_mix=difficulty_mix, user_id=user_id
+            )
         
-        if not course_questions:
+        if not selected_questions:
             return jsonify({
                 'success': False,
                 'message': 'No questions available for this course assessment'
             }), 404
         
-        # Select questions with balanced difficulty
-        import random
-        easy_questions = [q for q in course_questions if q.difficulty_level == 'easy']
-        medium_questions = [q for q in course_questions if q.difficulty_level == 'medium']
-        hard_questions = [q for q in course_questions if q.difficulty_level == 'hard']
-        
-        # Aim for 5 easy, 7 medium, 3 hard (15 total)
-        selected_questions = []
-        selected_questions.extend(random.sample(easy_questions, min(5, len(easy_questions))))
-        selected_questions.extend(random.sample(medium_questions, min(7, len(medium_questions))))
-        selected_questions.extend(random.sample(hard_questions, min(3, len(hard_questions))))
-        
-        # If we don't have enough, fill with remaining questions
-        remaining_needed = 15 - len(selected_questions)
-        if remaining_needed > 0:
-            remaining_questions = [q for q in course_questions if q not in selected_questions]
-            selected_questions.extend(random.sample(remaining_questions, min(remaining_needed, len(remaining_questions))))
-        
-        # Shuffle the final selection
-        random.shuffle(selected_questions)
-        
         test_questions = []
         for i, question in enumerate(selected_questions, 1):
             question_data = {
@@ -729,22 +685,15 @@ def get_final_assessment():
                 'message': 'Please complete at least one course before taking the final assessment'
             }), 400
         
-        # Get comprehensive questions from all difficulty levels
-        all_questions = Question.query.filter_by(is_active=True).all()
+        # Comprehensive questions from all difficulty levels, not recently served to this user
+        shuffled_questions = question_selection_service.sample(15, user_id=user_id)
         
-        if not all_questions:
+        if not shuffled_questions:
             return jsonify({
                 'success': False,
                 'message': 'No questions available for final assessment'
             }), 404
         
-        # Shuffle questions uniquely for each user - 15 questions for final assessment
-        import random
-        seed = hash(f"{user_id}_final_assessment_{datetime.utcnow().date()}")
-        random.seed(seed)
-        shuffled_questions = random.sample(all_questions, min(15, len(all_questions)))
-        random.seed()  # Reset seed
-        
         assessment_questions = []
         for i, question in enumerate(shuffled_questions, 1):
             question_data = {
@@ -871,22 +820,26 @@ def start_module_test():
             category = course_title.split()[0] if course_title else 'Programming'
             print(f"Extracted category from course: {category}")
         
-        # Get available questions for the test
-        all_questions = Question.query.filter_by(is_active=True).all()
+        # Sample questions the user has not been served recently, across difficulties
+        shuffled_questions = question_selection_service.sample(5, user_id=user_id)
         
-        # If no questions available, generate them using AI
-        if not all_questions or len(all_questions) < 5:
+        # If not enough questions available, generate them using AI
+        if len(shuffled_questions) < 5:
             print(f"Generating AI questions for category: {category}")
             from ai_question_generator import ai_question_generator
             
             # Generate 10 questions (mix of difficulties)
             difficulties = ['easy', 'easy', 'medium', 'medium', 'medium', 'medium', 'hard', 'hard', 'hard', 'hard']
+            duplicates = question_duplicate_index.batch()
             for difficulty in difficulties:
                 try:
                     question_data = ai_question_generator.generate_question(
                         'multiple_choice', difficulty, category
                     )
                     
+                    if not duplicates.accept(question_data['question_text'], category=category):
+                        continue
+                    
                     new_question = Question(
                         question_text=question_data['question_text'],
                         question_type='multiple_choice',
@@ -904,22 +857,15 @@ def start_module_test():
             
             db.session.commit()
             
-            # Reload questions
-            all_questions = Question.query.filter_by(is_active=True).all()
+            # Resample from the refreshed question bank
+            shuffled_questions = question_selection_service.sample(5, user_id=user_id)
             
-            if not all_questions:
+            if not shuffled_questions:
                 return jsonify({
                     'success': False,
                     'message': 'Failed to generate questions. Please try again.'
                 }), 500
         
-        # Shuffle questions uniquely for each user
-        import random
-        seed = hash(f"{user_id}_{module_id}_{datetime.utcnow().date()}")
-        random.seed(seed)
-        shuffled_questions = random.sample(all_questions, min(5, len(all_questions)))
-        random.seed()  # Reset seed
-        
         # Prepare questions for frontend
         question_data = []
         for i, question in enumerate(shuffled_questions, 1):
@@ -947,7 +893,7 @@ def start_module_test():
             user_id=user_id,
             test_id=module_id,
             test_type='module',
-            questions_order=[str(q.id) for q in shuffled_questions],
+            questions_order=answer_grading_engine.build_attempt_order(shuffled_questions),
             status='in_progress'
         )
         db.session.add(attempt)
@@ -999,22 +945,26 @@ def start_final_test():
             category = course_title.split()[0] if course_title else 'Programming'
             print(f"Extracted category from course: {category}")
         
-        # Get available questions for the final test
-        all_questions = Question.query.filter_by(is_active=True).all()
+        # Sample questions the user has not been served recently, across difficulties
+        shuffled_questions = question_selection_service.sample(15, user_id=user_id)
         
-        # If no questions available, generate them using AI
-        if not all_questions or len(all_questions) < 15:
+        # If not enough questions available, generate them using AI
+        if len(shuffled_questions) < 15:
             print(f"Generating AI questions for final test, category: {category}")
             from ai_question_generator import ai_question_generator
             
             # Generate 20 questions (mix of difficulties)
             difficulties = ['easy'] * 5 + ['medium'] * 10 + ['hard'] * 5
+            duplicates = question_duplicate_index.batch()
             for difficulty in difficulties:
                 try:
                     question_data = ai_question_generator.generate_question(
                         'multiple_choice', difficulty, category
                     )
                     
+                    if not duplicates.accept(question_data['question_text'], category=category):
+                        continue
+                    
                     new_question = Question(
                         question_text=question_data['question_text'],
                         question_type='multiple_choice',
@@ -1032,22 +982,15 @@ def start_final_test():
             
             db.session.commit()
             
-            # Reload questions
-            all_questions = Question.query.filter_by(is_active=True).all()
+            # Resample from the refreshed question bank
+            shuffled_questions = question_selection_service.sample(15, user_id=user_id)
             
-            if not all_questions:
+            if not shuffled_questions:
                 return jsonify({
                     'success': False,
                     'message': 'Failed to generate questions. Please try again.'
                 }), 500
         
-        # Shuffle questions uniquely for each user - 15 questions for final test
-        import random
-        seed = hash(f"{user_id}_final_{course_id}_{datetime.utcnow().date()}")
-        random.seed(seed)
-        shuffled_questions = random.sample(all_questions, min(15, len(all_questions)))
-        random.seed()  # Reset seed
-        
         # Prepare questions for frontend
         question_data = []
         for i, question in enumerate(shuffled_questions, 1):
@@ -1075,7 +1018,7 @@ def start_final_test():
             user_id=user_id,
             test_id=course_id,
             test_type='final',
-            questions_order=[str(q.id) for q in shuffled_questions],
+            questions_order=answer_grading_engine.build_attempt_order(shuffled_questions),
             status='in_progress'
         )
         db.session.add(attempt)
@@ -1179,19 +1122,13 @@ def complete_test():
                 'message': f'Incomplete test. Please answer all {expected_questions} questions before submitting.'
             }), 400
         
-        # STRICT EVALUATION - Calculate score based on submitted answers
-        total_questions = len(answers)
-        correct_answers = 0
-        
-        if answers:
-            for question_id, user_answer in answers.items():
-                question = Question.query.get(question_id)
-                if question and question.correct_answer:
-                    # STRICT comparison - exact match required
-                    if str(user_answer).strip().lower() == str(question.correct_answer).strip().lower():
-                        correct_answers += 1
+        # STRICT EVALUATION - grade all answers in one pass against the attempt's answer key
+        answer_key = answer_grading_engine.answer_key_for_attempt(attempt, answers.keys())
+        grading = answer_grading_engine.grade(answers, answer_key)
         
-        score_percentage = (correct_answers / total_questions * 100) if total_questions > 0 else 0
+        total_questions = grading['total_questions']
+        correct_answers = grading['correct_answers']
+        score_percentage = grading['score_percentage']
         passed = score_percentage >= 60.0  # Strict 60% passing requirement
         
         # Update test attempt
@@ -1227,28 +1164,16 @@ def complete_test():
                     ).first()
                     
                     if not existing_cert:
-                        # Generate AI certificate
-                        from certificate_service import CertificateGenerator
-                        cert_generator = CertificateGenerator()
-                        
-                        cert_result = cert_generator.generate_certificate(
+                        # Issue the certificate now; the PDF is rendered in the background after commit
+                        certificate = certificate_render_worker.issue_certificate(
+                            user_id=user_id,
+                            course_id=course_id,
                             user_name=user.name,
                             course_title=course.title,
                             final_score=score_percentage,
                             completion_date=datetime.utcnow()
                         )
                         
-                        # Save certificate to database
-                        certificate = Certificate(
-                            user_id=user_id,
-                            course_id=course_id,
-                            certificate_number=cert_result['certificate_number'],
-                            final_score=score_percentage,
-                            certificate_data=cert_result['certificate_data'],
-                            pdf_path=cert_result['pdf_path']
-                        )
-                        db.session.add(certificate)
-                        
                         # Mark course as completed
                         from models import CourseEnrollment
                         enrollment = CourseEnrollment.query.filter_by(
@@ -1259,26 +1184,29 @@ def complete_test():
                             enrollment.status = 'completed'
                             enrollment.completed_at = datetime.utcnow()
                             enrollment.progress_percentage = 100
+                            progress_write_buffer.discard(enrollment.id)
                         
                         certificate_generated = True
                         certificate_data = {
-                            'certificate_number': cert_result['certificate_number'],
-                            'download_url': f'/api/tests/certificates/download/{cert_result["certificate_number"]}',
+                            'certificate_number': certificate.certificate_number,
+                            'download_url': f'/api/tests/certificates/download/{certificate.certificate_number}',
                             'issued_date': datetime.utcnow().isoformat(),
                             'course_title': course.title,
-                            'final_score': score_percentage
+                            'final_score': score_percentage,
+                            'status': 'pending'
                         }
                         
-                        print(f"🎓 Certificate generated for {user.name}: {cert_result['certificate_number']} (Score: {score_percentage}%)")
+                        print(f"🎓 Certificate issued for {user.name}: {certificate.certificate_number} (Score: {score_percentage}%)")
                     else:
                         # Certificate already exists
                         certificate_generated = True
                         certificate_data = {
                             'certificate_number': existing_cert.certificate_number,
-                            'download_url': f'/api/tests/certificates/download/{existing_cert.certificate_number}',
+                            'download_url': certificate_render_worker.download_url(existing_cert, '/api/tests/certificates/download'),
                             'issued_date': existing_cert.issued_at.isoformat(),
                             'course_title': course.title,
                             'final_score': existing_cert.final_score,
+                            'status': existing_cert.status,
                             'already_issued': True
                         }
                         print(f"Certificate already exists for user {user.name}")
@@ -1303,6 +1231,7 @@ def complete_test():
             'certificate_threshold': 75.0,
             'certificate_generated': certificate_generated,
             'certificate_data': certificate_data,
+            'question_results': {question_id: result['is_correct'] for question_id, result in grading['results'].items()},
             'message': f'Test completed. Score: {round(score_percentage, 1)}%. {"PASSED" if passed else "FAILED - Need 60% to pass"}. {"Certificate issued!" if certificate_generated else "Need 75% for certificate." if passed else ""}'
         }
         
@@ -1327,13 +1256,11 @@ def complete_test():
 # Duplicate download_certificate function removed - using certificates.py instead
 
 @tests_bp.route('/certificates/verify/<certificate_number>', methods=['GET'])
+@rate_limited(verification_rate_limiter)
 def verify_certificate(certificate_number):
     """Verify certificate authenticity"""
     try:
-        certificate = Certificate.query.filter_by(
-            certificate_number=certificate_number,
-            is_valid=True
-        ).first()
+        certificate = certificate_verification_service.verify(certificate_number)
         
         if not certificate:
             return jsonify({
@@ -1341,18 +1268,9 @@ def verify_certificate(certificate_number):
                 'message': 'Certificate not found or invalid'
             })
         
-        user = User.query.get(certificate.user_id)
-        course = Course.query.get(certificate.course_id)
-        
         return jsonify({
             'valid': True,
-            'certificate': {
-                'certificate_number': certificate.certificate_number,
-                'student_name': user.name,
-                'course_title': course.title,
-                'final_score': certificate.final_score,
-                'issued_date': certificate.issued_at.isoformat()
-            },
+            'certificate': certificate,
             'message': 'Certificate is valid and authentic'
         })
         
@@ -1415,10 +1333,10 @@ def get_course_final_test(course_id):
             }), 403
         
         # Check if user has completed all modules (100% progress required)
-        if enrollment.progress_percentage < 100:
+        if progress_write_buffer.progress(enrollment) < 100:
             return jsonify({
                 'success': False,
-                'message': f'Complete all modules first. Current progress: {enrollment.progress_percentage}%'
+                'message': f'Complete all modules first. Current progress: {progress_write_buffer.progress(enrollment)}%'
             }), 400
         
         course = Course.query.get(course_id)
@@ -1428,41 +1346,24 @@ def get_course_final_test(course_id):
                 'message': 'Course not found'
             }), 404
         
-        # Get course-specific questions or general questions
-        course_questions = Question.query.filter_by(
-            course_id=course_id,
-            is_active=True
-        ).all()
+        # Select balanced questions (5 easy, 7 medium, 3 hard), course-specific first,
+        # general questions if there are no course-specific ones
+        difficulty_mix = {'easy': 5, 'medium': 7, 'hard': 3}
+        selected_questions = question_selection_service.sample(
+            15, course_id=course_id, difficulty_mix=difficulty_mix, user_id=user_id
+        )
         
-        if not course_questions:
-            # Get general questions if no course-specific ones
-            course_questions = Question.query.filter_by(is_active=True).limit(15).all()
+        if not selected_questions:
+            selected_questions = question_selection_service.sample(
+                15, difficulty_mix=difficulty_mix, user_id=user_id
+            )
         
-        if not course_questions:
+        if not selected_questions:
             return jsonify({
                 'success': False,
                 'message': 'No questions available for this course'
             }), 404
         
-        # Select balanced questions (5 easy, 7 medium, 3 hard)
-        import random
-        easy_questions = [q for q in course_questions if q.difficulty_level == 'easy']
-        medium_questions = [q for q in course_questions if q.difficulty_level == 'medium']
-        hard_questions = [q for q in course_questions if q.difficulty_level == 'hard']
-        
-        selected_questions = []
-        selected_questions.extend(random.sample(easy_questions, min(5, len(easy_questions))))
-        selected_questions.extend(random.sample(medium_questions, min(7, len(medium_questions))))
-        selected_questions.extend(random.sample(hard_questions, min(3, len(hard_questions))))
-        
-        # Fill remaining slots if needed
-        remaining_needed = 15 - len(selected_questions)
-        if remaining_needed > 0:
-            remaining_questions = [q for q in course_questions if q not in selected_questions]
-            selected_questions.extend(random.sample(remaining_questions, min(remaining_needed, len(remaining_questions))))
-        
-        random.shuffle(selected_questions)
-        
         test_questions = []
         for i, question in enumerate(selected_questions, 1):
             question_data = {
@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
+from sqlalchemy.orm import undefer
 import sys
 import os
 
@@ -9,7 +10,10 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from models import db, User, BioData, Question, Course, Assessment, TestResult
 from ai_recommendations_simple import ai_engine
-import random
+from profile_analysis_service import profile_analysis_service
+from question_selection import question_selection_service
+from recommendation_cache import recommendation_cache, Uncached, COURSES, MENTORS, PRACTICE, TESTS, LEARNING_PATH
+from progress_buffer import progress_write_buffer
 
 user_bp = Blueprint('user', __name__)
 
@@ -189,7 +193,7 @@ def get_dashboard():
             activities.append({
                 'type': 'enrollment',
                 'description': f'Enrolled in {enrollment.course.title}',
-                'progress': enrollment.progress_percentage,
+                'progress': progress_write_buffer.progress(enrollment),
                 'date': enrollment.enrolled_at,
                 'date_iso': enrollment.enrolled_at.isoformat()
             })
@@ -240,6 +244,45 @@ def get_dashboard():
             'message': f'Failed to get dashboard: {str(e)}'
         }), 500
 
+def _cached_recommendations(user_id, kind, recommend, limit, default_profile):
+    """Serve a recommendation payload from the per-user cache, computing it on a miss"""
+    def compute():
+        user = User.query.get(user_id)
+        biodata = BioData.query.filter_by(user_id=user_id).first()
+        
+        if not biodata:
+            # Provide default recommendations for users without bio data
+            return {
+                'success': True,
+                'recommendations': recommend(default_profile, limit=limit),
+                'message': 'Complete your bio data for personalized recommendations',
+                'user_profile': default_profile
+            }
+        
+        # Stored profile analysis, refreshed only when bio data or scores changed
+        try:
+            user_profile = profile_analysis_service.get_profile(user, biodata)
+        except Exception as e:
+            print(f"Error analyzing user profile: {e}")
+            # Fallback profile; served but not cached so the next request retries the analysis
+            user_profile = {
+                'interests': default_profile['interests'],
+                'skill_level': default_profile['skill_level']
+            }
+            raise Uncached({
+                'success': True,
+                'recommendations': recommend(user_profile, limit=limit),
+                'user_profile': user_profile
+            })
+        
+        return {
+            'success': True,
+            'recommendations': recommend(user_profile, limit=limit),
+            'user_profile': user_profile
+        }
+    
+    return recommendation_cache.get_or_compute(user_id, kind, compute)
+
 @user_bp.route('/recommendations/courses', methods=['GET', 'OPTIONS'])
 def get_course_recommendations():
     """Get AI-powered course recommendations"""
@@ -252,48 +295,14 @@ def get_course_recommendations():
     
     try:
         user_id = get_jwt_identity()
-        user = User.query.get(user_id)
-        biodata = BioData.query.filter_by(user_id=user_id).first()
-        
-        if not biodata:
-            # Provide default recommendations for users without bio data
-            default_profile = {
-                'interests': ['web_development'],
-                'skill_level': 'beginner',
-                'profile_completeness': 0
-            }
-            recommendations = ai_engine.recommend_courses(default_profile, limit=6)
-            
-            return jsonify({
-                'success': True,
-                'recommendations': recommendations,
-                'message': 'Complete your bio data for personalized recommendations',
-                'user_profile': default_profile
-            }), 200
-        
-        # Prepare user profile for AI analysis
-        bio_dict = {
-            'skills': biodata.skills,
-            'goals': biodata.goals,
-            'interests': biodata.interests,
-            'education': biodata.education,
-            'experience_level': biodata.experience_level
+        default_profile = {
+            'interests': ['web_development'],
+            'skill_level': 'beginner',
+            'profile_completeness': 0
         }
+        payload = _cached_recommendations(user_id, COURSES, ai_engine.recommend_courses, 8, default_profile)
         
-        # Get assessment scores if available
-        assessment_scores = [a.score_percentage for a in user.assessments] if user.assessments else None
-        
-        # Analyze user profile
-        user_profile = ai_engine.analyze_user_profile(bio_dict, assessment_scores)
-        
-        # Get course recommendations
-        recommendations = ai_engine.recommend_courses(user_profile, limit=8)
-        
-        return jsonify({
-            'success': True,
-            'recommendations': recommendations,
-            'user_profile': user_profile
-        }), 200
+        return jsonify(payload), 200
         
     except Exception as e:
         return jsonify({
@@ -313,48 +322,14 @@ def get_mentor_recommendations():
     
     try:
         user_id = get_jwt_identity()
-        user = User.query.get(user_id)
-        biodata = BioData.query.filter_by(user_id=user_id).first()
-        
-        if not biodata:
-            # Provide default recommendations for users without bio data
-            default_profile = {
-                'interests': ['web_development'],
-                'skill_level': 'beginner',
-                'profile_completeness': 0
-            }
-            recommendations = ai_engine.recommend_mentors(default_profile, limit=6)
-            
-            return jsonify({
-                'success': True,
-                'recommendations': recommendations,
-                'message': 'Complete your bio data for personalized recommendations',
-                'user_profile': default_profile
-            }), 200
-        
-        # Prepare user profile for AI analysis
-        bio_dict = {
-            'skills': biodata.skills,
-            'goals': biodata.goals,
-            'interests': biodata.interests,
-            'education': biodata.education,
-            'experience_level': biodata.experience_level
+        default_profile = {
+            'interests': ['web_development'],
+            'skill_level': 'beginner',
+            'profile_completeness': 0
         }
+        payload = _cached_recommendations(user_id, MENTORS, ai_engine.recommend_mentors, 6, default_profile)
         
-        # Get assessment scores if available
-        assessment_scores = [a.score_percentage for a in user.assessments] if user.assessments else None
-        
-        # Analyze user profile
-        user_profile = ai_engine.analyze_user_profile(bio_dict, assessment_scores)
-        
-        # Get mentor recommendations
-        recommendations = ai_engine.recommend_mentors(user_profile, limit=6)
-        
-        return jsonify({
-            'success': True,
-            'recommendations': recommendations,
-            'user_profile': user_profile
-        }), 200
+        return jsonify(payload), 200
         
     except Exception as e:
         return jsonify({
@@ -374,48 +349,14 @@ def get_practice_recommendations():
     
     try:
         user_id = get_jwt_identity()
-        user = User.query.get(user_id)
-        biodata = BioData.query.filter_by(user_id=user_id).first()
-        
-        if not biodata:
-            # Provide default recommendations for users without bio data
-            default_profile = {
-                'interests': ['web_development'],
-                'skill_level': 'beginner',
-                'profile_completeness': 0
-            }
-            recommendations = ai_engine.recommend_practice_exercises(default_profile, limit=6)
-            
-            return jsonify({
-                'success': True,
-                'recommendations': recommendations,
-                'message': 'Complete your bio data for personalized recommendations',
-                'user_profile': default_profile
-            }), 200
-        
-        # Prepare user profile for AI analysis
-        bio_dict = {
-            'skills': biodata.skills,
-            'goals': biodata.goals,
-            'interests': biodata.interests,
-            'education': biodata.education,
-            'experience_level': biodata.experience_level
+        default_profile = {
+            'interests': ['web_development'],
+            'skill_level': 'beginner',
+            'profile_completeness': 0
         }
+        payload = _cached_recommendations(user_id, PRACTICE, ai_engine.recommend_practice_exercises, 6, default_profile)
         
-        # Get assessment scores if available
-        assessment_scores = [a.score_percentage for a in user.assessments] if user.assessments else None
-        
-        # Analyze user profile
-        user_profile = ai_engine.analyze_user_profile(bio_dict, assessment_scores)
-        
-        # Get practice recommendations
-        recommendations = ai_engine.recommend_practice_exercises(user_profile, limit=6)
-        
-        return jsonify({
-            'success': True,
-            'recommendations': recommendations,
-            'user_profile': user_profile
-        }), 200
+        return jsonify(payload), 200
         
     except Exception as e:
         return jsonify({
@@ -484,8 +425,6 @@ def get_test_recommendations():
                 'success': False,
                 'message': 'User not found'
             }), 404
-            
-        biodata = BioData.query.filter_by(user_id=user_id).first()
     except Exception as auth_error:
         return jsonify({
             'success': False,
@@ -493,54 +432,14 @@ def get_test_recommendations():
         }), 401
     
     try:
-        
-        if not biodata:
-            # Provide default recommendations for users without bio data
-            default_profile = {
-                'interests': ['Web Development'],  # Use proper format
-                'skill_level': 'Beginner',  # Use proper capitalization
-                'profile_completeness': 0
-            }
-            recommendations = ai_engine.recommend_tests(default_profile, limit=6)
-            
-            return jsonify({
-                'success': True,
-                'recommendations': recommendations,
-                'message': 'Complete your bio data for personalized recommendations',
-                'user_profile': default_profile
-            }), 200
-        
-        # Prepare user profile for AI analysis
-        bio_dict = {
-            'skills': biodata.skills,
-            'goals': biodata.goals,
-            'interests': biodata.interests,
-            'education': biodata.education,
-            'experience_level': biodata.experience_level
+        default_profile = {
+            'interests': ['Web Development'],  # Use proper format
+            'skill_level': 'Beginner',  # Use proper capitalization
+            'profile_completeness': 0
         }
+        payload = _cached_recommendations(user_id, TESTS, ai_engine.recommend_tests, 6, default_profile)
         
-        # Get assessment scores if available
-        assessment_scores = [a.score_percentage for a in user.assessments] if user.assessments else None
-        
-        # Analyze user profile
-        try:
-            user_profile = ai_engine.analyze_user_profile(bio_dict, assessment_scores)
-        except Exception as e:
-            print(f"Error analyzing user profile: {e}")
-            # Fallback profile
-            user_profile = {
-                'interests': ['Web Development'],
-                'skill_level': 'Beginner'
-            }
-        
-        # Get test recommendations
-        recommendations = ai_engine.recommend_tests(user_profile, limit=6)
-        
-        return jsonify({
-            'success': True,
-            'recommendations': recommendations,
-            'user_profile': user_profile
-        }), 200
+        return jsonify(payload), 200
         
     except Exception as e:
         return jsonify({
@@ -556,38 +455,31 @@ def get_learning_path():
     """Get AI-generated personalized learning path"""
     try:
         user_id = get_jwt_identity()
-        user = User.query.get(user_id)
-        biodata = BioData.query.filter_by(user_id=user_id).first()
         
-        if not biodata:
+        def compute():
+            user = User.query.get(user_id)
+            biodata = BioData.query.filter_by(user_id=user_id).first()
+            if not biodata:
+                return None
+            
+            # Stored profile analysis, refreshed only when bio data or scores changed
+            user_profile = profile_analysis_service.get_profile(user, biodata)
+            
+            return {
+                'success': True,
+                'learning_path': ai_engine.generate_learning_path(user_profile),
+                'user_profile': user_profile
+            }
+        
+        payload = recommendation_cache.get_or_compute(user_id, LEARNING_PATH, compute)
+        
+        if payload is None:
             return jsonify({
                 'success': False,
                 'message': 'Please complete your bio data first to get your learning path'
             }), 400
         
-        # Prepare user profile for AI analysis
-        bio_dict = {
-            'skills': biodata.skills,
-            'goals': biodata.goals,
-            'interests': biodata.interests,
-            'education': biodata.education,
-            'experience_level': biodata.experience_level
-        }
-        
-        # Get assessment scores if available
-        assessment_scores = [a.score_percentage for a in user.assessments] if user.assessments else None
-        
-        # Analyze user profile
-        user_profile = ai_engine.analyze_user_profile(bio_dict, assessment_scores)
-        
-        # Generate learning path
-        learning_path = ai_engine.generate_learning_path(user_profile)
-        
-        return jsonify({
-            'success': True,
-            'learning_path': learning_path,
-            'user_profile': user_profile
-        }), 200
+        return jsonify(payload), 200
         
     except Exception as e:
         return jsonify({
@@ -766,7 +658,7 @@ def get_career_predictions():
         
         # Get assessment scores and course progress
         assessment_scores = [a.score_percentage for a in user.assessments] if user.assessments else []
-        course_progress = sum([e.progress_percentage for e in user.enrollments]) / len(user.enrollments) if user.enrollments else 0
+        course_progress = sum([progress_write_buffer.progress(e) for e in user.enrollments]) / len(user.enrollments) if user.enrollments else 0
         
         # Analyze user profile
         user_profile = ai_engine.analyze_user_profile(bio_dict, assessment_scores)
@@ -798,20 +690,15 @@ def get_practice_questions():
         question_type = request.args.get('type', '')
         limit = request.args.get('limit', 10, type=int)
         
-        # Build query
-        query = Question.query.filter_by(is_active=True)
-        
-        if category:
-            query = query.filter(Question.category.ilike(f'%{category}%'))
-        if difficulty:
-            query = query.filter_by(difficulty_level=difficulty.lower())
-        if question_type:
-            query = query.filter_by(question_type=question_type.lower())
-        
-        # Get questions and randomize
-        questions = query.all()
-        if len(questions) > limit:
-            questions = random.sample(questions, limit)
+        # Random sample from the cached topic pool instead of loading every match
+        questions = question_selection_service.sample(
+            limit,
+            topic=category or None,
+            difficulty=difficulty or None,
+            question_type=question_type.lower() or None,
+            user_id=user_id,
+            load_options=[undefer(Question.explanation)]
+        )
         
         questions_data = []
         for question in questions:
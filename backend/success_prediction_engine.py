@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Success Prediction Engine for SkillNova
+Scores every learner's success probability in one batch using NumPy arrays
+built from a single aggregate query
+"""
+
+import time
+import numpy as np
+from typing import Dict, Any
+from sqlalchemy import func
+from models import db, User, BioData, Assessment, CourseEnrollment, WeeklyEvaluationScore
+
+class SuccessPredictionEngine:
+    """Batch success scoring over per-user feature columns"""
+
+    # Relative weight of each feature; missing features are dropped and the rest renormalized
+    FEATURE_WEIGHTS = {
+        'assessment_score': 0.45,
+        'course_progress': 0.25,
+        'evaluation_score': 0.15,
+        'activity_recency': 0.15
+    }
+
+    HIGH_SUCCESS_THRESHOLD = 80.0
+    AT_RISK_THRESHOLD = 60.0
+
+    # Days after which activity recency has decayed to ~37%
+    RECENCY_DECAY_DAYS = 30.0
+
+    def load_features(self) -> Dict[str, np.ndarray]:
+        """Pull per-user feature columns for all non-admin users with bio data and assessments in one query"""
+        assessment_stats = db.session.query(
+            Assessment.user_id.label('user_id'),
+            func.avg(Assessment.score_percentage).label('avg_score'),
+            func.count(Assessment.id).label('assessment_count'),
+            func.max(Assessment.completed_at).label('last_assessment_at')
+        ).group_by(Assessment.user_id).subquery()
+
+        enrollment_stats = db.session.query(
+            CourseEnrollment.user_id.label('user_id'),
+            func.avg(CourseEnrollment.progress_percentage).label('avg_progress'),
+            func.count(CourseEnrollment.id).label('enrollment_count'),
+            func.max(CourseEnrollment.enrolled_at).label('last_enrolled_at')
+        ).group_by(CourseEnrollment.user_id).subquery()
+
+        evaluation_stats = db.session.query(
+            WeeklyEvaluationScore.user_id.label('user_id'),
+            func.avg(WeeklyEvaluationScore.score_percentage).label('avg_evaluation_score')
+        ).group_by(WeeklyEvaluationScore.user_id).subquery()
+
+        rows = db.session.query(
+            User.id,
+            User.name,
+            assessment_stats.c.avg_score,
+            assessment_stats.c.assessment_count,
+            enrollment_stats.c.avg_progress,
+            enrollment_stats.c.enrollment_count,
+            evaluation_stats.c.avg_evaluation_score,
+            func.extract('epoch', func.greatest(
+                User.last_login,
+                assessment_stats.c.last_assessment_at,
+                enrollment_stats.c.last_enrolled_at
+            ))
+        ).join(BioData, BioData.user_id == User.id
+        ).join(assessment_stats, assessment_stats.c.user_id == User.id
+        ).outerjoin(enrollment_stats, enrollment_stats.c.user_id == User.id
+        ).outerjoin(evaluation_stats, evaluation_stats.c.user_id == User.id
+        ).filter(User.is_admin == False).all()
+
+        if not rows:
+            return {'user_ids': np.array([], dtype=object), 'user_names': np.array([], dtype=object)}
+
+        user_ids, user_names, *numeric = zip(*rows)
+        # None becomes NaN when cast to float, which marks the feature as missing
+        columns = [np.array(column, dtype=float) for column in numeric]
+
+        return {
+            'user_ids': np.array(user_ids, dtype=object),
+            'user_names': np.array(user_names, dtype=object),
+            'assessment_score': columns[0],
+            'assessment_count': np.nan_to_num(columns[1]),
+            'course_progress': columns[2],
+            'enrollment_count': np.nan_to_num(columns[3]),
+            'evaluation_score': columns[4],
+            'last_activity_epoch': columns[5]
+        }
+
+    def predict(self, features: Dict[str, np.ndarray], now: float = None) -> np.ndarray:
+        """Return success probabilities (0-100) for every row in the feature arrays"""
+        if now is None:
+            now = time.time()
+
+        days_inactive = np.maximum(0.0, (now - features['last_activity_epoch']) / 86400.0)
+        feature_matrix = np.column_stack([
+            features['assessment_score'],
+            features['course_progress'],
+            features['evaluation_score'],
+            100.0 * np.exp(-days_inactive / self.RECENCY_DECAY_DAYS)
+        ])
+        weights = np.array([self.FEATURE_WEIGHTS[name] for name in
+                            ('assessment_score', 'course_progress', 'evaluation_score', 'activity_recency')])
+
+        available = ~np.isnan(feature_matrix)
+        weighted_sum = np.where(available, np.clip(feature_matrix, 0.0, 100.0), 0.0) @ weights
+        weight_total = available @ weights
+
+        probabilities = np.divide(weighted_sum, weight_total,
+                                  out=np.zeros_like(weighted_sum), where=weight_total > 0)
+        return np.round(probabilities, 1)
+
+    def cohorts(self, probabilities: np.ndarray) -> Dict[str, np.ndarray]:
+        """Boolean masks for the high / medium / low success cohorts"""
+        high = probabilities >= self.HIGH_SUCCESS_THRESHOLD
+        low = probabilities < self.AT_RISK_THRESHOLD
+        return {
+            'high': high,
+            'medium': ~high & ~low,
+            'low': low
+        }
+
+    def summarize(self, probabilities: np.ndarray) -> Dict[str, Any]:
+        """Aggregate distribution figures for the admin dashboard"""
+        total_users = int(probabilities.size)
+        masks = self.cohorts(probabilities)
+
+        def bucket(mask):
+            count = int(mask.sum())
+            return {
+                'count': count,
+                'percentage': round((count / total_users) * 100, 1) if total_users else 0
+            }
+
+        return {
+            'total_users_analyzed': total_users,
+            'success_distribution': {
+                'high_success': bucket(masks['high']),
+                'medium_success': bucket(masks['medium']),
+                'low_success': bucket(masks['low'])
+            },
+            'average_success_rate': round(float(probabilities.mean()), 1) if total_users else 0,
+            'at_risk_users': int(masks['low'].sum()),
+            'high_potential_users': int(masks['high'].sum())
+        }
+
+# Global instance
+success_prediction_engine = SuccessPredictionEngine()
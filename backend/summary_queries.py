@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Summary Query Helpers for SkillNova
+Large text columns (module content, course descriptions, question explanations, AI
+evaluation results, project submissions) are deferred on the models; list endpoints use
+these helpers to fetch exactly the columns they render, and undefer explicitly where a
+list really shows a large column so it is not lazy-loaded once per row
+"""
+
+from typing import Dict, Any, Iterable, Optional
+from sqlalchemy import func
+from sqlalchemy.orm import undefer
+from models import db, Course, CourseModule
+
+def with_course_description():
+    """Loader option for course lists that render the description"""
+    return undefer(Course.description)
+
+def with_module_content():
+    """Loader option for module lists that render the full content"""
+    return undefer(CourseModule.content)
+
+def module_counts(course_ids: Optional[Iterable] = None) -> Dict[Any, int]:
+    """course id -> number of modules (active or not), counted in SQL without loading module rows"""
+    query = db.session.query(CourseModule.course_id, func.count(CourseModule.id)).group_by(CourseModule.course_id)
+    if course_ids is not None:
+        course_ids = list(course_ids)
+        if not course_ids:
+            return {}
+        query = query.filter(CourseModule.course_id.in_(course_ids))
+    return dict(query.all())
@@ -0,0 +1,14 @@
+-- Migration: Add persisted user profile analysis cache
+-- Created: 2026-10-19
+-- Description: Stores ai_engine.analyze_user_profile results per user, keyed by a
+-- version hash of the bio data and assessment scores they were computed from
+
+CREATE TABLE IF NOT EXISTS user_profile_analyses (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    user_id UUID NOT NULL UNIQUE REFERENCES users(id) ON DELETE CASCADE,
+    version_hash VARCHAR(64) NOT NULL,
+    analysis JSONB NOT NULL,
+    computed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_user_profile_analyses_user_id ON user_profile_analyses(user_id);
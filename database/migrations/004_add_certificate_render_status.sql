@@ -0,0 +1,12 @@
+-- Migration: Add certificate PDF render state
+-- Created: 2026-10-19
+-- Description: Certificates are issued immediately and their PDFs rendered in the
+-- background; status tracks the render (pending, ready, failed)
+
+ALTER TABLE certificates ADD COLUMN IF NOT EXISTS status VARCHAR(20) DEFAULT 'ready';
+ALTER TABLE certificates ADD COLUMN IF NOT EXISTS rendered_at TIMESTAMP;
+
+-- Existing certificates were rendered synchronously; new rows start pending
+ALTER TABLE certificates ALTER COLUMN status SET DEFAULT 'pending';
+
+CREATE INDEX IF NOT EXISTS idx_certificates_status ON certificates(status);
@@ -0,0 +1,7 @@
+-- Migration: Add content-addressed certificate storage key
+-- Created: 2026-10-19
+-- Description: Rendered certificate PDFs are stored under the SHA-256 of their
+-- content; the hash is the storage key and the download ETag. Existing rows are
+-- moved into storage lazily on first download.
+
+ALTER TABLE certificates ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64);
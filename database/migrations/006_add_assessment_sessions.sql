@@ -0,0 +1,18 @@
+-- Migration: Add served assessment sessions
+-- Created: 2026-10-19
+-- Description: Persists the question set and answer key of each assessment when it is
+-- served, so submissions are graded by lookup instead of regenerating the questions
+
+CREATE TABLE IF NOT EXISTS assessment_sessions (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    assessment_type VARCHAR(50) NOT NULL,
+    questions_order JSONB NOT NULL,
+    user_profile JSONB,
+    status VARCHAR(20) DEFAULT 'served',
+    assessment_id UUID REFERENCES assessments(id) ON DELETE SET NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    submitted_at TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_assessment_sessions_user_status ON assessment_sessions(user_id, status, created_at DESC);
@@ -0,0 +1,15 @@
+-- Migration: Add question selection indexes
+-- Created: 2026-10-19
+-- Description: Trigram index so topic lookups (category ILIKE '%topic%') avoid sequential
+-- scans, plus partial indexes over active questions for category and course pools
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_questions_category_trgm
+    ON questions USING GIN (category gin_trgm_ops) WHERE is_active = TRUE;
+
+CREATE INDEX IF NOT EXISTS idx_questions_active_category_difficulty
+    ON questions(category, difficulty_level, question_type) WHERE is_active = TRUE;
+
+CREATE INDEX IF NOT EXISTS idx_questions_active_course_difficulty
+    ON questions(course_id, difficulty_level) WHERE is_active = TRUE;
@@ -0,0 +1,11 @@
+-- Migration: Add question bank full-text search
+-- Created: 2026-10-19
+-- Description: GIN index over the tsvector of question text and explanation for the
+-- admin question search, plus the (created_at, id) ordering used for keyset pagination.
+-- The indexed expression must stay identical to QuestionSearchService.search_document().
+
+CREATE INDEX IF NOT EXISTS idx_questions_search ON questions USING GIN (
+    to_tsvector('english', coalesce(question_text, '') || ' ' || coalesce(explanation, ''))
+);
+
+CREATE INDEX IF NOT EXISTS idx_questions_created_at_id ON questions(created_at DESC, id DESC);
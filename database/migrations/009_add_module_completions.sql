@@ -0,0 +1,16 @@
+-- Migration: Add per-module completion tracking
+-- Created: 2026-10-19
+-- Description: One row per completed module of an enrollment, so completing a module
+-- twice is a no-op. Progress counts the completions of still-active modules through the
+-- unique (enrollment_id, module_id) index.
+
+CREATE TABLE IF NOT EXISTS module_completions (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    enrollment_id UUID NOT NULL REFERENCES course_enrollments(id) ON DELETE CASCADE,
+    module_id UUID NOT NULL REFERENCES course_modules(id) ON DELETE CASCADE,
+    completed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT unique_enrollment_module_completion UNIQUE (enrollment_id, module_id)
+);
+
+-- Existing progress was an untracked running total; it is kept as a floor on the
+-- computed progress (see module_progress.py), so no completion rows are backfilled
@@ -0,0 +1,11 @@
+-- Migration: Include category in the question bank full-text search
+-- Created: 2026-10-19
+-- Description: Rebuilds idx_questions_search over question text, explanation and category,
+-- so admin search matches categories as the old client-side filter did.
+-- The indexed expression must stay identical to QuestionSearchService.search_document().
+
+DROP INDEX IF EXISTS idx_questions_search;
+
+CREATE INDEX IF NOT EXISTS idx_questions_search ON questions USING GIN (
+    to_tsvector('english', coalesce(question_text, '') || ' ' || coalesce(explanation, '') || ' ' || coalesce(category, ''))
+);
@@ -0,0 +1,11 @@
+-- Migration: Keyset pagination over questions without created_at
+-- Created: 2026-10-19
+-- Description: Rebuilds idx_questions_created_at_id over coalesce(created_at, epoch), so rows
+-- with a NULL created_at sort as the oldest and can be paged past instead of breaking the cursor.
+-- The indexed expression must stay identical to QuestionSearchService.SORT_KEY.
+
+DROP INDEX IF EXISTS idx_questions_created_at_id;
+
+CREATE INDEX IF NOT EXISTS idx_questions_created_at_id ON questions (
+    coalesce(created_at, TIMESTAMP '1970-01-01 00:00:00') DESC, id DESC
+);
@@ -20,6 +20,7 @@ const Assessment = () => {
   const [assessmentStarted, setAssessmentStarted] = useState(false);
   const [currentQuestion, setCurrentQuestion] = useState(0);
   const [questions, setQuestions] = useState([]);
+  const [assessmentSessionId, setAssessmentSessionId] = useState(null);
   const [answers, setAnswers] = useState({});
   const [timeLeft, setTimeLeft] = useState(1800); // 30 minutes
   const [assessmentComplete, setAssessmentComplete] = useState(false);
@@ -67,6 +68,7 @@ const Assessment = () => {
       const response = await api.get('/assessments/questions');
       if (response.data.success) {
         setQuestions(response.data.questions);
+        setAssessmentSessionId(response.data.assessment_session_id);
         setAssessmentStarted(true);
         setCurrentQuestion(0);
         setAnswers({});
@@ -106,6 +108,7 @@ const Assessment = () => {
       
       const response = await api.post('/assessments/submit', {
         answers,
+        assessment_session_id: assessmentSessionId,
         time_taken_minutes: timeTaken,
         assessment_type: 'initial'
       });
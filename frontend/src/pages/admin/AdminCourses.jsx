@@ -90,10 +90,24 @@ const AdminCourses = () => {
       
       const response = await api.post('/admin/courses', newCourse);
       
+      // Generation runs as a background job; poll it until it finishes
+      let job = response.data.job;
+      while (job && (job.status === 'queued' || job.status === 'running')) {
+        await new Promise((resolve) => setTimeout(resolve, 1000));
+        const jobResponse = await api.get(`/admin/courses/jobs/${job.job_id}`);
+        job = jobResponse.data.job;
+        toast.loading(`🤖 Generating ${job.stage}... ${job.progress_percentage}%`, { id: loadingToast });
+      }
+      
       toast.dismiss(loadingToast);
       
-      if (response.data.success) {
-        const aiContent = response.data.ai_generated_content;
+      if (job?.status === 'failed') {
+        toast.error(`Failed to create course: ${job.error}`);
+        return;
+      }
+      
+      if (response.data.success && job) {
+        const aiContent = job.ai_generated_content;
         
         const successMessage = `🎉 Course created successfully!\n✅ ${aiContent.modules} AI-generated modules\n✅ ${aiContent.assessments} assessments\n✅ Complete learning path` + 
           (aiContent.questions > 0 ? `\n✅ ${aiContent.questions} practice questions` : '\n📝 Questions can be added later in the Questions section');
@@ -209,10 +223,18 @@ const AdminCourses = () => {
       
       // Fetch course questions (if any)
       try {
-        const questionsResponse = await api.get(`/admin/questions?course_id=${course.id}`);
-        if (questionsResponse.data.success) {
-          setCourseQuestions(questionsResponse.data.questions || []);
-        }
+        // Follow the cursor so courses with more than one page of questions are listed in full
+        const allQuestions = [];
+        let cursor = null;
+        do {
+          const params = { course_id: course.id, limit: 200 };
+          if (cursor) params.cursor = cursor;
+          const questionsResponse = await api.get('/admin/questions', { params });
+          if (!questionsResponse.data.success) break;
+          allQuestions.push(...(questionsResponse.data.questions || []));
+          cursor = questionsResponse.data.next_cursor || null;
+        } while (cursor);
+        setCourseQuestions(allQuestions);
       } catch (error) {
         // Questions might not be available, that's okay
         console.log('No questions found for course:', error);
@@ -18,6 +18,10 @@ import toast from 'react-hot-toast';
 const AdminQuestions = () => {
   const [loading, setLoading] = useState(true);
   const [questions, setQuestions] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [totalQuestions, setTotalQuestions] = useState(0);
+  const [facets, setFacets] = useState({ category: [], difficulty: [], type: [], status: [] });
+  const [loadingMore, setLoadingMore] = useState(false);
   const [showAddForm, setShowAddForm] = useState(false);
   const [editingQuestion, setEditingQuestion] = useState(null);
   const [searchTerm, setSearchTerm] = useState('');
@@ -37,10 +41,15 @@ const AdminQuestions = () => {
   });
 
   useEffect(() => {
-    fetchQuestions();
     fetchCourses();
   }, []);
 
+  // Search and filters run on the server; debounce typing before refetching the first page
+  useEffect(() => {
+    const timer = setTimeout(() => fetchQuestions(), 300);
+    return () => clearTimeout(timer);
+  }, [searchTerm, filterType, filterDifficulty]);
+
   // Ensure options array is properly initialized when question type changes
   useEffect(() => {
     if (newQuestion.question_type === 'multiple_choice' && !Array.isArray(newQuestion.options)) {
@@ -51,20 +60,40 @@ const AdminQuestions = () => {
     }
   }, [newQuestion.question_type]);
 
-  const fetchQuestions = async () => {
+  const fetchQuestions = async (cursor = null) => {
     try {
-      const response = await api.get('/admin/questions');
+      if (cursor) {
+        setLoadingMore(true);
+      }
+      const params = { limit: 50 };
+      if (searchTerm.trim()) params.q = searchTerm.trim();
+      if (filterType !== 'all') params.type = filterType;
+      if (filterDifficulty !== 'all') params.difficulty = filterDifficulty;
+      if (cursor) params.cursor = cursor;
+
+      const response = await api.get('/admin/questions', { params });
       if (response.data.success) {
-        setQuestions(response.data.questions || []);
+        const page = response.data.questions || [];
+        setQuestions(prev => (cursor ? [...prev, ...page] : page));
+        setNextCursor(response.data.next_cursor || null);
+        // Totals and facets come with the first page only
+        if (!cursor) {
+          setTotalQuestions(response.data.total_questions || 0);
+          setFacets(response.data.facets || { category: [], difficulty: [], type: [], status: [] });
+        }
       }
     } catch (error) {
       console.error('Failed to fetch questions:', error);
       toast.error('Failed to load questions');
     } finally {
       setLoading(false);
+      setLoadingMore(false);
     }
   };
 
+  const facetCount = (facet, value) =>
+    (facets[facet] || []).find(item => item.value === value)?.count || 0;
+
   const fetchCourses = async () => {
     try {
       const response = await api.get('/admin/ai-questions/categories');
@@ -259,16 +288,6 @@ const AdminQuestions = () => {
     }
   };
 
-  const filteredQuestions = questions.filter(question => {
-    const matchesSearch = question.question_text.toLowerCase().includes(searchTerm.toLowerCase()) ||
-                         question.category?.toLowerCase().includes(searchTerm.toLowerCase());
-    
-    const matchesType = filterType === 'all' || question.question_type === filterType;
-    const matchesDifficulty = filterDifficulty === 'all' || question.difficulty_level === filterDifficulty;
-    
-    return matchesSearch && matchesType && matchesDifficulty;
-  });
-
   const getDifficultyColor = (difficulty) => {
     switch (difficulty) {
       case 'easy': return 'bg-green-100 text-green-800';
@@ -329,7 +348,7 @@ const AdminQuestions = () => {
               <HelpCircle className="w-8 h-8 text-blue-600" />
               <div>
                 <p className="text-sm text-gray-600">Total Questions</p>
-                <p className="text-2xl font-bold text-gray-900">{questions.length}</p>
+                <p className="text-2xl font-bold text-gray-900">{totalQuestions}</p>
               </div>
             </div>
           </div>
@@ -340,7 +359,7 @@ const AdminQuestions = () => {
               <div>
                 <p className="text-sm text-gray-600">Active</p>
                 <p className="text-2xl font-bold text-gray-900">
-                  {questions.filter(q => q.is_active).length}
+                  {facetCount('status', 'active')}
                 </p>
               </div>
             </div>
@@ -352,7 +371,7 @@ const AdminQuestions = () => {
               <div>
                 <p className="text-sm text-gray-600">Inactive</p>
                 <p className="text-2xl font-bold text-gray-900">
-                  {questions.filter(q => !q.is_active).length}
+                  {facetCount('status', 'inactive')}
                 </p>
               </div>
             </div>
@@ -364,7 +383,7 @@ const AdminQuestions = () => {
               <div>
                 <p className="text-sm text-gray-600">Categories</p>
                 <p className="text-2xl font-bold text-gray-900">
-                  {new Set(questions.map(q => q.category).filter(Boolean)).size}
+                  {(facets.category || []).filter(item => item.value).length}
                 </p>
               </div>
             </div>
@@ -442,7 +461,7 @@ const AdminQuestions = () => {
                 </tr>
               </thead>
               <tbody className="bg-white divide-y divide-gray-200">
-                {filteredQuestions.map((question) => (
+                {questions.map((question) => (
                   <tr key={question.id} className="hover:bg-gray-50">
                     <td className="px-6 py-4">
                       <div className="text-sm text-gray-900 max-w-md">
@@ -515,7 +534,19 @@ const AdminQuestions = () => {
             </table>
           </div>
           
-          {filteredQuestions.length === 0 && (
+          {nextCursor && (
+            <div className="text-center py-4 border-t border-gray-200">
+              <button
+                onClick={() => fetchQuestions(nextCursor)}
+                disabled={loadingMore}
+                className="px-4 py-2 text-sm font-medium text-primary-600 hover:text-primary-700 disabled:opacity-50"
+              >
+                {loadingMore ? 'Loading...' : `Load more (${questions.length} of ${totalQuestions})`}
+              </button>
+            </div>
+          )}
+          
+          {questions.length === 0 && (
             <div className="text-center py-12">
               <HelpCircle className="w-12 h-12 text-gray-300 mx-auto mb-4" />
               <h3 className="text-lg font-medium text-gray-900 mb-2">No questions found</h3>